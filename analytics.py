@@ -0,0 +1,96 @@
+import json
+from array import array
+from collections import Counter, namedtuple
+from itertools import compress
+
+# Answer analytics. Every answer is appended to the answers log (storage.py); when a run finishes,
+# the quiz's logged answers are compacted into a columnar segment: one packed array per field, so a
+# scan over thousands of runs reads a few BLOBs instead of millions of rows. Queries work on whole
+# columns with builtins that loop in C (Counter, compress, sorted) rather than row by row.
+#
+# Questions are numbered by their position in the quiz when it ran (1-based), and answer_index is the
+# option's position in the question bank, so shuffled runs add up.
+
+# Column name -> array typecode. Arrays are stored with native byte order.
+ANSWER_COLUMNS = (("question", "I"), ("answer_index", "H"), ("correct", "B"), ("answer_time", "f"))
+PERCENTILES = (50, 90, 99)
+
+QuestionStats = namedtuple("QuestionStats", ["question", "answers", "correct", "median", "p90"])
+
+class AnswerColumns:
+    def __init__(self):
+        self.question = array("I")
+        self.answer_index = array("H")
+        self.correct = array("B")
+        self.answer_time = array("f")
+        self.sessions = set()  # runs that contributed answers
+
+    def __len__(self):
+        return len(self.question)
+
+    # rows: [(session, question, answer_index, correct, answer_time), ...] as logged.
+    @classmethod
+    def from_rows(cls, rows):
+        columns = cls()
+        if rows:
+            sessions, *fields = zip(*rows)
+            columns.sessions.update(sessions)
+            for (name, typecode), values in zip(ANSWER_COLUMNS, fields):
+                getattr(columns, name).extend(array(typecode, values))
+        return columns
+
+    # sessions: JSON list; blobs in ANSWER_COLUMNS order, as returned by encode().
+    @classmethod
+    def decode(cls, sessions, *blobs):
+        columns = cls()
+        columns.sessions.update(json.loads(sessions))
+        for (name, _), blob in zip(ANSWER_COLUMNS, blobs):
+            getattr(columns, name).frombytes(blob)
+        return columns
+
+    def encode(self):
+        return (json.dumps(sorted(self.sessions)),) + tuple(getattr(self, name).tobytes() for name, _ in ANSWER_COLUMNS)
+
+    def extend(self, other):
+        for name, _ in ANSWER_COLUMNS:
+            getattr(self, name).extend(getattr(other, name))
+        self.sessions |= other.sessions
+        return self
+
+# Nearest-rank percentile of the count values starting at first in an ascending sequence.
+def percentile(values, p, first=0, count=None):
+    if count is None:
+        count = len(values) - first
+    rank = max(-(-p * count // 100), 1)  # ceil(p% of count), at least the first value
+    return values[first + rank - 1]
+
+# QuestionStats per answered question, in question order.
+def question_stats(columns):
+    answers = Counter(columns.question)
+    correct = Counter(compress(columns.question, columns.correct))
+    # One sort groups the answer times by question, fastest first within each question.
+    times = [t for _, t in sorted(zip(columns.question, columns.answer_time))]
+    stats = []
+    first = 0
+    for question in sorted(answers):
+        count = answers[question]
+        stats.append(QuestionStats(question, count, correct[question], percentile(times, 50, first, count), percentile(times, 90, first, count)))
+        first += count
+    return stats
+
+# The hardest questions first: lowest share of correct answers, then most answers.
+def hardest(stats, limit=None):
+    return sorted(stats, key=lambda s: (s.correct / s.answers, -s.answers))[:limit]
+
+# Accuracy, response-time percentiles and option distribution of one question, or None if it has no answers.
+def question_detail(columns, question):
+    selected = bytes(map(question.__eq__, columns.question))
+    times = sorted(compress(columns.answer_time, selected))
+    if not times:
+        return None
+    return {
+        "answers": len(times),
+        "correct": sum(compress(columns.correct, selected)),
+        "percentiles": {p: percentile(times, p) for p in PERCENTILES},
+        "options": Counter(compress(columns.answer_index, selected))
+    }
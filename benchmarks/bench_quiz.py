@@ -0,0 +1,221 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import quizbot
+from analytics import percentile
+from benchmarks.fakes import FakeGuild, FakeInteraction, fake_ctx
+from export import EXPORT_FORMATS, export_results
+from leaderboard import Leaderboard
+from scoring import STRATEGIES, score_responses
+
+# Benchmarks for the answer, scoring, leaderboard and export paths at growing room sizes. Each size
+# runs in its own process against a fresh database, with the fake Discord layer from fakes.py: a quiz
+# is started through the real commands, every participant clicks at once, and the closed question's
+# answers are scored, ranked and exported. Runs offline; results are saved as JSON.
+#
+#   python benchmarks/bench_quiz.py                          # 10, 1k, 10k and 100k participants
+#   python benchmarks/bench_quiz.py --sizes 10 1000 --output new.json --compare old.json
+#   python benchmarks/bench_quiz.py --workers 4    # 4 processes sharing one database, one guild each
+#
+# With --workers, every worker takes the full room at the same moment (as shard workers serving
+# different guilds would) and answers_per_sec is the combined rate over the shared window.
+
+DEFAULT_SIZES = [10, 1000, 10000, 100000]
+DEFAULT_OUTPUT = "bench_output.json"
+OPTIONS = 4
+QUESTION_TIME = 600  # long enough that the question stays open while the answers come in
+WORKER_START_DELAY = 5  # seconds the workers get to start up before the shared burst
+
+def elapsed_ms(started):
+    return (time.perf_counter() - started) * 1000
+
+# start_at (time.time()) holds the burst until then, so several workers can start it together.
+async def measure(participants, db_path, guild_id=1, start_at=None):
+    quizbot.create_bot(quizbot.Config(db_path=db_path))
+    ctx = fake_ctx(FakeGuild(guild_id))
+    try:
+        await quizbot.create_quiz.callback(ctx, "bench")
+        await quizbot.add_question_simple.callback(ctx, "bench", QUESTION_TIME, 1, content="Question|a|b|c|d")
+        await quizbot.start_quiz.callback(ctx, "bench", "default")
+        session = quizbot.sessions.get(ctx.guild.id, ctx.channel.id, "bench")
+        while (session.session_id, 1) not in quizbot.live_questions:
+            await asyncio.sleep(0.001)
+        question = quizbot.live_questions[(session.session_id, 1)]
+
+        # Everyone clicks at the same moment, so latency includes waiting behind the rest of the burst.
+        interactions = [FakeInteraction(user_id, ctx.guild) for user_id in range(1, participants + 1)]
+        if start_at is not None:
+            await asyncio.sleep(max(start_at - time.time(), 0))
+        burst_started = time.time()
+        started = time.perf_counter()
+        await asyncio.gather(*(quizbot.dispatch_answer(i, session.session_id, 1, i.user.id % OPTIONS) for i in interactions))
+        while len(question.responses) < participants:
+            await asyncio.sleep(0.001)
+        ingest_seconds = time.perf_counter() - started
+        burst_finished = time.time()
+        latencies = sorted((i.acked_at - started) * 1000 for i in interactions)
+
+        scoring_ms = {}
+        for name in STRATEGIES:
+            scored = time.perf_counter()
+            awards = score_responses(name, question.answer_order, QUESTION_TIME, {})
+            scoring_ms[name] = elapsed_ms(scored)
+            if name == "rank_decay":
+                rank_awards = awards
+
+        ranked = time.perf_counter()
+        board = Leaderboard({user_id: 0 for user_id in question.responses})
+        board.update(rank_awards)
+        top = board.top()
+        leaderboard_ms = elapsed_ms(ranked)
+
+        rows = [(user_id, f"user{user_id}", score) for user_id, score in top]
+        export_ms = {}
+        export_stall_ms = {}
+        for fmt in EXPORT_FORMATS:
+            _, _, stats = await export_results("bench", rows, fmt)
+            export_ms[fmt] = stats["seconds"] * 1000
+            export_stall_ms[fmt] = stats["max_loop_stall"] * 1000
+
+        await session.abort()
+        await quizbot.store.flush()
+    finally:
+        quizbot.shutdown()
+    return {
+        "participants": participants,
+        "answers_per_sec": participants / ingest_seconds,
+        "ingest_seconds": ingest_seconds,
+        "burst": [burst_started, burst_finished],
+        "ack_p50_ms": percentile(latencies, 50),
+        "ack_p99_ms": percentile(latencies, 99),
+        "scoring_ms": scoring_ms,
+        "leaderboard_ms": leaderboard_ms,
+        "export_ms": export_ms,
+        "export_max_loop_stall_ms": export_stall_ms,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+# Measures one size in this process and prints the result as the last line of output.
+def run_child(participants, db_path=None, guild_id=1, start_at=None):
+    if db_path is not None:
+        result = asyncio.run(measure(participants, db_path, guild_id, start_at))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            result = asyncio.run(measure(participants, os.path.join(tmp, "bench.db")))
+    print(json.dumps(result))
+
+def child_result(proc, participants):
+    stdout, stderr = proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"benchmark for {participants} participants failed:\n{stderr}")
+    return json.loads(stdout.strip().splitlines()[-1])
+
+def run_size(participants, workers=1):
+    command = [sys.executable, os.path.abspath(__file__), "--child", str(participants)]
+    if workers == 1:
+        return child_result(subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True), participants)
+    with tempfile.TemporaryDirectory() as tmp:
+        from storage import QuizStore
+        db_path = os.path.join(tmp, "bench.db")
+        QuizStore(db_path).close()
+        start_at = time.time() + WORKER_START_DELAY
+        procs = [
+            subprocess.Popen(command + ["--db", db_path, "--guild", str(worker + 1), "--start-at", str(start_at)], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            for worker in range(workers)
+        ]
+        results = [child_result(proc, participants) for proc in procs]
+    window = max(r["burst"][1] for r in results) - min(r["burst"][0] for r in results)
+    return {
+        "participants": participants,
+        "workers": workers,
+        "answers_per_sec": participants * workers / window,
+        "ack_p50_ms": max(r["ack_p50_ms"] for r in results),
+        "ack_p99_ms": max(r["ack_p99_ms"] for r in results),
+        "scoring_ms": results[0]["scoring_ms"],
+        "leaderboard_ms": max(r["leaderboard_ms"] for r in results),
+        "export_ms": {fmt: max(r["export_ms"][fmt] for r in results) for fmt in results[0]["export_ms"]},
+        "peak_rss_mb": sum(r["peak_rss_mb"] for r in results),
+        "per_worker": results
+    }
+
+# {"scoring_ms": {"streak": 1.0}} -> {"scoring_ms.streak": 1.0}
+def flatten(result, prefix=""):
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[prefix + key] = value
+    return flat
+
+def report(result):
+    return (
+        f"{result['participants']:>7} participants: {result['answers_per_sec']:>9.0f} answers/s, "
+        f"ack p50 {result['ack_p50_ms']:.1f}ms p99 {result['ack_p99_ms']:.1f}ms, "
+        f"scoring {result['scoring_ms']['rank_decay']:.1f}ms, leaderboard {result['leaderboard_ms']:.1f}ms, "
+        f"export xlsx {result['export_ms']['xlsx']:.0f}ms csv {result['export_ms']['csv']:.0f}ms, "
+        f"peak {result['peak_rss_mb']:.0f}MB"
+    )
+
+# Lines of "metric: old -> new (ratio)" for every size present in both runs.
+def compare(old, new):
+    lines = []
+    old_results = {result["participants"]: flatten(result) for result in old["results"]}
+    for result in new["results"]:
+        before = old_results.get(result["participants"])
+        if before is None:
+            continue
+        lines.append(f"{result['participants']} participants:")
+        for key, value in flatten(result).items():
+            if key in before and key not in ("participants", "workers") and isinstance(value, (int, float)) and isinstance(before[key], (int, float)) and before[key]:
+                lines.append(f"  {key}: {before[key]:.2f} -> {value:.2f} ({value / before[key]:.2f}x)")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the quiz answer, scoring and export paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="participant counts to run")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to save the results as JSON")
+    parser.add_argument("--compare", help="an earlier results file to compare against")
+    parser.add_argument("--workers", type=int, default=1, help="processes sharing one database, each with its own guild")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--guild", type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child is not None:
+        run_child(args.child, args.db, args.guild, args.start_at)
+        return
+    results = []
+    for participants in args.sizes:
+        result = run_size(participants, args.workers)
+        print(report(result), flush=True)
+        results.append(result)
+    run = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "workers": args.workers,
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"Saved {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            print("\n".join(compare(json.load(f), run)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter, deque, namedtuple
+from datetime import datetime, timezone
+
+from aiohttp import WSMsgType, web
+
+# A local stand-in for Discord's gateway and REST API, enough to run the real bot offline: one guild
+# with one text channel, a host member with the quiz role, and any number of players. The bot is
+# pointed at it by overriding discord.py's REST base URL and gateway URL (see loadtest.py).
+#
+# REST calls get a configurable latency, and channel routes answer 429 with rate-limit headers once
+# their per-channel budget is used up, like Discord's own buckets; interaction callbacks and
+# followups are exempt, as on Discord. Everything the bot sends is reported to the test as Events,
+# and every INTERACTION_CREATE is tracked until its callback arrives, so acknowledgement latency
+# is measured from the moment the click left the gateway.
+
+API = "/api/v10"
+DISCORD_EPOCH = 1420070400000
+ADMINISTRATOR = 8
+EPHEMERAL = 64
+COMPONENT_INTERACTION = 3
+BUTTON = 2
+
+Event = namedtuple("Event", ["at", "kind", "payload"])  # kind: message, edit, delete, followup
+
+class Interaction:
+    __slots__ = ("user_id", "sent_at", "acked_at", "response_type")
+
+    def __init__(self, user_id, sent_at):
+        self.user_id = user_id
+        self.sent_at = sent_at
+        self.acked_at = None
+        self.response_type = None
+
+# Sliding-window request budget per bucket, e.g. 5 requests per 5 seconds per channel and route.
+class RateLimiter:
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.log = {}  # bucket -> deque of request times
+
+    # (allowed, remaining, reset_after)
+    def hit(self, bucket, now):
+        log = self.log.setdefault(bucket, deque())
+        while log and now - log[0] >= self.window:
+            log.popleft()
+        if len(log) >= self.limit:
+            return False, 0, self.window - (now - log[0])
+        log.append(now)
+        return True, self.limit - len(log), self.window - (now - log[0])
+
+def iso_now():
+    return datetime.now(timezone.utc).isoformat()
+
+def user_payload(user_id, name, bot=False):
+    return {"id": str(user_id), "username": name, "discriminator": "0", "global_name": None, "avatar": None, "bot": bot}
+
+def member_payload(user, roles=()):
+    return {"user": user, "roles": [str(role) for role in roles], "joined_at": iso_now(), "deaf": False, "mute": False, "flags": 0, "nick": None, "avatar": None, "pending": False}
+
+def role_payload(role_id, name, position, permissions=0):
+    return {"id": str(role_id), "name": name, "permissions": str(permissions), "position": position, "color": 0, "hoist": False, "managed": False, "mentionable": False, "flags": 0}
+
+# discord.py only parses bodies whose content type is exactly application/json, without a charset.
+def json_response(data, status=200, headers=None):
+    return web.Response(body=json.dumps(data).encode(), status=status, headers=dict(headers or {}, **{"Content-Type": "application/json"}))
+
+class FakeDiscord:
+    # latency: seconds added to every REST call (plus up to jitter); channel_limit: (requests, seconds)
+    # per channel and route.
+    def __init__(self, latency=0.05, jitter=0.02, channel_limit=(5, 5.0), seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.limiter = RateLimiter(*channel_limit)
+        self.random = random.Random(seed)
+        self.ids = itertools.count()
+        self.bot_user = user_payload(self.snowflake(), "QuizBot", bot=True)
+        self.host_user = user_payload(self.snowflake(), "host")
+        self.application_id = self.bot_user["id"]
+        self.guild_id = self.snowflake()
+        self.channel_id = self.snowflake()
+        self.role_id = self.snowflake()
+        self.messages = {}          # message id -> payload as last sent or edited
+        self.interactions = {}      # interaction id -> Interaction
+        self.requests = Counter()   # "METHOD route" -> count
+        self.rate_limited = Counter()
+        self.events = asyncio.Queue()
+        self.ready = asyncio.Event()
+        self.ws = None
+        self.sequence = 0
+        self.runner = None
+        self.url = None
+
+    def snowflake(self):
+        return ((int(time.time() * 1000) - DISCORD_EPOCH) << 22) + next(self.ids) % (1 << 22)
+
+    async def start(self, host="127.0.0.1", port=0):
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get("/gateway", self.gateway)
+        app.router.add_get(API + "/users/@me", self.get_me)
+        app.router.add_get(API + "/oauth2/applications/@me", self.get_application)
+        app.router.add_get(API + "/gateway", self.get_gateway)
+        app.router.add_get(API + "/gateway/bot", self.get_gateway)
+        app.router.add_post(API + "/channels/{channel_id}/messages", self.create_message)
+        app.router.add_patch(API + "/channels/{channel_id}/messages/{message_id}", self.edit_message)
+        app.router.add_delete(API + "/channels/{channel_id}/messages/{message_id}", self.delete_message)
+        app.router.add_post(API + "/interactions/{interaction_id}/{token}/callback", self.interaction_callback)
+        app.router.add_post(API + "/webhooks/{application_id}/{token}", self.followup)
+        app.router.add_route("*", API + "/webhooks/{application_id}/{token}/messages/{message_id}", self.followup_message)
+        app.router.add_route("*", "/{tail:.*}", self.unknown)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self.ws is not None:
+            await self.ws.close()
+        await self.runner.cleanup()
+
+    # --- Gateway ---
+    async def gateway(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        self.ws = ws
+        self.ready.clear()
+        await ws.send_json({"op": 10, "d": {"heartbeat_interval": 41250}})
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            data = json.loads(msg.data)
+            op = data.get("op")
+            if op == 1:
+                # Acked after the network latency; an instant ack races discord.py's keep-alive thread.
+                asyncio.get_running_loop().call_later(self.latency, lambda: asyncio.ensure_future(ws.send_json({"op": 11})))
+            elif op == 2:
+                await self.dispatch("READY", {
+                    "v": 10,
+                    "user": self.bot_user,
+                    "guilds": [{"id": str(self.guild_id), "unavailable": True}],
+                    "session_id": "loadtest",
+                    "resume_gateway_url": self.url.replace("http", "ws", 1) + "/gateway",
+                    "application": {"id": self.application_id, "flags": 0},
+                    "shard": [0, 1]
+                })
+                await self.dispatch("GUILD_CREATE", self.guild_payload())
+                self.ready.set()
+            elif op == 8:
+                # Member lookups by id (MemberCache.resolve); every player exists.
+                request_data = data["d"]
+                members = [member_payload(user_payload(int(user_id), f"player{user_id}")) for user_id in request_data.get("user_ids") or []]
+                await self.dispatch("GUILD_MEMBERS_CHUNK", {"guild_id": str(self.guild_id), "members": members, "chunk_index": 0, "chunk_count": 1, "nonce": request_data.get("nonce")})
+        if self.ws is ws:
+            self.ws = None
+        return ws
+
+    async def dispatch(self, event, data):
+        self.sequence += 1
+        await self.ws.send_str(json.dumps({"op": 0, "t": event, "s": self.sequence, "d": data}))
+
+    def channel_payload(self):
+        return {"id": str(self.channel_id), "type": 0, "guild_id": str(self.guild_id), "name": "quiz", "position": 0, "permission_overwrites": [], "nsfw": False, "parent_id": None, "topic": None, "last_message_id": None, "rate_limit_per_user": 0}
+
+    def guild_payload(self):
+        return {
+            "id": str(self.guild_id), "name": "Load test", "icon": None, "owner_id": self.host_user["id"],
+            "afk_channel_id": None, "afk_timeout": 300, "verification_level": 0, "default_message_notifications": 0,
+            "explicit_content_filter": 0, "mfa_level": 0, "application_id": None, "system_channel_id": None,
+            "system_channel_flags": 0, "rules_channel_id": None, "joined_at": iso_now(), "large": False,
+            "unavailable": False, "member_count": 2, "premium_tier": 0, "preferred_locale": "en-US", "nsfw_level": 0,
+            "roles": [role_payload(self.guild_id, "@everyone", 0, ADMINISTRATOR), role_payload(self.role_id, "Quiz host", 1)],
+            "members": [member_payload(self.bot_user), member_payload(self.host_user, [self.role_id])],
+            "channels": [self.channel_payload()],
+            "emojis": [], "stickers": [], "features": [], "voice_states": [], "threads": [], "presences": [],
+            "stage_instances": [], "guild_scheduled_events": [], "soundboard_sounds": []
+        }
+
+    # A message from the host in the quiz channel, e.g. a prefix command.
+    async def send_message(self, content):
+        message = self.message_payload(self.snowflake(), self.host_user, {"content": content})
+        message["member"] = {"roles": [str(self.role_id)], "joined_at": iso_now(), "deaf": False, "mute": False, "flags": 0}
+        await self.dispatch("MESSAGE_CREATE", message)
+
+    # A player clicking a button of a message the bot posted.
+    async def click(self, user_id, message_id, custom_id):
+        interaction_id = self.snowflake()
+        user = user_payload(user_id, f"player{user_id}")
+        payload = {
+            "id": str(interaction_id), "application_id": self.application_id, "type": COMPONENT_INTERACTION,
+            "data": {"custom_id": custom_id, "component_type": BUTTON},
+            "guild_id": str(self.guild_id), "channel_id": str(self.channel_id), "channel": self.channel_payload(),
+            "member": dict(member_payload(user), permissions="0"), "token": f"token{interaction_id}", "version": 1,
+            "message": self.messages[message_id], "app_permissions": str(ADMINISTRATOR), "locale": "en-US",
+            "guild_locale": "en-US", "entitlements": [], "authorizing_integration_owners": {"0": str(self.guild_id)},
+            "context": 0, "attachment_size_limit": 25 * 1024 * 1024
+        }
+        self.interactions[interaction_id] = Interaction(user_id, time.monotonic())
+        await self.dispatch("INTERACTION_CREATE", payload)
+
+    # --- REST ---
+    def message_payload(self, message_id, author, body, attachments=()):
+        return {
+            "id": str(message_id), "channel_id": str(self.channel_id), "guild_id": str(self.guild_id), "author": author,
+            "content": body.get("content") or "", "timestamp": iso_now(), "edited_timestamp": None, "tts": False,
+            "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": list(attachments),
+            "embeds": body.get("embeds") or [], "pinned": False, "type": 0, "flags": body.get("flags") or 0,
+            "components": body.get("components") or []
+        }
+
+    # JSON body, or the payload_json part of a multipart upload plus the files' names and sizes.
+    async def read_body(self, request):
+        if not request.can_read_body:
+            return {}, []
+        if request.content_type != "multipart/form-data":
+            return await request.json(), []
+        body = {}
+        attachments = []
+        async for part in await request.multipart():
+            data = await part.read()
+            if part.name == "payload_json":
+                body = json.loads(data)
+            else:
+                attachments.append({"id": str(self.snowflake()), "filename": part.filename, "size": len(data), "url": "", "proxy_url": ""})
+        return body, attachments
+
+    async def respond(self, request, route, data=None, status=200, bucket=None):
+        self.requests[f"{request.method} {route}"] += 1
+        await asyncio.sleep(self.latency + self.random.random() * self.jitter)
+        headers = {}
+        if bucket is not None:
+            allowed, remaining, reset_after = self.limiter.hit((request.method, route, bucket), time.monotonic())
+            headers = {
+                "X-RateLimit-Limit": str(self.limiter.limit),
+                "X-RateLimit-Remaining": str(remaining),
+                "X-RateLimit-Reset": str(time.time() + reset_after),
+                "X-RateLimit-Reset-After": str(round(reset_after, 3)),
+                "X-RateLimit-Bucket": f"{request.method}:{route}",
+                "Via": "1.1 fake-discord"  # discord.py treats a 429 without Via as a Cloudflare ban
+            }
+            if not allowed:
+                self.rate_limited[f"{request.method} {route}"] += 1
+                return json_response({"message": "You are being rate limited.", "retry_after": round(reset_after, 3), "global": False}, 429, headers)
+        if data is None:
+            return web.Response(status=204, headers=headers)
+        return json_response(data, status, headers)
+
+    async def get_me(self, request):
+        return await self.respond(request, "/users/@me", self.bot_user)
+
+    async def get_application(self, request):
+        return await self.respond(request, "/oauth2/applications/@me", {
+            "id": self.application_id, "name": "QuizBot", "description": "", "icon": None, "bot_public": False,
+            "bot_require_code_grant": False, "owner": self.host_user, "verify_key": "", "flags": 0
+        })
+
+    async def get_gateway(self, request):
+        url = self.url.replace("http", "ws", 1) + "/gateway"
+        return await self.respond(request, "/gateway", {"url": url, "shards": 1, "session_start_limit": {"total": 1000, "remaining": 1000, "reset_after": 0, "max_concurrency": 1}})
+
+    async def create_message(self, request):
+        body, attachments = await self.read_body(request)
+        message_id = self.snowflake()
+        message = self.messages[message_id] = self.message_payload(message_id, self.bot_user, body, attachments)
+        response = await self.respond(request, "/channels/{id}/messages", message, bucket=request.match_info["channel_id"])
+        if response.status == 200:
+            self.events.put_nowait(Event(time.monotonic(), "message", message))
+        else:
+            del self.messages[message_id]
+        return response
+
+    async def edit_message(self, request):
+        body, attachments = await self.read_body(request)
+        message_id = int(request.match_info["message_id"])
+        message = dict(self.messages.get(message_id) or self.message_payload(message_id, self.bot_user, {}))
+        message.update({key: value for key, value in body.items() if key in ("content", "embeds", "components", "flags")})
+        message["edited_timestamp"] = iso_now()
+        response = await self.respond(request, "/channels/{id}/messages/{id}", message, bucket=request.match_info["channel_id"])
+        if response.status == 200:
+            self.messages[message_id] = message
+            self.events.put_nowait(Event(time.monotonic(), "edit", message))
+        return response
+
+    async def delete_message(self, request):
+        response = await self.respond(request, "/channels/{id}/messages/{id}", bucket=request.match_info["channel_id"])
+        if response.status == 204:
+            self.events.put_nowait(Event(time.monotonic(), "delete", self.messages.pop(int(request.match_info["message_id"]), None)))
+        return response
+
+    async def interaction_callback(self, request):
+        body, _ = await self.read_body(request)
+        interaction_id = int(request.match_info["interaction_id"])
+        interaction = self.interactions.get(interaction_id)
+        if interaction is None:
+            return await self.respond(request, "/interactions/{id}/{token}/callback", {"message": "Unknown interaction", "code": 10062}, status=404)
+        if interaction.acked_at is not None:
+            return await self.respond(request, "/interactions/{id}/{token}/callback", {"message": "Interaction has already been acknowledged.", "code": 40060}, status=400)
+        interaction.acked_at = time.monotonic()
+        interaction.response_type = body.get("type")
+        return await self.respond(request, "/interactions/{id}/{token}/callback", {
+            "interaction": {"id": str(interaction_id), "type": COMPONENT_INTERACTION, "response_message_loading": False, "response_message_ephemeral": bool((body.get("data") or {}).get("flags", 0) & EPHEMERAL)},
+            "resource": {"type": body.get("type")}
+        })
+
+    async def followup(self, request):
+        body, attachments = await self.read_body(request)
+        message = self.message_payload(self.snowflake(), self.bot_user, body, attachments)
+        self.events.put_nowait(Event(time.monotonic(), "followup", message))
+        return await self.respond(request, "/webhooks/{id}/{token}", message)
+
+    async def followup_message(self, request):
+        return await self.respond(request, "/webhooks/{id}/{token}/messages/{id}")
+
+    async def unknown(self, request):
+        return await self.respond(request, request.path, {"message": "404: Not Found", "code": 0}, status=404)
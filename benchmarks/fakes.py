@@ -0,0 +1,82 @@
+import itertools
+import time
+from types import SimpleNamespace
+
+# Stand-ins for the few Discord objects the quiz code touches, so commands, quiz sessions and answer
+# handling run in-process without a gateway connection. Messages "sent" to a FakeChannel are kept in
+# channel.sent (the content, or the keyword arguments for embeds and files).
+
+def fake_user(user_id):
+    return SimpleNamespace(id=user_id, name=f"user{user_id}", mention=f"<@{user_id}>")
+
+class FakeGuild:
+    def __init__(self, guild_id=1):
+        self.id = guild_id
+
+    def get_member(self, user_id):
+        return fake_user(user_id)
+
+    async def query_members(self, user_ids, limit, cache):
+        return [fake_user(user_id) for user_id in user_ids]
+
+message_ids = itertools.count(1000)
+
+class FakeMessage:
+    def __init__(self, channel, message_id=None):
+        self.id = message_id if message_id is not None else next(message_ids)
+        self.channel = channel
+        self.edits = 0
+
+    async def edit(self, **kwargs):
+        self.edits += 1
+
+class FakeChannel:
+    def __init__(self, guild, channel_id=555):
+        self.id = channel_id
+        self.guild = guild
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content if content is not None else kwargs)
+        return FakeMessage(self)
+
+    def get_partial_message(self, message_id):
+        return FakeMessage(self, message_id)
+
+def fake_ctx(guild=None, channel_id=555, author_id=9):
+    guild = guild or FakeGuild()
+    return SimpleNamespace(guild=guild, channel=FakeChannel(guild, channel_id), author=fake_user(author_id))
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def defer(self, **kwargs):
+        self.interaction.acked_at = time.perf_counter()
+
+    async def send_message(self, *args, **kwargs):
+        self.interaction.acked_at = time.perf_counter()
+
+class FakeFollowup:
+    def __init__(self):
+        self.sent = 0
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+
+# A button click or slash command by user_id. created_at and acked_at (perf_counter) give the
+# acknowledgement latency; namespace holds the options already filled in, for autocomplete.
+class FakeInteraction:
+    def __init__(self, user_id, guild, channel=None, **namespace):
+        self.user = fake_user(user_id)
+        self.guild = guild
+        self.guild_id = guild.id
+        self.channel = channel
+        self.namespace = SimpleNamespace(**namespace)
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup()
+        self.created_at = time.perf_counter()
+        self.acked_at = None
+
+    async def delete_original_response(self):
+        pass
@@ -0,0 +1,331 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from analytics import percentile
+from benchmarks.fake_discord import API, FakeDiscord
+
+# Load and soak tests of the real bot against a local fake Discord (fake_discord.py). The bot runs
+# unchanged in its own process, with only its REST and gateway URLs pointed at the fake. The harness
+# plays the host and a swarm of players. It starts the quiz with !startquiz, and the players click
+# answer buttons on every question, spread over the first seconds it is open. Once the leaderboard
+# is posted, the harness asks for the export with !sendresults. Each run reports question cycle
+# times, late and dropped acknowledgements, countdown edits, ephemeral replies, rate-limited
+# requests, time to the leaderboard and export, and the bot's memory. Runs go through --players in
+# order, and a soak (--duration) repeats them until the time is up. Runs offline; results are saved
+# as JSON.
+#
+#   python benchmarks/loadtest.py                                      # one run with 5,000 players
+#   python benchmarks/loadtest.py --players 500 2000 5000 --questions 10
+#   python benchmarks/loadtest.py --duration 10800 --latency 0.1       # a three hour soak
+
+DEFAULT_PLAYERS = [5000]
+DEFAULT_OUTPUT = "loadtest_output.json"
+QUIZ = "loadtest"
+FAKE_TOKEN = "loadtest"
+FIRST_PLAYER = 10 ** 15
+OPTIONS = ["A", "B", "C", "D"]
+ACK_DEADLINE = 3.0       # Discord drops interactions that are not acknowledged within three seconds
+ACK_GRACE = 5.0          # seconds after a run for acknowledgements still on their way
+COMMAND_TIMEOUT = 60
+RSS_INTERVAL = 1.0
+
+# Memory of a process in MB from /proc (Linux), or None where that is not available.
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+# Runs the bot in this process against the fake at url.
+def run_bot(url, db_path, role_id):
+    import yarl
+    from discord.gateway import DiscordWebSocket
+    from discord.http import Route
+    import quizbot
+    Route.BASE = url + API
+    DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(url.replace("http", "ws", 1) + "/gateway")
+    config = quizbot.Config(token=FAKE_TOKEN, db_path=db_path, allowed_role_id=role_id)
+    quizbot.create_bot(config).run(config.token, log_level=logging.WARNING)
+    quizbot.shutdown()
+
+def buttons(message):
+    return [button for row in message["components"] for button in row["components"]]
+
+def question_number(message):
+    title = message["embeds"][0].get("title", "") if message["embeds"] else ""
+    head, _, number = title.rpartition(" - Question ")
+    return int(number) if head == QUIZ and number.isdigit() else None
+
+class LoadTest:
+    def __init__(self, fake, questions=5, question_time=20, pause=5, spread=10.0, countdown="live", answer_rate=0.95, correct_rate=0.6, seed=0):
+        self.fake = fake
+        self.questions = questions
+        self.question_time = question_time
+        self.pause = pause
+        self.spread = spread
+        self.countdown = countdown
+        self.answer_rate = answer_rate
+        self.correct_rate = correct_rate
+        self.random = random.Random(seed)
+        self.process = None
+        self.rss = []  # (time, MB) samples of the bot process
+
+    async def start_bot(self, db_path, log):
+        command = [sys.executable, os.path.abspath(__file__), "--bot-child", self.fake.url, "--db", db_path, "--role", str(self.fake.role_id)]
+        self.process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, cwd=ROOT)
+        self.sampler = asyncio.create_task(self.sample_rss())
+        await asyncio.wait_for(self.fake.ready.wait(), COMMAND_TIMEOUT)
+        # Commands are only handled once the bot has seen the guild; retry until it answers.
+        while True:
+            try:
+                await self.command("!ping", lambda m: m["content"].startswith("Pong"), timeout=2)
+                return
+            except asyncio.TimeoutError:
+                if self.process.poll() is not None:
+                    raise RuntimeError(f"the bot exited with code {self.process.returncode}")
+
+    async def stop_bot(self):
+        self.sampler.cancel()
+        if self.process.poll() is None:
+            self.process.send_signal(signal.SIGINT)
+            try:
+                await asyncio.wait_for(asyncio.to_thread(self.process.wait), 30)
+            except asyncio.TimeoutError:
+                self.process.kill()
+
+    async def sample_rss(self):
+        while True:
+            mb = rss_mb(self.process.pid)
+            if mb is not None:
+                self.rss.append((time.monotonic(), mb))
+            await asyncio.sleep(RSS_INTERVAL)
+
+    # Sends a command as the host and returns the first bot message matching expect.
+    async def command(self, text, expect=lambda m: True, timeout=COMMAND_TIMEOUT):
+        await self.fake.send_message(text)
+        deadline = time.monotonic() + timeout
+        while True:
+            event = await asyncio.wait_for(self.fake.events.get(), max(deadline - time.monotonic(), 0))
+            if event.kind == "message" and expect(event.payload):
+                return event
+
+    async def setup(self):
+        await self.command(f"!createquiz {QUIZ}")
+        for i in range(1, self.questions + 1):
+            await self.command(f"!addq {QUIZ} {self.question_time} {i % len(OPTIONS)} Question {i}?|" + "|".join(OPTIONS))
+        await self.command(f"!setpause {QUIZ} {self.pause}")
+        await self.command(f"!setcountdown {QUIZ} {self.countdown}")
+        # Lets the channel's rate limit budget refill, so the first question does not queue behind the setup replies.
+        await asyncio.sleep(self.fake.limiter.window)
+
+    # Every player answers with probability answer_rate, correctly with probability correct_rate, at a
+    # random moment in the first spread seconds after the question was posted.
+    async def swarm(self, message, players, posted):
+        number = question_number(message)
+        custom_ids = [button["custom_id"] for button in buttons(message)]
+        correct = number % len(OPTIONS)
+        clicks = []
+        for player in range(FIRST_PLAYER, FIRST_PLAYER + players):
+            if self.random.random() >= self.answer_rate:
+                continue
+            option = correct if self.random.random() < self.correct_rate else self.random.randrange(len(custom_ids))
+            clicks.append((posted + self.random.random() * self.spread, player, custom_ids[option]))
+        clicks.sort()
+        message_id = int(message["id"])
+        for at, player, custom_id in clicks:
+            delay = at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.fake.click(player, message_id, custom_id)
+        return len(clicks)
+
+    # One quiz run with the given number of players, from !startquiz to the export file.
+    async def run(self, players):
+        fake = self.fake
+        fake.interactions.clear()
+        fake.messages.clear()
+        rate_limited = sum(fake.rate_limited.values())
+        requests = sum(fake.requests.values())
+        started = time.monotonic()
+        rss_start = self.rss[-1][1] if self.rss else None
+        await fake.send_message(f"!startquiz {QUIZ}")
+        posted = {}       # question number -> time posted
+        closed = {}       # question number -> time the buttons were disabled
+        question_ids = {} # message id -> question number
+        swarms = []
+        edits = followups = 0
+        finished_at = leaderboard_at = None
+        while leaderboard_at is None:
+            event = await asyncio.wait_for(fake.events.get(), self.question_time + self.pause + COMMAND_TIMEOUT)
+            message = event.payload
+            if event.kind == "message":
+                number = question_number(message)
+                if number is not None:
+                    posted[number] = event.at
+                    question_ids[message["id"]] = number
+                    swarms.append(asyncio.create_task(self.swarm(message, players, event.at)))
+                # The outbox may merge the completion notice and the leaderboard into one message.
+                if "Quiz completed" in message["content"]:
+                    finished_at = event.at
+                if "Leaderboard (Top" in message["content"]:
+                    leaderboard_at = event.at
+            elif event.kind == "edit" and message["id"] in question_ids:
+                edits += 1
+                if all(button.get("disabled") for button in buttons(message)):
+                    closed[question_ids[message["id"]]] = event.at
+            elif event.kind == "followup":
+                followups += 1
+        clicks = sum(await asyncio.gather(*swarms))
+        export = await self.command(f"!sendresults {QUIZ}", lambda m: bool(m["attachments"]))
+        await asyncio.sleep(ACK_GRACE)
+        ended = time.monotonic()
+        while not fake.events.empty():
+            if fake.events.get_nowait().kind == "followup":
+                followups += 1
+
+        interactions = list(fake.interactions.values())
+        acks = sorted(i.acked_at - i.sent_at for i in interactions if i.acked_at is not None)
+        numbers = sorted(posted)
+        cycles = [posted[b] - posted[a] for a, b in zip(numbers, numbers[1:])]
+        # How long players could answer: the timer starts before the question is posted, so a post held
+        # back by rate limits shortens it.
+        open_times = [closed[n] - posted[n] for n in numbers if n in closed]
+        rss = [mb for at, mb in self.rss if started <= at <= ended]
+        return {
+            "players": players,
+            "questions": len(posted),
+            "clicks": clicks,
+            "acked": len(acks),
+            "dropped_acks": len(interactions) - len(acks),
+            "late_acks": sum(1 for ack in acks if ack > ACK_DEADLINE),
+            "ack_p50_ms": percentile(acks, 50) * 1000 if acks else None,
+            "ack_p99_ms": percentile(acks, 99) * 1000 if acks else None,
+            "ack_max_ms": acks[-1] * 1000 if acks else None,
+            "ephemeral_replies": followups,
+            "question_edits": edits,
+            "cycle_seconds": cycles,
+            "open_min_seconds": min(open_times) if open_times else None,
+            "leaderboard_seconds": leaderboard_at - (finished_at or leaderboard_at),
+            "export_seconds": export.at - leaderboard_at,
+            "export_bytes": export.payload["attachments"][0]["size"],
+            "run_seconds": ended - started,
+            "requests": sum(fake.requests.values()) - requests,
+            "rate_limited": sum(fake.rate_limited.values()) - rate_limited,
+            "rss_start_mb": rss_start,
+            "rss_peak_mb": max(rss) if rss else None,
+            "rss_end_mb": rss[-1] if rss else None
+        }
+
+def report(result):
+    cycles = result["cycle_seconds"]
+    cycle = f"{max(cycles):.2f}s" if cycles else "-"
+    open_min = f"{result['open_min_seconds']:.2f}s" if result["open_min_seconds"] is not None else "-"
+    ack = f"ack p50 {result['ack_p50_ms']:.0f}ms p99 {result['ack_p99_ms']:.0f}ms" if result["acked"] else "no acks"
+    rss = f", rss {result['rss_end_mb']:.0f}MB (peak {result['rss_peak_mb']:.0f}MB)" if result["rss_end_mb"] is not None else ""
+    return (
+        f"{result['players']:>6} players: {result['clicks']} clicks, {ack}, {result['late_acks']} late, "
+        f"{result['dropped_acks']} dropped, {result['ephemeral_replies']} replies, {result['question_edits']} edits, "
+        f"max cycle {cycle}, min open {open_min}, leaderboard {result['leaderboard_seconds']:.2f}s, export {result['export_seconds']:.2f}s, "
+        f"{result['rate_limited']} rate limited{rss}"
+    )
+
+# Runs the player counts in order (repeating them until duration seconds have passed, if given)
+# against one bot process. Returns the results of every run.
+async def load_test(players, db_path, log, duration=0, latency=0.05, jitter=0.02, channel_limit=(5, 5.0), on_result=None, **options):
+    fake = FakeDiscord(latency, jitter, channel_limit, options.get("seed", 0))
+    await fake.start()
+    test = LoadTest(fake, **options)
+    results = []
+    try:
+        await test.start_bot(db_path, log)
+        await test.setup()
+        started = time.monotonic()
+        while True:
+            for count in players:
+                result = await test.run(count)
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+            if time.monotonic() - started >= duration:
+                break
+    finally:
+        if test.process is not None:
+            await test.stop_bot()
+        await fake.stop()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and soak test the bot against a local fake Discord.")
+    parser.add_argument("--players", type=int, nargs="+", default=DEFAULT_PLAYERS, help="players per run; several values ramp up run by run")
+    parser.add_argument("--duration", type=float, default=0, help="repeat the runs until this many seconds have passed (soak)")
+    parser.add_argument("--questions", type=int, default=5, help="questions per run")
+    parser.add_argument("--question-time", type=int, default=20, help="seconds each question stays open")
+    parser.add_argument("--pause", type=int, default=5, help="seconds between questions")
+    parser.add_argument("--spread", type=float, default=10.0, help="players answer within this many seconds of the question")
+    parser.add_argument("--countdown", default="live", help="countdown mode: timestamp, live or \"milestones 10 5 3\"")
+    parser.add_argument("--answer-rate", type=float, default=0.95, help="share of players answering each question")
+    parser.add_argument("--correct-rate", type=float, default=0.6, help="share of answers that are correct")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every REST call")
+    parser.add_argument("--jitter", type=float, default=0.02, help="up to this many more seconds per REST call")
+    parser.add_argument("--rate-limit", type=float, nargs=2, default=[5, 5.0], metavar=("REQUESTS", "SECONDS"), help="per-channel budget of each message route")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to save the results as JSON")
+    parser.add_argument("--bot-child", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--role", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.bot_child:
+        run_bot(args.bot_child, args.db, args.role)
+        return
+    options = {
+        "questions": args.questions, "question_time": args.question_time, "pause": args.pause, "spread": args.spread,
+        "countdown": args.countdown, "answer_rate": args.answer_rate, "correct_rate": args.correct_rate, "seed": args.seed
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "bot.log")
+        with open(log_path, "w") as log:
+            try:
+                results = asyncio.run(load_test(
+                    args.players, os.path.join(tmp, "loadtest.db"), log, args.duration, args.latency, args.jitter,
+                    (int(args.rate_limit[0]), args.rate_limit[1]), lambda result: print(report(result), flush=True), **options
+                ))
+            except BaseException:
+                with open(log_path) as f:
+                    print(f"Bot output:\n{f.read()}", file=sys.stderr)
+                raise
+    ends = [result["rss_end_mb"] for result in results if result["rss_end_mb"] is not None]
+    run = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": dict(options, players=args.players, duration=args.duration, latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit),
+        "rss_growth_mb": ends[-1] - ends[0] if ends else None,
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(run, f, indent=2)
+    if ends:
+        print(f"Bot memory went from {ends[0]:.0f}MB after the first run to {ends[-1]:.0f}MB after the last")
+    print(f"Saved {args.output}")
+
+if __name__ == "__main__":
+    main()
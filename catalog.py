@@ -0,0 +1,183 @@
+import itertools
+import time
+from collections import OrderedDict
+from functools import partial
+
+from leaderboard import Leaderboard
+from search import NameIndex
+from storage import LazyTable
+
+# Per-guild quiz catalog. Each guild only sees its own quizzes, settings and results, and a guild's
+# indexes are read from the store the first time the guild is used. Every change is written through
+# to the store, so an idle guild can be dropped from memory at any time and loaded again on its next
+# command. Guilds are dropped least recently used first once the rows cached by all loaded guilds
+# (questions, leaderboard entries and participants) exceed max_rows.
+
+DEFAULT_MAX_ROWS = 500000
+
+# Aggregate leaderboards, kept alongside each quiz's last-run leaderboard: every finished run adds
+# its scores to the quiz's all-time board, the guild's all-time board and the current season's
+# board. Seasons are calendar months unless the guild names its current season (!setseason).
+GUILD_BOARD = "guild"
+
+def quiz_board(quiz_name):
+    return "quiz:" + quiz_name
+
+def season_board(season):
+    return "season:" + season
+
+# Versions come from one counter, so a guild loaded again after eviction never reuses an old version.
+versions = itertools.count(1)
+
+class GuildCatalog:
+    def __init__(self, store, guild_id):
+        self.store = store
+        self.guild_id = guild_id
+        self.loaded_version = next(versions)   # version of every quiz not changed since loading
+        self.guild_version = self.loaded_version  # changes whenever any quiz of the guild changes
+        self.quiz_versions = {}                # quiz_name -> version of its last change
+        self.settings = store.load_settings(guild_id)  # settings[quiz_name] = { "shuffle": bool, ... }
+        self.question_counts = store.load_question_counts(guild_id)  # counts as of loading, for quizzes not loaded yet
+        self.quizzes = LazyTable(self.settings, partial(store.load_questions, guild_id), self.replace_questions, self.delete_quiz)
+        self.last_question_info = LazyTable(store.load_last_question_names(guild_id), partial(store.load_last_question, guild_id), partial(store.save_last_question, guild_id))
+        self.leaderboards = LazyTable(store.load_leaderboard_names(guild_id), lambda name: Leaderboard(store.load_leaderboard(guild_id, name)), lambda name, scores: store.save_leaderboard(guild_id, name, scores.scores))
+        self.exports = LazyTable(store.load_export_names(guild_id), partial(store.load_export, guild_id), lambda name, export: store.save_export(guild_id, name, *export))
+        self.participants = LazyTable(store.load_participant_names(guild_id), partial(store.load_participants, guild_id), partial(store.save_participants, guild_id))
+        self.aggregates = LazyTable(store.load_aggregate_names(guild_id), lambda board: Leaderboard(store.load_aggregate(guild_id, board)))
+        self.season_name = store.load_season(guild_id)  # None: seasons are calendar months
+        self.names = NameIndex(self.settings)  # quiz names, for autocomplete
+        self.question_indexes = {}             # quiz_name -> (version, NameIndex of question labels)
+
+    # Marks a quiz as changed, e.g. so paged listings of it are rendered again.
+    def touch(self, quiz_name):
+        self.guild_version = self.quiz_versions[quiz_name] = next(versions)
+
+    def version(self, quiz_name=None):
+        if quiz_name is None:
+            return self.guild_version
+        return self.quiz_versions.get(quiz_name, self.loaded_version)
+
+    def save_settings(self, quiz_name):
+        self.touch(quiz_name)
+        self.store.save_settings(self.guild_id, quiz_name, self.settings[quiz_name])
+
+    def save_questions(self, quiz_name, questions, start=0):
+        self.touch(quiz_name)
+        self.store.save_questions(self.guild_id, quiz_name, questions, start)
+
+    # Also called when a quiz is created, with its empty question list.
+    def replace_questions(self, quiz_name, questions):
+        self.touch(quiz_name)
+        self.names.add(quiz_name)
+        self.store.replace_questions(self.guild_id, quiz_name, questions)
+
+    def delete_quiz(self, quiz_name):
+        self.touch(quiz_name)
+        self.names.remove(quiz_name)
+        self.question_indexes.pop(quiz_name, None)
+        self.store.delete_quiz(self.guild_id, quiz_name)
+        if quiz_board(quiz_name) in self.aggregates:
+            del self.aggregates[quiz_board(quiz_name)]
+            self.store.delete_aggregate(self.guild_id, quiz_board(quiz_name))
+
+    def record_answers(self, quiz_name, session_id, question_index, rows):
+        self.store.record_answers(self.guild_id, quiz_name, session_id, question_index, rows)
+
+    def compact_answers(self, quiz_name):
+        self.store.compact_answers(self.guild_id, quiz_name)
+
+    def start_checkpoint(self, session_id, channel_id, quiz_name, questions, state):
+        self.store.start_checkpoint(self.guild_id, session_id, channel_id, quiz_name, questions, state)
+
+    def save_checkpoint(self, session_id, state, awards=None):
+        self.store.save_checkpoint(self.guild_id, session_id, state, awards)
+
+    def delete_checkpoint(self, session_id):
+        self.store.delete_checkpoint(self.guild_id, session_id)
+
+    def session_scores(self, session_id):
+        return self.store.load_session_scores(self.guild_id, session_id)
+
+    def session_answers(self, quiz_name, session_id):
+        return self.store.load_session_answers(self.guild_id, quiz_name, session_id)
+
+    def season(self):
+        return self.season_name or time.strftime("%Y-%m")
+
+    def set_season(self, name):
+        self.season_name = name
+        self.store.save_season(self.guild_id, name)
+
+    # Adds a finished run's scores to the aggregate boards. Each board is loaded once and then
+    # updated in place, so the cost depends on the run's participants, not on past runs.
+    def add_results(self, quiz_name, scores):
+        for board in (quiz_board(quiz_name), GUILD_BOARD, season_board(self.season())):
+            if board not in self.aggregates:
+                self.aggregates[board] = Leaderboard()
+            self.aggregates[board].update(scores)
+            self.store.add_aggregate(self.guild_id, board, scores)
+
+    # Index of the quiz's questions as label(number, question) strings, rebuilt when the quiz changes.
+    def question_index(self, quiz_name, label):
+        version = self.version(quiz_name)
+        cached = self.question_indexes.get(quiz_name)
+        if cached is None or cached[0] != version:
+            cached = self.question_indexes[quiz_name] = (version, NameIndex(label(number, question) for number, question in enumerate(self.quizzes[quiz_name], start=1)))
+        return cached[1]
+
+    def question_count(self, quiz_name):
+        questions = self.quizzes.peek(quiz_name)
+        return len(questions) if questions is not None else self.question_counts.get(quiz_name, 0)
+
+    def cached_rows(self):
+        return (
+            sum(len(questions) for questions in self.quizzes.cache.values())
+            + sum(len(scores) for scores in self.leaderboards.cache.values())
+            + sum(len(user_ids) for user_ids in self.participants.cache.values())
+            + sum(len(scores) for scores in self.aggregates.cache.values())
+        )
+
+class Catalog:
+    # pinned(guild_id) -> True keeps a guild loaded, e.g. while it has a quiz running.
+    def __init__(self, store, max_rows=DEFAULT_MAX_ROWS, pinned=None):
+        self.store = store
+        self.max_rows = max_rows
+        self.pinned = pinned or (lambda guild_id: False)
+        self.guilds = OrderedDict()  # guild_id -> GuildCatalog, least recently used first
+        self.rows = {}               # guild_id -> cached_rows() when the guild was last used
+        self.last_guild_id = None
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.guilds)
+
+    def __contains__(self, guild_id):
+        return guild_id in self.guilds
+
+    # The guild's catalog, loading it if needed. Row counts are refreshed for this guild and the one
+    # used before it (whose command may have loaded more since), so the total is approximate.
+    def get(self, guild_id):
+        catalog = self.guilds.get(guild_id)
+        if catalog is None:
+            catalog = self.guilds[guild_id] = GuildCatalog(self.store, guild_id)
+        self.guilds.move_to_end(guild_id)
+        for refreshed in {guild_id, self.last_guild_id}:
+            if refreshed in self.guilds:
+                self.rows[refreshed] = self.guilds[refreshed].cached_rows()
+        self.last_guild_id = guild_id
+        self.evict(keep=guild_id)
+        return catalog
+
+    def cached_rows(self):
+        return sum(self.rows.values())
+
+    def evict(self, keep=None):
+        total = self.cached_rows()
+        for guild_id in list(self.guilds):
+            if total <= self.max_rows:
+                break
+            if guild_id == keep or self.pinned(guild_id):
+                continue
+            del self.guilds[guild_id]
+            total -= self.rows.pop(guild_id, 0)
+            self.evictions += 1
@@ -0,0 +1,85 @@
+import asyncio
+import csv
+import io
+import time
+
+# Results export. Files are built in memory by a worker process, so writing a large sheet never
+# holds the event loop; openpyxl is only imported in the worker, and the process pool machinery on the
+# first export.
+
+EXPORT_FORMATS = ["xlsx", "csv"]
+EXPORT_WORKERS = 1
+STALL_PROBE_INTERVAL = 0.01
+
+HEADER = ["User ID", "Username", "Score"]
+
+_pool = None
+
+def export_pool():
+    global _pool
+    if _pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+        _pool = ProcessPoolExecutor(max_workers=EXPORT_WORKERS)
+    return _pool
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+# rows: [(user_id, username, score), ...] in rank order. Returns the file contents as bytes.
+def build_results(rows, fmt):
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(HEADER)
+        writer.writerows((str(user_id), username, score) for user_id, username, score in rows)
+        return buffer.getvalue().encode("utf-8-sig")
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Quiz Results")
+    ws.append(HEADER)
+    for user_id, username, score in rows:
+        ws.append([str(user_id), username, score])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+def results_filename(quiz_name, fmt):
+    return f"{quiz_name}_results.{fmt}"
+
+# Measures how late the event loop wakes up while something else runs; the worst delay is the stall.
+class StallProbe:
+    def __init__(self, interval=STALL_PROBE_INTERVAL):
+        self.interval = interval
+        self.max_stall = 0.0
+        self.task = None
+
+    async def run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.max_stall = max(self.max_stall, time.perf_counter() - start - self.interval)
+
+    def __enter__(self):
+        self.task = asyncio.create_task(self.run())
+        return self
+
+    def __exit__(self, *exc):
+        self.task.cancel()
+
+# Builds the export in the worker pool. Returns (filename, data, stats).
+async def export_results(quiz_name, rows, fmt):
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    with StallProbe() as probe:
+        data = await loop.run_in_executor(export_pool(), build_results, rows, fmt)
+    stats = {
+        "rows": len(rows),
+        "format": fmt,
+        "bytes": len(data),
+        "seconds": time.perf_counter() - started,
+        "max_loop_stall": probe.max_stall
+    }
+    return results_filename(quiz_name, fmt), data, stats
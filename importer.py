@@ -0,0 +1,133 @@
+import asyncio
+import csv
+import io
+import json
+import os
+
+from questions import MAX_DURATION, make_question
+
+# Question-bank import. Sources are read as text streams and parsed row by row in a worker thread,
+# IMPORT_BATCH_SIZE questions at a time, so a large file never sits in memory as parsed rows and the
+# event loop only appends and saves finished batches. Bad rows are reported with their line number.
+#
+# Every format carries the row bulkadd accepts: duration, correct answer index (0-based), question,
+# then the options.
+#   pipe:  20|1|What is 2+2?|3|4|5
+#   csv:   20,1,What is 2+2?,3,4,5
+#   jsonl: {"duration": 20, "correct_answer_index": 1, "question": "What is 2+2?", "options": ["3", "4", "5"]}
+#          or the row as a list: [20, 1, "What is 2+2?", "3", "4", "5"]
+
+IMPORT_FORMATS = ["pipe", "csv", "jsonl"]
+IMPORT_BATCH_SIZE = 1000
+FORMAT_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+class RowError(ValueError):
+    pass
+
+def detect_format(filename):
+    return FORMAT_EXTENSIONS.get(os.path.splitext(filename)[1].lower(), "pipe")
+
+# fields: [duration, correct_index, question, option1, option2, ...]
+def parse_row(fields):
+    if len(fields) < 4:
+        raise RowError("expected duration, correct index, question and at least one option")
+    try:
+        duration = int(str(fields[0]).strip())
+    except ValueError:
+        raise RowError(f"duration {fields[0]!r} is not a whole number")
+    try:
+        correct_index = int(str(fields[1]).strip())
+    except ValueError:
+        raise RowError(f"correct index {fields[1]!r} is not a whole number")
+    question_text = str(fields[2]).strip()
+    options = [str(p).strip() for p in fields[3:] if str(p).strip()]
+    if duration < 1:
+        raise RowError(f"duration {duration} is less than 1 second")
+    if duration > MAX_DURATION:
+        raise RowError(f"duration {duration} is more than {MAX_DURATION} seconds")
+    if not (0 <= correct_index < len(options)):
+        raise RowError(f"correct index {correct_index} is not between 0 and {len(options) - 1}")
+    return make_question(question_text, options, correct_index, duration)
+
+def json_fields(line):
+    try:
+        value = json.loads(line)
+    except ValueError as e:
+        raise RowError(f"invalid JSON ({e.msg})")
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        options = value.get("options")
+        if not isinstance(options, list):
+            raise RowError("\"options\" must be a list")
+        return [value.get("duration", 20), value.get("correct_answer_index", value.get("correct_index")), value.get("question", "")] + options
+    raise RowError("expected a JSON object or list")
+
+# Yields (line_number, question, error) for every non-blank row of a text stream; exactly one of
+# question and error is None.
+def iter_rows(stream, fmt):
+    if fmt == "csv":
+        reader = csv.reader(stream)
+        line_number = 1
+        for fields in reader:
+            if any(field.strip() for field in fields):
+                try:
+                    yield line_number, parse_row(fields), None
+                except RowError as e:
+                    yield line_number, None, str(e)
+            # A quoted field may span lines; the next row starts after them.
+            line_number = reader.line_num + 1
+        return
+    for line_number, line in enumerate(stream, start=1):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        try:
+            fields = json_fields(line) if fmt == "jsonl" else line.split("|")
+            yield line_number, parse_row(fields), None
+        except RowError as e:
+            yield line_number, None, str(e)
+
+# Parses up to size questions. Returns (questions, errors, finished).
+def read_batch(rows, size):
+    questions = []
+    errors = []
+    for line_number, question, error in rows:
+        if error is None:
+            questions.append(question)
+        else:
+            errors.append((line_number, error))
+        if len(questions) >= size:
+            return questions, errors, False
+    return questions, errors, True
+
+def open_text(data):
+    return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", errors="replace", newline="")
+
+# Resolves a file name inside import_dir, refusing anything outside it. None if not allowed.
+def local_path(import_dir, filename):
+    if not import_dir:
+        return None
+    root = os.path.realpath(import_dir)
+    path = os.path.realpath(os.path.join(root, filename))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        return None
+    return path
+
+# Streams questions from a text stream into add_batch(questions), one batch at a time.
+# Returns (added, errors) with errors as [(line_number, message), ...].
+async def import_questions(stream, fmt, add_batch, batch_size=IMPORT_BATCH_SIZE):
+    rows = iter_rows(stream, fmt)
+    added = 0
+    errors = []
+    finished = False
+    while not finished:
+        questions, batch_errors, finished = await asyncio.to_thread(read_batch, rows, batch_size)
+        errors.extend(batch_errors)
+        if questions:
+            add_batch(questions)
+            added += len(questions)
+    return added, errors
+
+def error_report(errors):
+    return "".join(f"Line {line_number}: {message}\n" for line_number, message in errors)
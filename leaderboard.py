@@ -0,0 +1,67 @@
+from bisect import bisect_left, insort
+
+# Score table that keeps its ranking without full re-sorts. Entries are kept in a list sorted by
+# (-score, user_id). Adding points only updates the score dict and remembers which users changed;
+# the next top-N or rank query folds those changes into the sorted list: one by one for a few
+# users, or by merging the re-sorted changes into the untouched entries for many.
+class Leaderboard:
+    # Up to this many pending users, entries are moved one by one; above it the changes are merged in one pass.
+    MERGE_THRESHOLD = 64
+
+    def __init__(self, scores=None):
+        self.scores = dict(scores or {})
+        self._order = sorted((-score, user_id) for user_id, score in self.scores.items())
+        self._pending = {}  # user_id -> score currently in _order (None if not in it yet)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __contains__(self, user_id):
+        return user_id in self.scores
+
+    def get(self, user_id, default=None):
+        return self.scores.get(user_id, default)
+
+    # Adds points to a single user (0 just registers them).
+    def add(self, user_id, points):
+        old = self.scores.get(user_id)
+        if old is not None and points == 0:
+            return
+        if user_id not in self._pending:
+            self._pending[user_id] = old
+        self.scores[user_id] = (old or 0) + points
+
+    # Adds points for many users at once, e.g. the awards of one question.
+    def update(self, awards):
+        for user_id, points in awards.items():
+            self.add(user_id, points)
+
+    def _settle(self):
+        pending = self._pending
+        if not pending:
+            return
+        self._pending = {}
+        if len(pending) <= self.MERGE_THRESHOLD:
+            for user_id, old in pending.items():
+                if old is not None:
+                    del self._order[bisect_left(self._order, (-old, user_id))]
+                insort(self._order, (-self.scores[user_id], user_id))
+            return
+        # Both lists are sorted, so sorted() only merges two runs: O(n + k log k) for k changed users.
+        changed = sorted((-self.scores[user_id], user_id) for user_id in pending)
+        kept = [entry for entry in self._order if entry[1] not in pending]
+        self._order = sorted(kept + changed)
+
+    # Returns [(user_id, score), ...] for the best n entries (all entries if n is None).
+    def top(self, n=None):
+        self._settle()
+        entries = self._order if n is None else self._order[:max(n, 0)]
+        return [(user_id, -neg_score) for neg_score, user_id in entries]
+
+    # 1-based rank; users with equal scores share a rank. None if the user has no entry.
+    def rank(self, user_id):
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        self._settle()
+        return bisect_left(self._order, (-score,)) + 1
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+import discord
+
+# Name and mention cache for leaderboards and exports, keyed by (guild_id, user_id).
+# Filled from the users seen in interactions; misses are looked up in the guild's member cache and
+# then fetched from the gateway in bulk. Entries expire after ttl seconds and the least recently
+# used ones are evicted past max_entries.
+
+QUERY_CHUNK = 100  # the gateway accepts at most 100 user ids per member request
+
+class MemberCache:
+    def __init__(self, max_entries=100000, ttl=6 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # (guild_id, user_id) -> (name, mention, expires_at)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def remember(self, guild_id, user):
+        key = (guild_id, user.id)
+        self.entries[key] = (user.name, user.mention, time.monotonic() + self.ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    # (name, mention) or None if unknown or expired.
+    def get(self, guild_id, user_id):
+        key = (guild_id, user_id)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[0], entry[1]
+
+    # Returns { user_id: (name, mention) } for every id that could be resolved. In direct messages
+    # guild is None and only the users seen in interactions there are known.
+    async def resolve(self, guild, user_ids):
+        found = {}
+        missing = []
+        for user_id in user_ids:
+            entry = self.get(guild.id if guild is not None else None, user_id)
+            if entry is None and guild is not None:
+                member = guild.get_member(user_id)
+                if member is not None:
+                    self.remember(guild.id, member)
+                    entry = (member.name, member.mention)
+            if entry is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = entry
+        if guild is None:
+            return found
+        for i in range(0, len(missing), QUERY_CHUNK):
+            chunk = missing[i:i + QUERY_CHUNK]
+            try:
+                members = await guild.query_members(user_ids=chunk, limit=len(chunk), cache=True)
+            except (asyncio.TimeoutError, discord.ClientException, discord.HTTPException):
+                break
+            for member in members:
+                self.remember(guild.id, member)
+                found[member.id] = (member.name, member.mention)
+        return found
+
+# Display name for a user id, using a resolve() result.
+def display_name(names, user_id):
+    entry = names.get(user_id)
+    return entry[0] if entry else f"Unknown({user_id})"
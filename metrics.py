@@ -0,0 +1,169 @@
+import asyncio
+import math
+import time
+import traceback
+from bisect import bisect_left
+
+# In-process metrics with Prometheus text output. Hot paths record into plain counters and fixed-bucket
+# histograms (a bisect and two additions per observation), gauges are read only when scraped, and
+# the optional HTTP endpoint is a few lines on asyncio's own server, so instrumentation can stay on.
+#
+#   metrics.inc("quizbot_commands_total", (("command", "ping"),))
+#   metrics.observe("quizbot_scoring_seconds", 0.004, (("strategy", "streak"),))
+#   metrics.gauge("quizbot_active_sessions", "Running quiz sessions.", lambda: len(sessions))
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LOOP_LAG_INTERVAL = 0.5
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    # Estimated q-quantile (0..1), interpolated within its bucket like Prometheus' histogram_quantile.
+    # None without observations; values above the last bucket report the last bucket's bound.
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+def format_value(value):
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+class Metrics:
+    def __init__(self):
+        self.started = time.time()
+        self.types = {}       # name -> (type, help)
+        self.counters = {}    # name -> {labels: value}
+        self.histograms = {}  # name -> {labels: Histogram}
+        self.gauges = {}      # name -> function returning a value or {labels: value}
+        self.loop_lag = None  # latest watch_loop_lag() reading
+
+    # Labels are a tuple of (name, value) pairs; the same metric always uses the same label names.
+    def describe(self, name, kind, help_text):
+        self.types[name] = (kind, help_text)
+
+    def inc(self, name, labels=(), value=1):
+        series = self.counters.setdefault(name, {})
+        series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name, value, labels=()):
+        series = self.histograms.setdefault(name, {})
+        histogram = series.get(labels)
+        if histogram is None:
+            histogram = series[labels] = Histogram()
+        histogram.observe(value)
+
+    def gauge(self, name, help_text, read):
+        self.describe(name, "gauge", help_text)
+        self.gauges[name] = read
+
+    def histogram(self, name, labels=()):
+        return self.histograms.get(name, {}).get(labels)
+
+    # Every series of a histogram merged into one, e.g. all commands together.
+    def merged(self, name):
+        merged = None
+        for histogram in self.histograms.get(name, {}).values():
+            if merged is None:
+                merged = Histogram(histogram.buckets)
+            merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+            merged.count += histogram.count
+            merged.sum += histogram.sum
+        return merged
+
+    def total(self, name):
+        return sum(self.counters.get(name, {}).values())
+
+    def header(self, lines, name, kind):
+        help_text = self.types.get(name, (kind, ""))[1]
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    # The Prometheus text exposition format (version 0.0.4).
+    def render(self):
+        lines = []
+        for name, series in self.counters.items():
+            self.header(lines, name, "counter")
+            for labels, value in series.items():
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        for name, series in self.histograms.items():
+            self.header(lines, name, "histogram")
+            for labels, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (math.inf,), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', format_value(float(bound))),))} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {format_value(histogram.sum)}")
+                lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+        for name, read in self.gauges.items():
+            try:
+                value = read()
+            except Exception:
+                traceback.print_exc()
+                continue
+            self.header(lines, name, "gauge")
+            for labels, v in (value.items() if isinstance(value, dict) else [((), value)]):
+                lines.append(f"{name}{format_labels(labels)} {format_value(v)}")
+        return "\n".join(lines) + "\n"
+
+# Measures how late the event loop wakes up from a sleep of interval seconds, forever.
+async def watch_loop_lag(metrics, interval=LOOP_LAG_INTERVAL):
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        metrics.loop_lag = max(loop.time() - started - interval, 0.0)
+        metrics.observe("quizbot_event_loop_lag_seconds", metrics.loop_lag)
+
+# Serves GET /metrics on host:port. Returns the asyncio server.
+async def serve_metrics(metrics, host, port):
+    async def handle(reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readline(), 5)
+            while (await asyncio.wait_for(reader.readline(), 5)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", metrics.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,226 @@
+import asyncio
+import heapq
+import itertools
+import time
+import traceback
+from collections import deque
+
+# Outbound message scheduler. Every bot message goes through one queue per channel, drained by one
+# task per channel:
+# - messages leave a channel in the order they were posted;
+# - sends from all channels also share a global budget; when it is used up, channels waiting with
+#   live quiz traffic (questions, answers, results) go before channels waiting with command replies;
+# - adjacent plain-text messages still waiting in the queue are merged into one message;
+# - text longer than Discord's limit is split at line breaks instead of mid-word;
+# - sends and edits each keep their own per-channel budget (route), so the bot stays under
+#   Discord's per-channel limits instead of running into 429s when many sessions share the bot.
+# Per-channel queue depth and wait times are kept for !sendqueue; observe(seconds), if given, gets
+# every sent message's time from post() to delivery, rate-limit waits included.
+
+PRIORITY_LIVE = 0
+PRIORITY_INFO = 1
+
+MESSAGE_LIMIT = 2000
+ROUTE_BUDGETS = {"send": (5, 5.0), "edit": (4, 5.0)}  # route -> (requests, per seconds) per channel
+GLOBAL_BUDGET = (50, 1.0)  # (requests, per seconds) for sends across all channels
+GLOBAL_POLL = 0.05  # how often a channel waiting behind another one rechecks the global budget
+IDLE_TIMEOUT = 60  # a channel's queue is dropped after this long without messages
+
+# Splits text into chunks of at most limit characters, at line breaks where possible.
+def split_content(content, limit=MESSAGE_LIMIT):
+    chunks = []
+    current = ""
+    for line in content.splitlines(keepends=True):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if len(current) + len(line) > limit:
+            chunks.append(current)
+            current = ""
+        current += line
+    if current:
+        chunks.append(current)
+    return [chunk.rstrip("\n") or chunk for chunk in chunks]
+
+class OutgoingMessage:
+    __slots__ = ("content", "kwargs", "futures", "queued_at")
+
+    def __init__(self, content, kwargs, futures, queued_at):
+        self.content = content
+        self.kwargs = kwargs
+        self.futures = futures
+        self.queued_at = queued_at  # one entry per merged message
+
+    def mergeable(self):
+        return not self.kwargs and self.content is not None
+
+class ChannelQueue:
+    def __init__(self, channel):
+        self.channel = channel
+        self.guild_id = channel.guild.id if getattr(channel, "guild", None) else 0
+        self.messages = deque()  # (priority, OutgoingMessage) in posting order
+        self.wakeup = asyncio.Event()
+        self.task = None
+        self.sent = 0
+        self.merged = 0
+        self.waited = 0  # messages included in total_wait
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def __len__(self):
+        return len(self.messages)
+
+class Outbox:
+    def __init__(self, budgets=None, observe=None, global_budget=GLOBAL_BUDGET):
+        self.budgets = dict(ROUTE_BUDGETS if budgets is None else budgets)
+        self.global_budget = global_budget
+        self.observe = observe
+        self.queues = {}      # channel_id -> ChannelQueue
+        self.route_log = {}   # (channel_id, route) -> deque(request timestamps within the route's window)
+        self.global_log = deque()
+        self.waiting = []     # heap of (priority, sequence) for channels waiting on the global budget
+        self.sequence = itertools.count()
+
+    # Queues a message. The returned future resolves to the sent Message (the last one if the text was
+    # split, the merged one if it was merged); it does not have to be awaited.
+    def post(self, channel, content=None, priority=PRIORITY_INFO, **kwargs):
+        queue = self.queues.get(channel.id)
+        if queue is None:
+            queue = self.queues[channel.id] = ChannelQueue(channel)
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())  # errors are printed by the worker
+        parts = split_content(content) if content and len(content) > MESSAGE_LIMIT else [content]
+        now = time.monotonic()
+        for i, part in enumerate(parts):
+            last = i == len(parts) - 1
+            message = OutgoingMessage(part, kwargs if last else {}, [future] if last else [], [now])
+            queue.messages.append((priority, message))
+        queue.wakeup.set()
+        if queue.task is None or queue.task.done():
+            queue.task = asyncio.create_task(self.run(queue))
+        return future
+
+    # Records a request on a channel's route. Returns False if the route's budget for the current
+    # window is used up; force records it regardless.
+    def reserve(self, channel_id, route, force=False):
+        budget, window = self.budgets[route]
+        now = time.monotonic()
+        log = self.route_log.setdefault((channel_id, route), deque())
+        while log and now - log[0] >= window:
+            log.popleft()
+        if not force and len(log) >= budget:
+            return False
+        log.append(now)
+        return True
+
+    # Seconds until the route has budget again (0 if it has now).
+    def delay(self, channel_id, route):
+        budget, window = self.budgets[route]
+        log = self.route_log.get((channel_id, route))
+        if not log or len(log) < budget:
+            return 0
+        return max(log[-budget] + window - time.monotonic(), 0)
+
+    # Seconds until the global send budget has room again (0 if it has now).
+    def global_delay(self):
+        budget, window = self.global_budget
+        now = time.monotonic()
+        while self.global_log and now - self.global_log[0] >= window:
+            self.global_log.popleft()
+        if len(self.global_log) < budget:
+            return 0
+        return max(self.global_log[-budget] + window - now, 0)
+
+    # Waits for a slot in the global send budget. Waiting channels are served by priority, then in
+    # the order they started waiting.
+    async def acquire_global(self, priority):
+        if not self.waiting and not self.global_delay():
+            self.global_log.append(time.monotonic())
+            return
+        ticket = (priority, next(self.sequence))
+        heapq.heappush(self.waiting, ticket)
+        try:
+            while self.waiting[0] != ticket or self.global_delay():
+                await asyncio.sleep(max(self.global_delay(), GLOBAL_POLL))
+            self.global_log.append(time.monotonic())
+        finally:
+            self.waiting.remove(ticket)
+            heapq.heapify(self.waiting)
+
+    async def run(self, queue):
+        channel_id = queue.channel.id
+        loop = asyncio.get_running_loop()
+        while True:
+            if not queue.messages:
+                queue.wakeup.clear()
+                timer = loop.call_later(IDLE_TIMEOUT, queue.wakeup.set)
+                try:
+                    await queue.wakeup.wait()
+                finally:
+                    timer.cancel()
+                if not queue.messages:
+                    if self.queues.get(channel_id) is queue:
+                        del self.queues[channel_id]
+                        for route in self.budgets:
+                            self.route_log.pop((channel_id, route), None)
+                    return
+                continue
+            while not self.reserve(channel_id, "send"):
+                await asyncio.sleep(self.delay(channel_id, "send"))
+            priority, message = queue.messages.popleft()
+            message, priority = self.merge(queue, message, priority)
+            await self.acquire_global(priority)
+            now = time.monotonic()
+            for queued_at in message.queued_at:
+                wait = now - queued_at
+                queue.total_wait += wait
+                queue.max_wait = max(queue.max_wait, wait)
+            queue.waited += len(message.queued_at)
+            try:
+                sent = await queue.channel.send(message.content, **message.kwargs)
+            except Exception as e:
+                traceback.print_exc()
+                for future in message.futures:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                queue.sent += 1
+                if self.observe is not None:
+                    delivered = time.monotonic()
+                    for queued_at in message.queued_at:
+                        self.observe(delivered - queued_at)
+                for future in message.futures:
+                    if not future.done():
+                        future.set_result(sent)
+
+    # Folds the following queued plain-text messages into message while they fit in one message.
+    # Returns the message and the highest priority among the messages it now carries.
+    def merge(self, queue, message, priority):
+        if not message.mergeable():
+            return message, priority
+        while queue.messages:
+            following_priority, following = queue.messages[0]
+            if not following.mergeable() or len(message.content) + 1 + len(following.content) > MESSAGE_LIMIT:
+                break
+            queue.messages.popleft()
+            message = OutgoingMessage(message.content + "\n" + following.content, {}, message.futures + following.futures, message.queued_at + following.queued_at)
+            priority = min(priority, following_priority)
+            queue.merged += 1
+        return message, priority
+
+    # Queue stats per channel: depth, messages sent, messages merged away, average and max wait in seconds.
+    def stats(self, guild_id=None):
+        return {
+            channel_id: {
+                "depth": len(queue),
+                "sent": queue.sent,
+                "merged": queue.merged,
+                "avg_wait": queue.total_wait / queue.waited if queue.waited else 0.0,
+                "max_wait": queue.max_wait
+            }
+            for channel_id, queue in self.queues.items()
+            if guild_id is None or queue.guild_id == guild_id
+        }
@@ -0,0 +1,59 @@
+import math
+from collections import OrderedDict
+
+# Paged listings. A listing is registered with a page size, a function returning its entries (any
+# sequence, sliced per page) and a version function; only the requested page is rendered, and
+# rendered pages are cached until the listing's version changes (e.g. the quiz is edited).
+
+PAGE_CACHE_SIZE = 512
+
+class Listing:
+    __slots__ = ("name", "page_size", "entries", "version", "render")
+
+    def __init__(self, name, page_size, entries, version, render):
+        self.name = name
+        self.page_size = page_size
+        self.entries = entries    # entries(catalog, key) -> sequence
+        self.version = version    # version(catalog, key) -> hashable, changes whenever the entries do
+        self.render = render      # render(catalog, key, entries, first, page, pages) -> send kwargs
+
+class Pager:
+    def __init__(self, cache_size=PAGE_CACHE_SIZE):
+        self.listings = {}
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # (listing, guild_id, key, page) -> (version, kwargs, pages)
+        self.hits = 0
+        self.misses = 0
+
+    def listing(self, name, page_size, entries, version):
+        def register(render):
+            self.listings[name] = Listing(name, page_size, entries, version, render)
+            return render
+        return register
+
+    # Returns (send kwargs, page, pages) for page (0-based, clamped to the existing pages).
+    def render(self, name, catalog, key, page):
+        listing = self.listings[name]
+        version = listing.version(catalog, key)
+        cache_key = (name, catalog.guild_id, key, page)
+        cached = self.cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            self.hits += 1
+            self.cache.move_to_end(cache_key)
+            return cached[1], page, cached[2]
+        self.misses += 1
+        entries = listing.entries(catalog, key)
+        pages = max(math.ceil(len(entries) / listing.page_size), 1)
+        if not 0 <= page < pages:
+            return self.render(name, catalog, key, min(max(page, 0), pages - 1))
+        first = page * listing.page_size
+        kwargs = listing.render(catalog, key, entries[first:first + listing.page_size], first, page, pages)
+        self.cache[cache_key] = (version, kwargs, pages)
+        self.cache.move_to_end(cache_key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return kwargs, page, pages
+
+# Shortens text to at most limit characters.
+def clip(text, limit):
+    return text if len(text) <= limit else text[:max(limit - 1, 0)] + "…"
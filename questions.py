@@ -0,0 +1,95 @@
+import sys
+from array import array
+from collections import namedtuple
+from collections.abc import MutableSequence
+
+# Compact question storage. A quiz's questions are kept as columns instead of one dict per question:
+# texts and option tuples in lists, correct indexes and durations in arrays. Option strings are
+# interned and identical option tuples ("True", "False") are stored once per bank, so large banks
+# with repeated answer sets cost a few pointers per question. Indexing returns a Question snapshot.
+
+# Longest time a question may stay open, in seconds. Durations are stored as unsigned 32-bit ints.
+MAX_DURATION = 3600
+
+Question = namedtuple("Question", ["question", "options", "correct_answer_index", "duration"])
+
+def make_question(question, options, correct_answer_index, duration):
+    return Question(question, tuple(options), correct_answer_index, duration)
+
+class QuestionBank(MutableSequence):
+    def __init__(self, questions=()):
+        self.texts = []
+        self.option_sets = []           # tuple of interned option strings per question
+        self.correct = array("H")
+        self.durations = array("I")
+        self.option_pool = {}           # options tuple -> the shared instance
+        self.extend(questions)
+
+    def intern_options(self, options):
+        options = tuple(sys.intern(option) for option in options)
+        return self.option_pool.setdefault(options, options)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return Question(self.texts[index], self.option_sets[index], self.correct[index], self.durations[index])
+
+    def __setitem__(self, index, question):
+        self.texts[index] = question.question
+        self.option_sets[index] = self.intern_options(question.options)
+        self.correct[index] = question.correct_answer_index
+        self.durations[index] = question.duration
+
+    def __delitem__(self, index):
+        for column in (self.texts, self.option_sets, self.correct, self.durations):
+            del column[index]
+
+    def insert(self, index, question):
+        self.texts.insert(index, question.question)
+        self.option_sets.insert(index, self.intern_options(question.options))
+        self.correct.insert(index, question.correct_answer_index)
+        self.durations.insert(index, question.duration)
+
+    def append(self, question):
+        self.insert(len(self), question)
+
+    # A snapshot that does not follow later edits; option tuples stay shared.
+    def copy(self):
+        bank = QuestionBank()
+        bank.texts = self.texts[:]
+        bank.option_sets = self.option_sets[:]
+        bank.correct = array("H", self.correct)
+        bank.durations = array("I", self.durations)
+        bank.option_pool = self.option_pool
+        return bank
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    # Column accessors, for reading one field without building a Question.
+    def text(self, index):
+        return self.texts[index]
+
+    def options(self, index):
+        return self.option_sets[index]
+
+    def correct_option(self, index):
+        return self.option_sets[index][self.correct[index]]
+
+# A random display order for count options: order[shown position] = position in the question bank.
+def option_order(count, rng):
+    order = list(range(count))
+    rng.shuffle(order)
+    return order
+
+# The question with its options shown in order. The correct index follows the correct option's
+# position rather than its text, so duplicate option texts stay right.
+def reorder_options(question, order):
+    return question._replace(options=tuple(question.options[i] for i in order), correct_answer_index=order.index(question.correct_answer_index))
+
+# The question with its options permuted by rng.
+def shuffle_options(question, rng):
+    return reorder_options(question, option_order(len(question.options), rng))
@@ -0,0 +1,1783 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+import asyncio
+import inspect
+import time
+import random
+import os
+import io
+import math
+from leaderboard import Leaderboard
+from scoring import STRATEGIES, score_responses
+from storage import QuizStore
+from catalog import Catalog, DEFAULT_MAX_ROWS, GUILD_BOARD, quiz_board, season_board
+from export import EXPORT_FORMATS, export_results, shutdown_pool
+from members import MemberCache, display_name
+from scheduler import SessionManager
+from questions import MAX_DURATION, QuestionBank, make_question, option_order, reorder_options
+from analytics import question_stats, question_detail, hardest
+from pager import Pager, clip
+from outbox import Outbox, PRIORITY_LIVE, PRIORITY_INFO
+from importer import import_questions, detect_format, open_text, local_path, error_report
+from metrics import Histogram, Metrics, serve_metrics, watch_loop_lag
+from shards import shard_for
+from types import SimpleNamespace
+import traceback
+
+# The quiz bot: commands, answer buttons and the quiz flow. Nothing connects or opens the database on
+# import; create_bot(config) builds a Bot with every command registered and sets up the state the
+# commands share (store, catalogs, sessions, outbox). bot.py is the entry point that runs it. The
+# commands can also be called directly (command.callback(ctx, ...)) with a stand-in ctx whose
+# channel has an async send(), which drives whole quizzes without a gateway connection.
+# The shared state is module-level, so there is one bot per process: a second create_bot() before
+# shutdown() raises instead of taking over the first bot's state. Tests drive one bot at a time;
+# running shards in parallel means one process per worker (shards.py).
+
+# Only allow users with a specific role to use the commands (default for Config.allowed_role_id).
+ALLOWED_ROLE_ID = 1346562716680192012  # Replace ROLEID with your actual allowed role's ID (e.g., 123456789012345678).
+
+# Countdown rendering. Countdown edits share the channel's "edit" budget in the outbox.
+COUNTDOWN_MODES = ["timestamp", "milestones", "live"]
+DEFAULT_COUNTDOWN_MILESTONES = [10, 5]
+
+# Maximum number of queued answers recorded per consumer pass.
+ANSWER_BATCH_SIZE = 500
+
+# Questions with at least this many responses are scored in a worker thread.
+SCORING_THREAD_THRESHOLD = 2000
+
+# Rejected import lines listed in the reply; the full list is attached as a file beyond this.
+IMPORT_ERRORS_SHOWN = 10
+
+# Entries per page of the paged listings.
+QUIZZES_PER_PAGE = 20
+QUESTIONS_PER_PAGE = 5
+SETTINGS_PER_PAGE = 5
+
+# Questions listed by !answerstats, hardest first.
+ANSWER_STATS_SHOWN = 10
+
+# Default pause between the end of one question and the next one, in seconds (!setpause).
+INTERMISSION = 3
+MAX_INTERMISSION = 60
+
+# Question close modes (!setclose). "timer" waits out the time limit; "adaptive" also closes once
+# everyone who answered an earlier question has answered, or after QUIET_PERIOD seconds without a
+# new answer (counted from the first answer).
+CLOSE_MODES = ["timer", "adaptive"]
+QUIET_PERIOD = 5
+
+class Config:
+    def __init__(self, token=None, db_path="quizbot.db", cache_rows=DEFAULT_MAX_ROWS, import_dir=None, allowed_role_id=ALLOWED_ROLE_ID, command_prefix="!", metrics_host="127.0.0.1", metrics_port=None, workers=1, shard_count=None, shard_ids=None, sync_commands=False):
+        self.token = token
+        self.db_path = db_path
+        self.cache_rows = cache_rows          # see Catalog
+        self.import_dir = import_dir          # folder !importq may read from; None disables it
+        self.allowed_role_id = allowed_role_id
+        self.command_prefix = command_prefix
+        self.metrics_host = metrics_host
+        self.metrics_port = metrics_port      # serves Prometheus metrics on /metrics; None disables it
+        self.workers = workers                # processes to split the shards across (shards.py)
+        self.shard_count = shard_count        # total shards; None runs unsharded (one worker) or as Discord recommends
+        self.shard_ids = shard_ids            # shards run by this process; None for all of them
+        self.sync_commands = sync_commands    # registers the slash commands with Discord on startup
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            token=os.getenv("QUIZBOTTOKEN"),
+            db_path=os.getenv("QUIZBOT_DB", "quizbot.db"),
+            cache_rows=int(os.getenv("QUIZBOT_CACHE_ROWS", DEFAULT_MAX_ROWS)),
+            import_dir=os.getenv("QUIZBOT_IMPORT_DIR"),
+            allowed_role_id=int(os.getenv("QUIZBOT_ROLE_ID", ALLOWED_ROLE_ID)),
+            metrics_host=os.getenv("QUIZBOT_METRICS_HOST", "127.0.0.1"),
+            metrics_port=int(os.environ["QUIZBOT_METRICS_PORT"]) if os.getenv("QUIZBOT_METRICS_PORT") else None,
+            workers=int(os.getenv("QUIZBOT_WORKERS", "1")),
+            shard_count=int(os.environ["QUIZBOT_SHARDS"]) if os.getenv("QUIZBOT_SHARDS") else None,
+            sync_commands=os.getenv("QUIZBOT_SYNC_COMMANDS", "").lower() in ["1", "true", "yes"]
+        )
+
+# Every command defined below; create_bot() adds them to the Bot.
+COMMANDS = []
+
+def command(**kwargs):
+    def register(func):
+        cmd = commands.command(**kwargs)(func)
+        COMMANDS.append(cmd)
+        return cmd
+    return register
+
+# Everyone may use the commands in DMs; in a server only members with the allowed role.
+def may_use_commands(guild, user):
+    return guild is None or any(role.id == config.allowed_role_id for role in getattr(user, "roles", ()))
+
+# Global check: Silently delete unauthorized command messages.
+async def globally_restrict(ctx):
+    if may_use_commands(ctx.guild, ctx.author):
+        return True
+    else:
+        try:
+            await ctx.message.delete()
+        except Exception:
+            pass
+        return False
+
+async def on_command_error(ctx, error):
+    if isinstance(error, commands.CheckFailure):
+        return
+    raise error
+
+async def before_command(ctx):
+    ctx.invoked_at = time.perf_counter()
+
+async def after_command(ctx):
+    labels = (("command", ctx.command.qualified_name),)
+    metrics.observe("quizbot_command_seconds", time.perf_counter() - ctx.invoked_at, labels)
+    if ctx.command_failed:
+        metrics.inc("quizbot_command_errors_total", labels)
+
+# Starts the event-loop lag probe and, if configured, the metrics endpoint once the bot's loop runs.
+# Slash commands are registered with Discord only when asked to (sync is rate limited).
+async def setup_hook():
+    background_tasks.add(asyncio.create_task(watch_loop_lag(metrics)))
+    if config.metrics_port:
+        await serve_metrics(metrics, config.metrics_host, config.metrics_port)
+        print(f"Serving metrics on http://{config.metrics_host}:{config.metrics_port}/metrics")
+    if config.sync_commands:
+        synced = await bot.tree.sync()
+        print(f"Synced {len(synced)} slash commands")
+
+# Shared state, set up by create_bot().
+config = None
+bot = None
+# Global data storage, backed by SQLite. Settings and the key indexes are loaded when a guild is
+# first used; question banks, leaderboards, participant lists and last-question info on first use.
+store = None
+# Quizzes, settings and results live in one GuildCatalog per guild (guild id 0 for DMs). Each catalog
+# holds that guild's settings and indexes plus lazily loaded tables:
+#   quizzes[quiz_name] = [question1, question2, ...]
+#     A QuestionBank (questions.py); each entry reads as Question(question, options, correct_answer_index, duration)
+#   settings[quiz_name] = { "shuffle": bool, "auto_show_answer": bool, "auto_show_fastest": bool, "feedback_correct": bool, "feedback_wrong": bool, "leaderboard_count": int, "leaderboard_mention": bool, "countdown_mode": str, "countdown_milestones": [int, ...], "scoring": str, "export_format": str, "intermission": int, "close_mode": str, "quiet_period": int }
+#   last_question_info[quiz_name] = { "correct_answer": str, "all_options": [str, ...], "fastest": str, "fastest_time": float }
+#   leaderboards[quiz_name] = Leaderboard of the last completed run
+#   exports[quiz_name] = (filename, bytes) of the last results file
+#   participants[quiz_name] = set(user_id, ...)
+# Idle guilds are dropped from memory once the cached rows pass config.cache_rows; guilds with a running quiz are kept.
+catalogs = None
+sessions = None       # SessionManager: running QuizSessions keyed by (guild_id, channel_id, quiz_name), all on one timer wheel
+live_questions = {}   # live_questions[(session_id, question_index)] = LiveQuestion (only while the question is open)
+member_cache = None   # MemberCache: names and mentions of users seen in interactions or looked up for results
+pager = Pager()       # paged listings with rendered-page cache; listings are registered below
+outbox = None         # Outbox: per-channel send queues and request budgets for everything the bot posts or edits
+metrics = None        # Metrics: latencies and counters for the Prometheus endpoint and !quizstats
+background_tasks = set()
+checkpoints_resumed = False  # set once resume_sessions() has run for this bot
+
+# Commands in DMs use guild id 0.
+def guild_id(ctx):
+    return ctx.guild.id if ctx.guild else 0
+
+def guild_catalog(ctx):
+    return catalogs.get(guild_id(ctx))
+
+# Queues a message for the command's channel. Await the result only when the sent Message is needed
+# or the reply has to be out before going on.
+def reply(ctx, content=None, priority=PRIORITY_INFO, **kwargs):
+    return outbox.post(ctx.channel, content, priority, **kwargs)
+
+# --- QUIZ VIEW AND ANSWER DISPATCH ---
+# Answer buttons are persistent dynamic items: their custom_id encodes session, question and option,
+# so any click, including one on a message posted before a restart, is routed through dispatch_answer
+# to the live question state. Views carry no state of their own and are not kept by the view store.
+class QuizAnswerButton(discord.ui.DynamicItem[discord.ui.Button], template=r"quiz:(?P<session>[0-9a-f]+):(?P<question>[0-9]+):(?P<option>[0-9]+)"):
+    def __init__(self, session_id, question_index, option_index, disabled=False):
+        super().__init__(discord.ui.Button(
+            label=str(option_index+1),
+            style=discord.ButtonStyle.primary,
+            custom_id=f"quiz:{session_id}:{question_index}:{option_index}",
+            disabled=disabled
+        ))
+        self.session_id = session_id
+        self.question_index = question_index
+        self.option_index = option_index
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match["session"], int(match["question"]), int(match["option"]))
+
+    async def callback(self, interaction: discord.Interaction):
+        await dispatch_answer(interaction, self.session_id, self.question_index, self.option_index)
+
+class QuizView(discord.ui.View):
+    def __init__(self, session_id, question_index, option_count, disabled=False):
+        super().__init__(timeout=None)
+        for i in range(option_count):
+            self.add_item(QuizAnswerButton(session_id, question_index, i, disabled=disabled))
+
+async def dispatch_answer(interaction, session_id, question_index, option_index):
+    question = live_questions.get((session_id, question_index))
+    if question is None:
+        await reject_closed(interaction)
+        return
+    await question.handle_answer(interaction, option_index)
+
+async def reject_closed(interaction):
+    try:
+        await interaction.response.send_message("This question is no longer accepting answers.", ephemeral=True)
+    except discord.HTTPException:
+        pass
+
+# Button clicks are stamped with a monotonic receive time and queued, then acknowledged. A single
+# consumer per question drains the queue in batches and records the answers, so scoring never races
+# the acknowledgements and the fastest-answer order reflects when clicks reached the bot. A click is
+# queued before its acknowledgement is awaited, so one received while the question was open still
+# counts if the question closes before the acknowledgement goes through; its feedback waits for it.
+class LiveQuestion:
+    def __init__(self, session, question_index, question_data, total_time=20, option_order=None, expected=frozenset()):
+        self.session = session
+        self.session_id = session.session_id
+        self.catalog = session.catalog
+        self.question_index = question_index
+        self.question_data = question_data  # Question as shown, with its options in display order
+        self.option_order = option_order    # shown position -> position in the bank, None if not shuffled
+        self.expected = expected            # users the adaptive close waits for
+        self.start_time = time.monotonic()
+        self.total_time = total_time
+        self.responses = {}
+        self.answer_order = []  # [(user_id, response), ...] ordered by answer_time
+        self.closed = False
+        self.answer_queue = asyncio.Queue()
+        self.feedback_tasks = set()
+        self.consumer = asyncio.create_task(self.consume_answers())
+
+    async def handle_answer(self, interaction: discord.Interaction, answer_index: int):
+        received = time.monotonic()
+        if self.closed:
+            await reject_closed(interaction)
+            return
+        acked = asyncio.get_running_loop().create_future()
+        self.answer_queue.put_nowait((received, interaction, answer_index, acked))
+        try:
+            await interaction.response.defer()
+        except discord.HTTPException:
+            pass
+        finally:
+            acked.set_result(None)
+        ack = time.monotonic() - received
+        metrics.observe("quizbot_answer_ack_seconds", ack)
+        self.session.ack.observe(ack)
+
+    async def consume_answers(self):
+        while True:
+            batch = [await self.answer_queue.get()]
+            while len(batch) < ANSWER_BATCH_SIZE and not self.answer_queue.empty():
+                batch.append(self.answer_queue.get_nowait())
+            done = None in batch
+            feedback = self.record_answers([item for item in batch if item is not None])
+            if feedback:
+                task = asyncio.create_task(self.send_feedback(feedback))
+                self.feedback_tasks.add(task)
+                task.add_done_callback(self.feedback_tasks.discard)
+            if done:
+                return
+
+    def record_answers(self, batch):
+        catalog = self.catalog
+        quiz_name = self.session.quiz_name
+        settings = catalog.settings.get(quiz_name, {})
+        participants = self.session.participants
+        feedback = []
+        rows = []
+        batch.sort(key=lambda item: item[0])
+        for received, interaction, answer_index, acked in batch:
+            user_id = interaction.user.id
+            participants.add(user_id)
+            member_cache.remember(interaction.guild_id, interaction.user)
+            if user_id in self.responses:
+                feedback.append((interaction, acked, "You have already answered this question!"))
+                continue
+            elapsed = received - self.start_time
+            correct = (answer_index == self.question_data.correct_answer_index)
+            response = {
+                "username": interaction.user.name,
+                "answer_index": answer_index,
+                "correct": correct,
+                "answer_time": elapsed
+            }
+            self.responses[user_id] = response
+            self.add_in_order(user_id, response)
+            # The answer log keeps the option's position in the bank, so shuffled runs add up.
+            rows.append((user_id, self.option_order[answer_index] if self.option_order else answer_index, correct, elapsed))
+            if correct:
+                if settings.get("feedback_correct", True):
+                    feedback.append((interaction, acked, f"You answered correctly in {elapsed:.2f} seconds!"))
+            else:
+                if settings.get("feedback_wrong", True):
+                    feedback.append((interaction, acked, "You answered incorrectly!"))
+        if rows:
+            catalog.record_answers(quiz_name, self.session_id, self.question_index, rows)
+            self.session.answers_recorded(self)
+        return feedback
+
+    # Batches arrive almost in receive order, so this is an append except for stragglers.
+    def add_in_order(self, user_id, response):
+        entries = self.answer_order
+        if not entries or entries[-1][1]["answer_time"] <= response["answer_time"]:
+            entries.append((user_id, response))
+            return
+        pos = len(entries) - 1
+        while pos > 0 and entries[pos - 1][1]["answer_time"] > response["answer_time"]:
+            pos -= 1
+        entries.insert(pos, (user_id, response))
+
+    async def send_feedback(self, feedback):
+        await asyncio.gather(*(self.followup(*item) for item in feedback), return_exceptions=True)
+
+    # Followups need the interaction to be acknowledged first.
+    async def followup(self, interaction, acked, msg):
+        await acked
+        await interaction.followup.send(msg, ephemeral=True)
+
+    # Stops taking answers and waits until everything already queued has been recorded.
+    async def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.answer_queue.put_nowait(None)
+        await self.consumer
+
+# --- COUNTDOWN RENDERING ---
+# Adds the countdown to a question embed. "timestamp" and "milestones" render the deadline once as a
+# Discord relative timestamp, which the client keeps ticking by itself; "live" keeps the old footer.
+def render_countdown(embed, mode, deadline, total_time):
+    if mode == "live":
+        embed.set_footer(text=f"Time remaining: {total_time} seconds")
+        return
+    embed.add_field(name="Time remaining", value=f"Ends <t:{math.ceil(deadline)}:R>", inline=False)
+    embed.set_footer(text=f"Time limit: {total_time} seconds")
+
+# Replaces the relative timestamp once the question is closed, so it doesn't read "x seconds ago".
+def close_countdown(embed, mode):
+    if mode == "live":
+        return
+    embed.set_field_at(len(embed.fields) - 1, name="Time remaining", value="Time is up!", inline=False)
+
+def close_label(settings):
+    if settings.get("close_mode", "timer") != "adaptive":
+        return "timer"
+    quiet = settings.get("quiet_period", QUIET_PERIOD)
+    return f"adaptive (quiet period {quiet} seconds)" if quiet else "adaptive (when everyone has answered)"
+
+# --- PAGED LISTINGS ---
+# !listquizzes, !showquiz and !quizsettings show one page at a time with previous/next buttons.
+# Pages are rendered on demand by `pager` and cached until the quiz (or, for guild-wide listings,
+# any quiz of the guild) changes. The buttons are dynamic items like the answer buttons: the
+# custom_id holds listing, target page and key, so they keep working after a restart.
+class PageButton(discord.ui.DynamicItem[discord.ui.Button], template=r"page:(?P<listing>[a-z]+):(?P<page>-?[0-9]+):(?P<key>.*)"):
+    def __init__(self, listing, page, key, label, disabled=False):
+        super().__init__(discord.ui.Button(
+            label=label,
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"page:{listing}:{page}:{key}",
+            disabled=disabled
+        ))
+        self.listing = listing
+        self.page = page
+        self.key = key
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match["listing"], int(match["page"]), match["key"], item.label)
+
+    async def callback(self, interaction: discord.Interaction):
+        catalog = catalogs.get(interaction.guild_id or 0)
+        try:
+            kwargs, page, pages = pager.render(self.listing, catalog, self.key, self.page)
+        except KeyError:
+            await interaction.response.send_message("This list is no longer available.", ephemeral=True)
+            return
+        await interaction.response.edit_message(**kwargs, view=PagerView(self.listing, self.key, page, pages))
+
+class PagerView(discord.ui.View):
+    def __init__(self, listing, key, page, pages):
+        super().__init__(timeout=None)
+        self.add_item(PageButton(listing, page - 1, key, "◀", disabled=page <= 0))
+        self.add_item(PageButton(listing, page + 1, key, "▶", disabled=page >= pages - 1))
+
+# Sends one page of a listing, with page buttons if there is more than one page.
+async def send_page(ctx, listing, key, page):
+    kwargs, page, pages = pager.render(listing, guild_catalog(ctx), key, page)
+    # custom_ids are limited to 100 characters; very long quiz names only get the page argument.
+    if pages > 1 and len(f"page:{listing}:{pages}:{key}") <= 100:
+        kwargs = dict(kwargs, view=PagerView(listing, key, page, pages))
+    await reply(ctx, **kwargs)
+
+def page_label(page, pages):
+    return f"Page {page + 1}/{pages}" if pages > 1 else ""
+
+@pager.listing("quizzes", QUIZZES_PER_PAGE, lambda catalog, key: list(catalog.quizzes), lambda catalog, key: catalog.version())
+def render_quiz_list(catalog, key, names, first, page, pages):
+    msg = "**Existing Quizzes:**\n"
+    for qz in names:
+        msg += f"- {clip(qz, 100)} (Total questions: {catalog.question_count(qz)})\n"
+    return {"content": msg + page_label(page, pages)}
+
+@pager.listing("quiz", QUESTIONS_PER_PAGE, lambda catalog, key: catalog.quizzes[key], lambda catalog, key: catalog.version(key))
+def render_quiz_content(catalog, quiz_name, questions, first, page, pages):
+    msg = f"**{clip(quiz_name, 100)}** Quiz Content:\n"
+    for i, q in enumerate(questions, start=first + 1):
+        correct = q.options[q.correct_answer_index]
+        options = " | ".join(q.options)
+        msg += f"{i}. {clip(q.question, 180)}\nOptions: {clip(options, 120)}\nCorrect answer: **{clip(correct, 40)}**\n\n"
+    return {"content": msg + page_label(page, pages)}
+
+# "Active Quiz" changes without an edit, so the running quizzes are part of the version.
+@pager.listing("settings", SETTINGS_PER_PAGE, lambda catalog, key: list(catalog.quizzes), lambda catalog, key: (catalog.version(), frozenset(session.quiz_name for session in sessions.for_guild(catalog.guild_id))))
+def render_quiz_settings(catalog, key, names, first, page, pages):
+    embed = discord.Embed(
+        title="Quiz Settings",
+        description="Current settings for all quizzes:",
+        color=discord.Color.purple()
+    )
+    for quiz_name in names:
+        settings = catalog.settings.get(quiz_name, {})
+        shuffle_status = settings.get("shuffle", False)
+        auto_show_answer = settings.get("auto_show_answer", True)
+        auto_show_fastest = settings.get("auto_show_fastest", True)
+        feedback_correct = settings.get("feedback_correct", True)
+        feedback_wrong = settings.get("feedback_wrong", True)
+        lb_count = settings.get("leaderboard_count", 10)
+        lb_mention = settings.get("leaderboard_mention", True)
+        countdown_mode = settings.get("countdown_mode", "timestamp")
+        if countdown_mode == "milestones":
+            countdown_mode += " (" + ", ".join(str(m) for m in settings.get("countdown_milestones", DEFAULT_COUNTDOWN_MILESTONES)) + ")"
+        scoring_name = settings.get("scoring", "rank_decay")
+        export_format = settings.get("export_format", "xlsx")
+        ongoing_status = sessions.is_running(catalog.guild_id, quiz_name)
+        total_questions = catalog.question_count(quiz_name)
+        embed.add_field(
+            name=clip(quiz_name, 256),
+            value=(
+                f"**Total Questions:** {total_questions}\n"
+                f"**Shuffle:** {'Enabled' if shuffle_status else 'Disabled'}\n"
+                f"**Auto-show Correct Answer:** {'Enabled' if auto_show_answer else 'Disabled'}\n"
+                f"**Auto-show Fastest Answer:** {'Enabled' if auto_show_fastest else 'Disabled'}\n"
+                f"**Feedback - Correct Message:** {'Enabled' if feedback_correct else 'Disabled'}\n"
+                f"**Feedback - Incorrect Message:** {'Enabled' if feedback_wrong else 'Disabled'}\n"
+                f"**Leaderboard:** Top {lb_count}, {'Mentions' if lb_mention else 'Names only'}\n"
+                f"**Countdown:** {countdown_mode}\n"
+                f"**Scoring:** {scoring_name}\n"
+                f"**Results Format:** {export_format}\n"
+                f"**Pause Between Questions:** {settings.get('intermission', INTERMISSION)} seconds\n"
+                f"**Close:** {close_label(settings)}\n"
+                f"**Active Quiz:** {'Yes' if ongoing_status else 'No'}"
+            ),
+            inline=False
+        )
+    if pages > 1:
+        embed.set_footer(text=page_label(page, pages))
+    return {"embed": embed}
+
+async def on_ready():
+    global checkpoints_resumed
+    print(f"Bot {bot.user} logged in.")
+    # on_ready fires again after reconnects; interrupted runs are picked up on the first one only.
+    if not checkpoints_resumed:
+        checkpoints_resumed = True
+        await resume_sessions()
+
+# !createquiz - Creates a new quiz.
+@command(name="createquiz")
+async def create_quiz(ctx, quiz_name: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name in catalog.quizzes:
+        await reply(ctx, f"A quiz named **{quiz_name}** already exists.")
+        return
+    catalog.quizzes[quiz_name] = QuestionBank()
+    catalog.settings[quiz_name] = {
+        "shuffle": False,
+        "auto_show_answer": True,
+        "auto_show_fastest": True,
+        "feedback_correct": True,
+        "feedback_wrong": True,
+        "leaderboard_count": 10,
+        "leaderboard_mention": True,
+        "countdown_mode": "timestamp",
+        "countdown_milestones": list(DEFAULT_COUNTDOWN_MILESTONES),
+        "scoring": "rank_decay",
+        "export_format": "xlsx",
+        "intermission": INTERMISSION,
+        "close_mode": "timer",
+        "quiet_period": QUIET_PERIOD
+    }
+    catalog.save_settings(quiz_name)
+    await reply(ctx, f"Quiz **{quiz_name}** created. You can now add questions.")
+
+# !addq (alias: !a) - Adds a single question.
+@command(name="addq", aliases=["a"])
+async def add_question_simple(ctx, quiz_name: str, duration: int, correct_index: int, *, content: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.quizzes:
+        await reply(ctx, f"No quiz named **{quiz_name}** found. Create one using !createquiz.")
+        return
+    parts = [part.strip() for part in content.split("|")]
+    if len(parts) < 2:
+        await reply(ctx, "You must specify at least a question and one option.")
+        return
+    question_text = parts[0]
+    options = parts[1:]
+    if duration < 1:
+        await reply(ctx, "Duration must be at least 1 second.")
+        return
+    if duration > MAX_DURATION:
+        await reply(ctx, f"Duration must be at most {MAX_DURATION} seconds.")
+        return
+    if not (0 <= correct_index < len(options)):
+        await reply(ctx, f"Correct answer index must be between 0 and {len(options)-1}.")
+        return
+    question_list = catalog.quizzes[quiz_name]
+    question_list.append(make_question(question_text, options, correct_index, duration))
+    catalog.save_questions(quiz_name, question_list[-1:], start=len(question_list) - 1)
+    await reply(ctx, f"Question added to **{quiz_name}**. Total questions: {len(catalog.quizzes[quiz_name])}")
+
+# Appends imported questions to a quiz and queues them for saving, one batch at a time.
+def question_appender(catalog, quiz_name):
+    question_list = catalog.quizzes[quiz_name]
+    def add_batch(questions):
+        start = len(question_list)
+        question_list.extend(questions)
+        catalog.save_questions(quiz_name, questions, start=start)
+    return add_batch
+
+# Reports an import: the first IMPORT_ERRORS_SHOWN bad lines inline, all of them as a file if there are more.
+async def send_import_report(ctx, quiz_name, added, errors):
+    msg = f"{added} questions added to **{quiz_name}**."
+    if errors:
+        msg += f" Rejected lines: {len(errors)}\n" + error_report(errors[:IMPORT_ERRORS_SHOWN])
+    if len(errors) > IMPORT_ERRORS_SHOWN:
+        report = discord.File(io.BytesIO(error_report(errors).encode("utf-8")), filename=f"{quiz_name}_import_errors.txt")
+        await reply(ctx, msg[:2000], file=report)
+    else:
+        await reply(ctx, msg[:2000])
+
+# !bulkadd - Bulk adds questions.
+@command(name="bulkadd")
+async def bulk_add(ctx, quiz_name: str, *, content: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.quizzes:
+        await reply(ctx, f"No quiz named **{quiz_name}** found. Create one using !createquiz.")
+        return
+    added, errors = await import_questions(io.StringIO(content), "pipe", question_appender(catalog, quiz_name))
+    await send_import_report(ctx, quiz_name, added, errors)
+
+# !importq - Imports questions from an attached file, or from a file in QUIZBOT_IMPORT_DIR on the bot's host.
+@command(name="importq")
+async def import_quiz_questions(ctx, quiz_name: str, filename: str = None):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.quizzes:
+        await reply(ctx, f"No quiz named **{quiz_name}** found. Create one using !createquiz.")
+        return
+    attachments = ctx.message.attachments
+    if attachments:
+        attachment = attachments[0]
+        filename = attachment.filename
+        stream = open_text(await attachment.read())
+    elif filename:
+        path = local_path(config.import_dir, filename)
+        if path is None:
+            await reply(ctx, f"No importable file named **{filename}** was found.")
+            return
+        stream = open(path, encoding="utf-8-sig", errors="replace", newline="")
+    else:
+        await reply(ctx, "Attach a question file (.txt, .csv or .jsonl) or give the name of a file in the import folder.")
+        return
+    with stream:
+        added, errors = await import_questions(stream, detect_format(filename), question_appender(catalog, quiz_name))
+    await send_import_report(ctx, quiz_name, added, errors)
+
+# !listquizzes - Lists all existing quizzes, QUIZZES_PER_PAGE per page.
+@command(name="listquizzes")
+async def list_quizzes(ctx, page: int = 1):
+    catalog = guild_catalog(ctx)
+    if not catalog.quizzes:
+        await reply(ctx, "No quizzes have been created yet.")
+        return
+    await send_page(ctx, "quizzes", "", page - 1)
+
+# !deletequiz - Deletes the specified quiz and its Excel file if available.
+@command(name="deletequiz")
+async def delete_quiz(ctx, quiz_name: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.quizzes:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    del catalog.quizzes[quiz_name]
+    if quiz_name in catalog.settings:
+        del catalog.settings[quiz_name]
+    if quiz_name in catalog.last_question_info:
+        del catalog.last_question_info[quiz_name]
+    if quiz_name in catalog.leaderboards:
+        del catalog.leaderboards[quiz_name]
+    if quiz_name in catalog.participants:
+        del catalog.participants[quiz_name]
+    had_results = quiz_name in catalog.exports
+    if had_results:
+        del catalog.exports[quiz_name]
+    # Results files written to disk by older versions of the bot.
+    filename = f"{quiz_name}_results.xlsx"
+    if os.path.exists(filename):
+        try:
+            os.remove(filename)
+            had_results = True
+        except Exception as e:
+            await reply(ctx, f"Quiz deleted but error occurred while deleting Excel file: {e}")
+            return
+    if had_results:
+        await reply(ctx, f"Quiz **{quiz_name}** deleted and its results file removed.")
+    else:
+        await reply(ctx, f"Quiz **{quiz_name}** deleted. (No results file found.)")
+
+# !editq - Edits an existing question (question_index is 1-based).
+@command(name="editq")
+async def edit_question(ctx, quiz_name: str, question_index: int, duration: int, correct_index: int, *, content: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.quizzes:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    idx = question_index - 1
+    if idx < 0 or idx >= len(catalog.quizzes[quiz_name]):
+        await reply(ctx, "Invalid question index.")
+        return
+    parts = [part.strip() for part in content.split("|")]
+    if len(parts) < 2:
+        await reply(ctx, "You must provide at least a question text and one option.")
+        return
+    question_text = parts[0]
+    options = parts[1:]
+    if duration < 1:
+        await reply(ctx, "Duration must be at least 1 second.")
+        return
+    if duration > MAX_DURATION:
+        await reply(ctx, f"Duration must be at most {MAX_DURATION} seconds.")
+        return
+    if not (0 <= correct_index < len(options)):
+        await reply(ctx, f"Correct answer index must be between 0 and {len(options)-1}.")
+        return
+    catalog.quizzes[quiz_name][idx] = make_question(question_text, options, correct_index, duration)
+    catalog.save_questions(quiz_name, [catalog.quizzes[quiz_name][idx]], start=idx)
+    await reply(ctx, f"Question {question_index} in **{quiz_name}** updated.")
+
+# !mixquestions - Sets the shuffle mode for the quiz.
+@command(name="mixquestions")
+async def set_shuffle(ctx, quiz_name: str, mode: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.quizzes:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    state = mode.lower() in ["true", "yes", "1", "shuffle"]
+    if quiz_name not in catalog.settings:
+        catalog.settings[quiz_name] = {}
+    catalog.settings[quiz_name]["shuffle"] = state
+    catalog.save_settings(quiz_name)
+    await reply(ctx, f"Shuffle mode for **{quiz_name}** set to {'active' if state else 'inactive'}.")
+
+# !togglecorrect - Enables/disables correct feedback messages.
+@command(name="togglecorrect")
+async def toggle_correct(ctx, quiz_name: str, mode: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.settings:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    state = mode.lower() in ["on", "true", "1"]
+    catalog.settings[quiz_name]["feedback_correct"] = state
+    catalog.save_settings(quiz_name)
+    await reply(ctx, f"'Correct answer' feedback for **{quiz_name}** will be {'shown' if state else 'hidden'}.")
+
+# !togglewrong - Enables/disables incorrect feedback messages.
+@command(name="togglewrong")
+async def toggle_wrong(ctx, quiz_name: str, mode: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.settings:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    state = mode.lower() in ["on", "true", "1"]
+    catalog.settings[quiz_name]["feedback_wrong"] = state
+    catalog.save_settings(quiz_name)
+    await reply(ctx, f"'Incorrect answer' feedback for **{quiz_name}** will be {'shown' if state else 'hidden'}.")
+
+# !toggleanswer - Enables/disables auto-show correct answer.
+@command(name="toggleanswer")
+async def toggle_answer_cmd(ctx, quiz_name: str, mode: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.settings:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    state = mode.lower() in ["on", "true", "1"]
+    catalog.settings[quiz_name]["auto_show_answer"] = state
+    catalog.save_settings(quiz_name)
+    await reply(ctx, f"Auto-show correct answer for **{quiz_name}** is now {'enabled' if state else 'disabled'}.")
+
+# !togglefastest - Enables/disables auto-show fastest correct answer.
+@command(name="togglefastest")
+async def toggle_fastest(ctx, quiz_name: str, mode: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.settings:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    state = mode.lower() in ["on", "true", "1"]
+    catalog.settings[quiz_name]["auto_show_fastest"] = state
+    catalog.save_settings(quiz_name)
+    await reply(ctx, f"Auto-show fastest answer for **{quiz_name}** is now {'enabled' if state else 'disabled'}.")
+
+# !setleaderboard - Sets the leaderboard settings.
+@command(name="setleaderboard")
+async def set_leaderboard(ctx, quiz_name: str, count: int, mention: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.settings:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    try:
+        count = int(count)
+    except ValueError:
+        await reply(ctx, "Count must be a number.")
+        return
+    mention_bool = mention.lower() in ["true", "yes", "1", "mention"]
+    catalog.settings[quiz_name]["leaderboard_count"] = count
+    catalog.settings[quiz_name]["leaderboard_mention"] = mention_bool
+    catalog.save_settings(quiz_name)
+    await reply(ctx, f"Leaderboard settings for **{quiz_name}** updated: Top {count} and will be shown as {'mentions' if mention_bool else 'names only'}.")
+
+# !setcountdown - Sets how the countdown is rendered: timestamp, milestones (e.g. "milestones 10 5 3") or live.
+@command(name="setcountdown")
+async def set_countdown(ctx, quiz_name: str, mode: str, *milestones: int):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.settings:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    mode = mode.lower()
+    if mode not in COUNTDOWN_MODES:
+        await reply(ctx, f"Countdown mode must be one of: {', '.join(COUNTDOWN_MODES)}.")
+        return
+    if any(m <= 0 for m in milestones):
+        await reply(ctx, "Milestones must be positive numbers of seconds.")
+        return
+    catalog.settings[quiz_name]["countdown_mode"] = mode
+    if milestones:
+        catalog.settings[quiz_name]["countdown_milestones"] = sorted(set(milestones), reverse=True)
+    catalog.save_settings(quiz_name)
+    if mode == "milestones":
+        shown = catalog.settings[quiz_name].get("countdown_milestones", DEFAULT_COUNTDOWN_MILESTONES)
+        await reply(ctx, f"Countdown for **{quiz_name}** set to milestones: {', '.join(str(m) for m in shown)} seconds left.")
+    else:
+        await reply(ctx, f"Countdown for **{quiz_name}** set to {mode}.")
+
+# !setscoring - Selects the scoring strategy for the quiz.
+@command(name="setscoring")
+async def set_scoring(ctx, quiz_name: str, strategy: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.settings:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    strategy = strategy.lower()
+    if strategy not in STRATEGIES:
+        await reply(ctx, f"Scoring must be one of: {', '.join(STRATEGIES)}.")
+        return
+    catalog.settings[quiz_name]["scoring"] = strategy
+    catalog.save_settings(quiz_name)
+    await reply(ctx, f"Scoring for **{quiz_name}** set to {strategy}.")
+
+# !setexport - Sets the results file format (xlsx or csv).
+@command(name="setexport")
+async def set_export(ctx, quiz_name: str, fmt: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.settings:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    fmt = fmt.lower()
+    if fmt not in EXPORT_FORMATS:
+        await reply(ctx, f"Export format must be one of: {', '.join(EXPORT_FORMATS)}.")
+        return
+    catalog.settings[quiz_name]["export_format"] = fmt
+    catalog.save_settings(quiz_name)
+    await reply(ctx, f"Results for **{quiz_name}** will be exported as {fmt}.")
+
+# !setpause - Sets the pause between questions (0 posts the next question right after the answer).
+@command(name="setpause")
+async def set_pause(ctx, quiz_name: str, seconds: int):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.settings:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    if not (0 <= seconds <= MAX_INTERMISSION):
+        await reply(ctx, f"Pause must be between 0 and {MAX_INTERMISSION} seconds.")
+        return
+    catalog.settings[quiz_name]["intermission"] = seconds
+    catalog.save_settings(quiz_name)
+    await reply(ctx, f"Pause between questions for **{quiz_name}** set to {seconds} seconds.")
+
+# !setclose - Sets when questions close: after the time limit, or adaptively (everyone answered or a quiet period passed).
+@command(name="setclose")
+async def set_close(ctx, quiz_name: str, mode: str, quiet_seconds: int = QUIET_PERIOD):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.settings:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    mode = mode.lower()
+    if mode not in CLOSE_MODES:
+        await reply(ctx, f"Close mode must be one of: {', '.join(CLOSE_MODES)}.")
+        return
+    if quiet_seconds < 0:
+        await reply(ctx, "Quiet period cannot be negative.")
+        return
+    catalog.settings[quiz_name]["close_mode"] = mode
+    catalog.settings[quiz_name]["quiet_period"] = quiet_seconds
+    catalog.save_settings(quiz_name)
+    await reply(ctx, f"Questions of **{quiz_name}** now close: {close_label(catalog.settings[quiz_name])}.")
+
+# A question ready to post: options in display order, the embed without its countdown, and the view.
+class PreparedQuestion:
+    def __init__(self, index, question, embed, view, order=None):
+        self.index = index
+        self.question = question
+        self.order = order  # option_order() used to shuffle it, or None
+        self.embed = embed
+        self.view = view
+
+# --- QUIZ SESSIONS ---
+# A running quiz is a state machine: starting -> open -> closing -> intermission -> open ... -> finished.
+# Countdown edits, the question deadline and the pause between questions are timers on the shared
+# wheel in `sessions`; each timer runs one short step. Steps of a session never overlap.
+#
+# Runs are checkpointed so a restart continues them (see resume_sessions()). Every recorded answer is
+# already in the answers log, so a checkpoint only adds the control state at question boundaries:
+# the open question and its deadline, or the question closed last with its score changes. Both go
+# through the store's writer queue in order, so a checkpoint never runs ahead of the answers it
+# covers, and a crash loses at most the writes of the last flush interval.
+class QuizSession:
+    def __init__(self, ctx, quiz_name, question_list, shuffle_flag, seed=None):
+        catalog = self.catalog = guild_catalog(ctx)
+        self.ctx = ctx
+        self.quiz_name = quiz_name
+        self.key = (catalog.guild_id, ctx.channel.id, quiz_name)
+        self.session_id = os.urandom(6).hex()
+        self.question_list = question_list.copy()
+        self.shuffle_flag = shuffle_flag
+        # Options are shuffled from this seed in question order, so a seed replays the same order.
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+        self.prepared = None   # PreparedQuestion for the next question, built during the pause
+        self.scoring_name = catalog.settings.get(quiz_name, {}).get("scoring", "rank_decay")
+        self.scoring_state = {}
+        self.total_scores = Leaderboard()
+        self.participants = set()
+        self.last_question = None
+        self.state = "starting"
+        self.index = 0         # 1-based number of the current question
+        self.question = None   # LiveQuestion while answers are accepted
+        self.quiet_timer = None
+        self.ack = Histogram()  # answer acknowledgement latency in this session
+        self.stopped = False
+        self.timers = []
+        self.tasks = set()
+        self.lock = asyncio.Lock()
+        self.done = asyncio.get_running_loop().create_future()
+
+    def start(self):
+        sessions.add(self)
+        self.catalog.start_checkpoint(self.session_id, self.ctx.channel.id, self.quiz_name, self.question_list, self.checkpoint("starting"))
+        self.run_step(self.ask_next)
+
+    # Checkpoint state for the current phase; question_list and scores are stored separately.
+    def checkpoint(self, phase, **fields):
+        return {"phase": phase, "index": self.index, "seed": self.seed, "shuffle": self.shuffle_flag, "scoring": self.scoring_name, **fields}
+
+    # Rebuilds a run from its checkpoint and continues it: an open question is reopened with the
+    # answers it already had and its original deadline, otherwise the next question is asked.
+    @classmethod
+    def restore(cls, ctx, quiz_name, session_id, question_list, state):
+        session = cls(ctx, quiz_name, question_list, state["shuffle"], state["seed"])
+        session.session_id = session_id
+        session.scoring_name = state["scoring"]
+        session.scoring_state = restore_scoring_state(state.get("scoring_state", {}))
+        catalog = session.catalog
+        session.total_scores = Leaderboard(catalog.session_scores(session_id))
+        answers = catalog.session_answers(quiz_name, session_id)
+        session.participants = {row[1] for row in answers}
+        reopen = state["phase"] == "open"
+        session.index = state["index"] - 1 if reopen else state["index"]
+        # Replays the shuffles of the questions before it, so the rest of the run keeps its option order.
+        if session.shuffle_flag:
+            for question in session.question_list[:session.index]:
+                option_order(len(question.options), session.rng)
+        sessions.add(session)
+        metrics.inc("quizbot_sessions_resumed_total")
+        reply(ctx, f"Quiz **{quiz_name}** was interrupted by a restart and continues now.", priority=PRIORITY_LIVE)
+        if reopen:
+            session.state = "closing"
+            session.run_step(session.reopen, state, answers)
+        else:
+            session.state = "intermission"
+            session.schedule(state.get("next_at", 0) - time.time(), session.ask_next)
+        return session
+
+    async def reopen(self, state, answers):
+        ctx = self.ctx
+        self.index += 1
+        idx = self.index
+        prepared = self.prepare(idx)
+        question = prepared.question
+        deadline = state["deadline"]
+        self.options = question.options
+        self.correct_index = question.correct_answer_index
+        self.total_time = question.duration
+        self.countdown_mode = self.catalog.settings.get(self.quiz_name, {}).get("countdown_mode", "timestamp")
+        self.embed = prepared.embed
+        render_countdown(self.embed, self.countdown_mode, deadline, self.total_time)
+        expected = frozenset(user_id for number, user_id, *_ in answers if number < idx)
+        live = LiveQuestion(self, idx, question, total_time=self.total_time, option_order=prepared.order, expected=expected)
+        live.start_time = time.monotonic() - (time.time() - state["started"])
+        # The log has the options' positions in the bank; responses use the position shown.
+        shown = {bank: position for position, bank in enumerate(prepared.order)} if prepared.order else None
+        rows = [row for row in answers if row[0] == idx]
+        names = await member_cache.resolve(ctx.guild, [row[1] for row in rows])
+        for _, user_id, answer_index, correct, answer_time in sorted(rows, key=lambda row: row[4]):
+            response = {
+                "username": display_name(names, user_id),
+                "answer_index": shown[answer_index] if shown else answer_index,
+                "correct": bool(correct),
+                "answer_time": answer_time
+            }
+            live.responses[user_id] = response
+            live.answer_order.append((user_id, response))
+        self.question = live
+        live_questions[(self.session_id, idx)] = live
+        self.state = "open"
+        # The question's message is still up and its buttons still route here (see QuizAnswerButton).
+        self.quiz_message = ctx.channel.get_partial_message(state["message_id"])
+        self.schedule_countdown(deadline)
+        self.answers_recorded(live)
+
+    # Stops after the current question; an open question is closed right away.
+    def stop(self):
+        self.stopped = True
+        if self.state == "open":
+            self.cancel_timers()
+            self.run_step(self.close_question)
+        elif self.state == "intermission":
+            self.cancel_timers()
+            self.run_step(self.ask_next)
+
+    def schedule(self, delay, step, *args):
+        timer = sessions.wheel.schedule(delay, lambda: self.run_step(step, *args))
+        self.timers.append(timer)
+        return timer
+
+    # Called when a question opens or reopens and after each batch of new answers to it. In adaptive
+    # mode the question is closed once every expected user has answered; otherwise each batch restarts
+    # the quiet period, which starts with the first answer.
+    def answers_recorded(self, question):
+        if self.state != "open" or question is not self.question:
+            return
+        settings = self.catalog.settings.get(self.quiz_name, {})
+        if settings.get("close_mode", "timer") != "adaptive":
+            return
+        if question.expected and question.expected <= question.responses.keys():
+            self.cancel_timers()
+            self.run_step(self.close_question, question.question_index)
+            return
+        if not question.responses:
+            return
+        quiet = settings.get("quiet_period", QUIET_PERIOD)
+        if quiet > 0:
+            if self.quiet_timer is not None:
+                self.quiet_timer.cancel()
+            self.quiet_timer = self.schedule(quiet, self.close_question, question.question_index)
+
+    def cancel_timers(self):
+        for timer in self.timers:
+            timer.cancel()
+        self.timers.clear()
+        self.quiet_timer = None
+
+    def run_step(self, step, *args):
+        task = asyncio.create_task(self.guarded(step, *args))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def guarded(self, step, *args):
+        async with self.lock:
+            if self.state == "finished":
+                return
+            try:
+                await step(*args)
+            except Exception:
+                traceback.print_exc()
+                await self.abort()
+
+    async def ask_next(self):
+        catalog = self.catalog
+        ctx = self.ctx
+        quiz_name = self.quiz_name
+        if self.stopped:
+            reply(ctx, f"Quiz **{quiz_name}** was stopped by a user.", priority=PRIORITY_LIVE)
+            await self.finish()
+            return
+        if self.index >= len(self.question_list):
+            await self.finish()
+            return
+        self.index += 1
+        idx = self.index
+        prepared = self.prepared if self.prepared is not None and self.prepared.index == idx else self.prepare(idx)
+        self.prepared = None
+
+        total_time = prepared.question.duration
+        countdown_mode = catalog.settings.get(quiz_name, {}).get("countdown_mode", "timestamp")
+        embed = prepared.embed
+        deadline = time.time() + total_time
+        render_countdown(embed, countdown_mode, deadline, total_time)
+
+        self.options = prepared.question.options
+        self.correct_index = prepared.question.correct_answer_index
+        self.total_time = total_time
+        self.countdown_mode = countdown_mode
+        self.embed = embed
+        # Adaptive close waits for everyone who has answered so far in this run; on the first question,
+        # for the players of the quiz's previous run.
+        expected = self.participants or catalog.participants.get(quiz_name, ())
+        self.question = LiveQuestion(self, idx, prepared.question, total_time=total_time, option_order=prepared.order, expected=frozenset(expected))
+        live_questions[(self.session_id, idx)] = self.question
+        self.state = "open"
+        self.quiz_message = await reply(ctx, embed=embed, view=prepared.view, priority=PRIORITY_LIVE)
+        catalog.save_checkpoint(self.session_id, self.checkpoint("open", started=deadline - total_time, deadline=deadline, message_id=self.quiz_message.id))
+        self.schedule_countdown(deadline)
+        self.answers_recorded(self.question)
+
+    # Shuffles and renders question idx (1-based). Called in question order, one question ahead.
+    def prepare(self, idx):
+        question = self.question_list[idx - 1]
+        order = None
+        if self.shuffle_flag:
+            order = option_order(len(question.options), self.rng)
+            question = reorder_options(question, order)
+        embed = discord.Embed(
+            title=f"{self.quiz_name} - Question {idx}",
+            description=question.question,
+            color=discord.Color.blue()
+        )
+        for i, opt in enumerate(question.options, start=1):
+            embed.add_field(name=f"Option {i}", value=opt, inline=False)
+        return PreparedQuestion(idx, question, embed, QuizView(self.session_id, idx, len(question.options)), order)
+
+    def schedule_countdown(self, deadline):
+        catalog = self.catalog
+        settings = catalog.settings.get(self.quiz_name, {})
+        total_time = self.total_time
+        if self.countdown_mode == "live":
+            # A reopened question only has the seconds left before its deadline.
+            for remaining in range(min(total_time, math.ceil(deadline - time.time())), 0, -1):
+                self.schedule(deadline - remaining - time.time(), self.countdown_tick, remaining)
+        elif self.countdown_mode == "milestones":
+            for m in settings.get("countdown_milestones", DEFAULT_COUNTDOWN_MILESTONES):
+                if 0 < m < min(total_time, deadline - time.time()):
+                    self.schedule(deadline - m - time.time(), self.countdown_tick, m)
+        self.schedule(deadline - time.time(), self.close_question, self.index)
+
+    async def countdown_tick(self, remaining):
+        if self.state != "open":
+            return
+        # Milestone edits respect the channel's edit budget; "live" keeps its old behaviour.
+        if self.countdown_mode != "live" and not outbox.reserve(self.quiz_message.channel.id, "edit"):
+            metrics.inc("quizbot_edits_skipped_total")
+            return
+        self.embed.set_footer(text=f"Time remaining: {remaining} seconds")
+        await self.edit_question(embed=self.embed)
+
+    async def edit_question(self, **kwargs):
+        started = time.perf_counter()
+        await self.quiz_message.edit(**kwargs)
+        metrics.observe("quizbot_edit_seconds", time.perf_counter() - started)
+
+    # Closes the open question; index, if given, must be the open question's (early closes).
+    async def close_question(self, index=None):
+        catalog = self.catalog
+        if self.state != "open" or index not in (None, self.index):
+            return
+        ctx = self.ctx
+        quiz_name = self.quiz_name
+        idx = self.index
+        self.state = "closing"
+        self.cancel_timers()
+        question = self.question
+        await question.close()
+        self.question = None
+        live_questions.pop((self.session_id, idx), None)
+        # The closing edit always goes through, but it still counts against the channel's budget.
+        outbox.reserve(self.quiz_message.channel.id, "edit", force=True)
+        close_countdown(self.embed, self.countdown_mode)
+        await self.edit_question(embed=self.embed, view=QuizView(self.session_id, idx, len(self.options), disabled=True))
+        if idx < len(self.question_list) and not self.stopped:
+            self.prepared = self.prepare(idx + 1)
+
+        # The question is closed, so answer_order no longer changes while the worker thread reads it.
+        scoring_started = time.perf_counter()
+        if len(question.answer_order) >= SCORING_THREAD_THRESHOLD:
+            awards = await asyncio.to_thread(score_responses, self.scoring_name, question.answer_order, self.total_time, self.scoring_state)
+        else:
+            awards = score_responses(self.scoring_name, question.answer_order, self.total_time, self.scoring_state)
+        self.total_scores.update(awards)
+        metrics.observe("quizbot_scoring_seconds", time.perf_counter() - scoring_started, (("strategy", self.scoring_name),))
+
+        fastest = next(((uid, data) for uid, data in question.answer_order if data["correct"]), None)
+        if fastest:
+            fastest_user_id, fastest_data = fastest
+            fastest_user_name = fastest_data["username"]
+            fastest_time = fastest_data["answer_time"]
+        else:
+            fastest_user_name = None
+            fastest_time = None
+        self.last_question = {
+            "correct_answer": self.options[self.correct_index],
+            "all_options": self.options,
+            "fastest": fastest_user_name,
+            "fastest_time": fastest_time
+        }
+        catalog.last_question_info[quiz_name] = self.last_question
+
+        if catalog.settings.get(quiz_name, {}).get("auto_show_answer", True):
+            reply(ctx, f"Correct answer: **{self.options[self.correct_index]}**", priority=PRIORITY_LIVE)
+        if catalog.settings.get(quiz_name, {}).get("auto_show_fastest", True):
+            if fastest:
+                reply(ctx, f"Fastest correct answer: **{fastest_user_name}** ({fastest_time:.2f} sec)", priority=PRIORITY_LIVE)
+            else:
+                reply(ctx, "No one answered correctly for this question.", priority=PRIORITY_LIVE)
+        self.state = "intermission"
+        pause = catalog.settings.get(quiz_name, {}).get("intermission", INTERMISSION)
+        catalog.save_checkpoint(self.session_id, self.checkpoint("intermission", scoring_state=self.scoring_state, next_at=time.time() + pause), awards)
+        if self.stopped or pause <= 0:
+            self.run_step(self.ask_next)
+        else:
+            self.schedule(pause, self.ask_next)
+
+    async def finish(self):
+        catalog = self.catalog
+        ctx = self.ctx
+        quiz_name = self.quiz_name
+        total_scores = self.total_scores
+        self.state = "finishing"
+        reply(ctx, "Quiz completed. Thank you for participating!", priority=PRIORITY_LIVE)
+
+        total_scores.update({uid: 0 for uid in self.participants if uid not in total_scores})
+
+        # Queued right before the results, so a restart either resumes the run or sees it finished.
+        catalog.delete_checkpoint(self.session_id)
+        catalog.leaderboards[quiz_name] = total_scores
+        catalog.participants[quiz_name] = self.participants
+        catalog.add_results(quiz_name, total_scores.scores)
+        # Make sure the finished run is on disk before announcing it.
+        await store.flush()
+        catalog.compact_answers(quiz_name)
+        if total_scores:
+            ranked = total_scores.top()
+            names = await member_cache.resolve(ctx.guild, [user_id for user_id, _ in ranked])
+            rows = [(user_id, display_name(names, user_id), score) for user_id, score in ranked]
+            export_format = catalog.settings.get(quiz_name, {}).get("export_format", "xlsx")
+            filename, data, stats = await export_results(quiz_name, rows, export_format)
+            catalog.exports[quiz_name] = (filename, data)
+            metrics.observe("quizbot_export_seconds", stats["seconds"], (("format", export_format),))
+            print(f"Exported {filename}: {stats['rows']} rows in {stats['seconds']:.2f}s, max loop stall {stats['max_loop_stall'] * 1000:.1f}ms")
+
+            # Post leaderboard automatically
+            lb_count = catalog.settings.get(quiz_name, {}).get("leaderboard_count", 10)
+            lb_mention = catalog.settings.get(quiz_name, {}).get("leaderboard_mention", True)
+            reply(ctx, await format_leaderboard(ctx, f"**{quiz_name}** Leaderboard (Top {lb_count}):", total_scores.top(lb_count), lb_mention), priority=PRIORITY_LIVE)
+        self.end()
+
+    # Drops the session after an unexpected error, releasing the open question if there is one.
+    async def abort(self):
+        self.catalog.delete_checkpoint(self.session_id)
+        if self.question is not None:
+            live_questions.pop((self.session_id, self.index), None)
+            await self.question.close()
+            self.question = None
+        self.end()
+
+    def end(self):
+        self.state = "finished"
+        self.cancel_timers()
+        sessions.remove(self)
+        if not self.done.done():
+            self.done.set_result(None)
+
+# Scoring state maps names to {user_id: value} (see scoring.py); JSON keeps the user ids as strings.
+def restore_scoring_state(state):
+    return {name: {int(user_id): value for user_id, value in values.items()} for name, values in state.items()}
+
+# Resumes the runs that were interrupted by a restart. With shards split across workers (shards.py),
+# each worker resumes the runs of its own guilds. Runs whose channel is gone are dropped.
+async def resume_sessions():
+    for guild_id, session_id, channel_id, quiz_name, question_list, state in store.load_checkpoints():
+        if config.shard_ids is not None and shard_for(guild_id, config.shard_count) not in config.shard_ids:
+            continue
+        channel = bot.get_channel(channel_id)
+        if channel is None:
+            try:
+                channel = await bot.fetch_channel(channel_id)
+            except (discord.NotFound, discord.Forbidden):
+                store.delete_checkpoint(guild_id, session_id)
+                continue
+            except discord.HTTPException:
+                traceback.print_exc()
+                continue
+        ctx = SimpleNamespace(guild=getattr(channel, "guild", None), channel=channel, author=None)
+        if channel_session(ctx, quiz_name) is not None:
+            continue
+        try:
+            QuizSession.restore(ctx, quiz_name, session_id, question_list, state)
+        except Exception:
+            traceback.print_exc()
+            store.delete_checkpoint(guild_id, session_id)
+            continue
+        print(f"Resumed quiz {quiz_name} in channel {channel_id} at question {state['index']}")
+
+# The session running this quiz in the command's channel, or None.
+def channel_session(ctx, quiz_name):
+    return sessions.get(guild_id(ctx), ctx.channel.id, quiz_name)
+
+# !stopquiz - Stops the active quiz in this channel.
+@command(name="stopquiz")
+async def stop_quiz(ctx, quiz_name: str):
+    session = channel_session(ctx, quiz_name)
+    if session is None:
+        await reply(ctx, f"No active quiz named **{quiz_name}** found in this channel.")
+        return
+    session.stop()
+    await reply(ctx, f"Quiz **{quiz_name}** is being stopped...")
+
+# !startquiz - Starts the quiz in this channel.
+@command(name="startquiz")
+async def start_quiz(ctx, quiz_name: str, shuffle: str = "default", seed: int = None):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.quizzes:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    question_list = catalog.quizzes[quiz_name]
+    if not question_list:
+        await reply(ctx, f"**{quiz_name}** has no questions. Please add some.")
+        return
+    if channel_session(ctx, quiz_name) is not None:
+        await reply(ctx, f"Quiz **{quiz_name}** is already running in this channel.")
+        return
+
+    if shuffle.lower() == "default":
+        shuffle_flag = catalog.settings.get(quiz_name, {}).get("shuffle", False)
+    else:
+        shuffle_flag = shuffle.lower() in ["true", "shuffle", "yes", "1"]
+
+    QuizSession(ctx, quiz_name, question_list, shuffle_flag, seed).start()
+
+# !quizsessions - Shows how many quiz sessions are running.
+@command(name="quizsessions")
+async def quiz_sessions(ctx):
+    local = sessions.for_guild(guild_id(ctx))
+    msg = f"Active quiz sessions: {len(sessions)} in total, {len(local)} in this server.\n"
+    for session in local:
+        msg += f"- {session.quiz_name} in <#{session.key[1]}>: question {session.index}/{len(session.question_list)} ({session.state}), seed {session.seed}\n"
+    await reply(ctx, msg)
+
+# !sendqueue - Shows the outgoing message queues of this server's channels.
+@command(name="sendqueue")
+async def send_queue(ctx):
+    stats = outbox.stats(guild_id(ctx))
+    if not stats:
+        await reply(ctx, "No messages are queued in this server.")
+        return
+    msg = "**Outgoing message queues:**\n"
+    for channel_id, queue in stats.items():
+        msg += f"- <#{channel_id}>: {queue['depth']} queued, {queue['sent']} sent, {queue['merged']} merged, wait avg {queue['avg_wait'] * 1000:.0f}ms / max {queue['max_wait'] * 1000:.0f}ms\n"
+    await reply(ctx, msg)
+
+def format_ms(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 0.01:
+        return f"{seconds * 1000:.1f} ms"
+    return f"{seconds * 1000:.0f} ms" if seconds < 10 else f"{seconds:.0f} s"
+
+def latency_summary(histogram):
+    if histogram is None or not histogram.count:
+        return "none yet"
+    return f"{histogram.count}, p50 {format_ms(histogram.quantile(0.5))} / p99 {format_ms(histogram.quantile(0.99))}"
+
+# !quizstats - Shows the bot's health: sessions, latencies of answers, scoring, exports, messages and commands.
+@command(name="quizstats")
+async def quiz_stats(ctx):
+    uptime = int(time.time() - metrics.started)
+    latency = bot.latency if math.isfinite(bot.latency) else None  # NaN/inf until the first heartbeat
+    lag = metrics.histogram("quizbot_event_loop_lag_seconds")
+    running = sessions.for_guild(guild_id(ctx))
+    lines = [
+        f"**Quiz bot stats** (up {uptime // 3600}h {uptime % 3600 // 60}m)",
+        f"Sessions running: {len(sessions)} (this server: {len(running)}). Gateway latency: {format_ms(latency)}. "
+        f"Event loop lag: {format_ms(metrics.loop_lag)} now, p99 {format_ms(lag.quantile(0.99) if lag else None)}",
+        f"Answers acknowledged: {latency_summary(metrics.histogram('quizbot_answer_ack_seconds'))}",
+        f"Questions scored: {latency_summary(metrics.merged('quizbot_scoring_seconds'))}",
+        f"Results exported: {latency_summary(metrics.merged('quizbot_export_seconds'))}",
+        f"Messages sent (including rate-limit waits): {latency_summary(metrics.histogram('quizbot_send_seconds'))}",
+        f"Question edits: {latency_summary(metrics.histogram('quizbot_edit_seconds'))}, {metrics.total('quizbot_edits_skipped_total')} skipped for the rate limit",
+        f"Commands: {latency_summary(metrics.merged('quizbot_command_seconds'))}, {metrics.total('quizbot_command_errors_total')} failed"
+    ]
+    for session in running:
+        lines.append(f"- **{session.quiz_name}** in <#{session.key[1]}>: question {session.index}/{len(session.question_list)}, answers {latency_summary(session.ack)}")
+    await reply(ctx, "\n".join(lines))
+
+# Builds a leaderboard message from [(user_id, score), ...] in rank order.
+async def format_leaderboard(ctx, title, entries, lb_mention):
+    names = await member_cache.resolve(ctx.guild, [user_id for user_id, _ in entries])
+    msg = title + "\n"
+    for rank, (user_id, score) in enumerate(entries, start=1):
+        if user_id in names and lb_mention:
+            user_str = names[user_id][1]
+        else:
+            user_str = display_name(names, user_id)
+        msg += f"{rank}. {user_str} - {score} points\n"
+    return msg
+
+# !sendresults - Sends the quiz's results file (Excel or CSV) to Discord.
+@command(name="sendresults")
+async def send_results(ctx, quiz_name: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.exports:
+        await reply(ctx, f"No results file found for quiz **{quiz_name}**.")
+        return
+    filename, data = catalog.exports[quiz_name]
+    await reply(ctx, file=discord.File(io.BytesIO(data), filename=filename))
+
+# Last closed question of the run in this channel, else of the quiz's last run anywhere.
+def last_question(ctx, quiz_name):
+    catalog = guild_catalog(ctx)
+    session = channel_session(ctx, quiz_name)
+    if session is not None and session.last_question is not None:
+        return session.last_question
+    return catalog.last_question_info.get(quiz_name)
+
+# !showanswer - Shows the correct answer and options for the last question.
+@command(name="showanswer")
+async def show_answer(ctx, quiz_name: str):
+    info = last_question(ctx, quiz_name)
+    if info is None:
+        await reply(ctx, "No information found for the last question of this quiz.")
+        return
+    options_str = ", ".join(info["all_options"])
+    await reply(ctx, f"Correct answer: **{info['correct_answer']}**\nOptions: {options_str}")
+
+# !fastest - Shows the fastest correct answer details for the last question.
+@command(name="fastest")
+async def fastest_answer(ctx, quiz_name: str):
+    info = last_question(ctx, quiz_name)
+    if info is None:
+        await reply(ctx, "No information found for the last question of this quiz.")
+        return
+    if info.get("fastest") is None:
+        await reply(ctx, "No one answered correctly for this question.")
+        return
+    await reply(ctx, f"Fastest correct answer: **{info['fastest']}** ({info['fastest_time']:.2f} sec)")
+
+# !showquiz - Lists all questions and correct answers of the quiz, QUESTIONS_PER_PAGE per page.
+@command(name="showquiz")
+async def show_quiz(ctx, quiz_name: str, page: int = 1):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.quizzes:
+        await reply(ctx, f"No quiz named **{quiz_name}** found.")
+        return
+    await send_page(ctx, "quiz", quiz_name, page - 1)
+
+# !leaderboard - Shows the leaderboard (top entries) for the quiz.
+@command(name="leaderboard")
+async def leaderboard(ctx, quiz_name: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.leaderboards:
+        await reply(ctx, f"No leaderboard found for quiz **{quiz_name}**. The quiz might not be completed yet.")
+        return
+    scores = catalog.leaderboards[quiz_name]
+    if not scores:
+        await reply(ctx, "No participants scored any points in this quiz.")
+        return
+    lb_count = catalog.settings.get(quiz_name, {}).get("leaderboard_count", 10)
+    lb_mention = catalog.settings.get(quiz_name, {}).get("leaderboard_mention", True)
+    await reply(ctx, await format_leaderboard(ctx, f"**{quiz_name}** Leaderboard (Top {lb_count}):", scores.top(lb_count), lb_mention))
+
+# !ranking - Shows an aggregate leaderboard over every run: one quiz's all-time board, the server's
+# all-time board across quizzes, or a season's board (the current season by default).
+@command(name="ranking")
+async def ranking(ctx, scope: str, name: str = None):
+    catalog = guild_catalog(ctx)
+    scope = scope.lower()
+    if scope == "quiz" and name:
+        board, title = quiz_board(name), f"**{name}** All-Time"
+    elif scope == "server":
+        board, title = GUILD_BOARD, "Server All-Time"
+    elif scope == "season":
+        name = name or catalog.season()
+        board, title = season_board(name), f"Season **{name}**"
+    else:
+        await reply(ctx, "Usage: !ranking quiz <quiz_name>, !ranking server or !ranking season [season_name]")
+        return
+    if board not in catalog.aggregates:
+        seasons = [key[len(season_board("")):] for key in catalog.aggregates if key.startswith(season_board(""))]
+        known = f" Seasons with results: {', '.join(seasons)}." if scope == "season" and seasons else ""
+        await reply(ctx, f"No completed runs count towards this leaderboard yet.{known}")
+        return
+    scores = catalog.aggregates[board]
+    settings = catalog.settings.get(name, {}) if scope == "quiz" else {}
+    lb_count = settings.get("leaderboard_count", 10)
+    lb_mention = settings.get("leaderboard_mention", True)
+    msg = await format_leaderboard(ctx, f"{title} Leaderboard (Top {lb_count}):", scores.top(lb_count), lb_mention)
+    rank = scores.rank(ctx.author.id)
+    if rank is not None:
+        msg += f"Your rank: #{rank} of {len(scores)} with {scores.get(ctx.author.id)} points."
+    await reply(ctx, msg)
+
+# !setseason - Shows the current season, or starts a new named season for the server's season leaderboard.
+@command(name="setseason")
+async def set_season(ctx, name: str = None):
+    catalog = guild_catalog(ctx)
+    if name is None:
+        await reply(ctx, f"The current season is **{catalog.season()}**.")
+        return
+    catalog.set_season(name)
+    await reply(ctx, f"Season **{name}** has started. Finished runs now count towards it.")
+
+# !liveboard - Shows the current standings of a quiz that is running in this channel.
+@command(name="liveboard")
+async def live_board(ctx, quiz_name: str):
+    catalog = guild_catalog(ctx)
+    session = channel_session(ctx, quiz_name)
+    if session is None:
+        await reply(ctx, f"Quiz **{quiz_name}** is not running in this channel right now.")
+        return
+    scores = session.total_scores
+    if not scores:
+        await reply(ctx, "No one has scored yet.")
+        return
+    lb_count = catalog.settings.get(quiz_name, {}).get("leaderboard_count", 10)
+    lb_mention = catalog.settings.get(quiz_name, {}).get("leaderboard_mention", True)
+    await reply(ctx, await format_leaderboard(ctx, f"**{quiz_name}** Live Standings (Top {lb_count}):", scores.top(lb_count), lb_mention))
+
+# !myrank - Shows your rank in the quiz running in this channel, or in its last completed run.
+@command(name="myrank")
+async def my_rank(ctx, quiz_name: str):
+    catalog = guild_catalog(ctx)
+    session = channel_session(ctx, quiz_name)
+    scores = session.total_scores if session is not None else catalog.leaderboards.get(quiz_name)
+    rank = scores.rank(ctx.author.id) if scores is not None else None
+    if rank is None:
+        await reply(ctx, f"You have no score in quiz **{quiz_name}** yet.")
+        return
+    await reply(ctx, f"{ctx.author.mention} is ranked #{rank} of {len(scores)} in **{quiz_name}** with {scores.get(ctx.author.id)} points.")
+
+# !answerstats - Shows answer statistics over every run of the quiz: the hardest questions, or one
+# question's accuracy, answer times and option distribution (question_number is 1-based).
+@command(name="answerstats")
+async def answer_stats(ctx, quiz_name: str, question_number: int = None):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.quizzes:
+        await reply(ctx, f"Quiz **{quiz_name}** does not exist.")
+        return
+    await store.flush()
+    columns = await asyncio.to_thread(store.load_answer_columns, catalog.guild_id, quiz_name)
+    if not columns:
+        await reply(ctx, f"No answers have been recorded for quiz **{quiz_name}** yet.")
+        return
+    questions = catalog.quizzes[quiz_name]
+    if question_number is None:
+        stats = await asyncio.to_thread(question_stats, columns)
+        lines = [f"**{quiz_name}**: {len(columns)} answers over {len(columns.sessions)} runs. Hardest questions:"]
+        for s in hardest(stats, ANSWER_STATS_SHOWN):
+            text = clip(questions.text(s.question - 1), 80) if s.question <= len(questions) else "(removed)"
+            lines.append(f"Q{s.question}: {s.correct / s.answers:.0%} correct of {s.answers}, median {s.median:.2f}s, p90 {s.p90:.2f}s - {text}")
+        await reply(ctx, "\n".join(lines))
+        return
+    detail = await asyncio.to_thread(question_detail, columns, question_number)
+    if detail is None:
+        await reply(ctx, f"No answers have been recorded for question {question_number} of **{quiz_name}**.")
+        return
+    options = questions.options(question_number - 1) if question_number <= len(questions) else ()
+    correct_index = questions.correct[question_number - 1] if options else None
+    times = ", ".join(f"p{p} {t:.2f}s" for p, t in detail["percentiles"].items())
+    lines = [
+        f"**{quiz_name}** Q{question_number}: {detail['correct'] / detail['answers']:.0%} correct of {detail['answers']} answers.",
+        f"Answer times: {times}"
+    ]
+    for index in sorted(set(range(len(options))) | set(detail["options"])):
+        count = detail["options"][index]
+        label = clip(options[index], 80) if index < len(options) else "(removed)"
+        mark = " ✓" if index == correct_index else ""
+        lines.append(f"Option {index + 1}{mark}: {count} ({count / detail['answers']:.0%}) - {label}")
+    await reply(ctx, "\n".join(lines))
+
+# !quizsettings - Lists the settings for all quizzes, SETTINGS_PER_PAGE per page.
+@command(name="quizsettings")
+async def quiz_settings_cmd(ctx, page: int = 1):
+    catalog = guild_catalog(ctx)
+    if not catalog.quizzes:
+        await reply(ctx, "No quizzes have been created yet.")
+        return
+    await send_page(ctx, "settings", "", page - 1)
+
+# !quizidlist - Lists participant IDs for the specified quiz in a TXT file.
+@command(name="quizidlist")
+async def quiz_id_list(ctx, quiz_name: str):
+    catalog = guild_catalog(ctx)
+    if quiz_name not in catalog.participants or not catalog.participants[quiz_name]:
+        await reply(ctx, f"No participants found for quiz **{quiz_name}**.")
+        return
+    id_list = list(catalog.participants[quiz_name])
+    id_list.sort()
+    lines = []
+    for i in range(0, len(id_list), 150):
+        group = id_list[i:i+150]
+        line = " ".join(str(user_id) for user_id in group)
+        lines.append(line)
+    text = "\n".join(lines)
+    file_object = io.StringIO(text)
+    file_object.name = f"quizidlist_{quiz_name}.txt"
+    await reply(ctx, file=discord.File(file_object))
+    file_object.close()
+
+# !quizhelp - Displays the help menu with all commands.
+@command(name="quizhelp")
+async def quiz_help(ctx):
+    help_text = (
+        "Quiz Bot Help Menu\n"
+        "You can create a quiz, add questions, edit questions, stop a quiz, run the quiz, send the results as an Excel file (only via !sendresults), and view information about the last question.\n"
+        "Every command is also a slash command (e.g. /startquiz), which completes quiz names and question numbers as you type.\n\n"
+        "Additional Features:\n"
+        "!toggleanswer <quiz_name> <on/off>: Enable/disable auto-show of the correct answer after each question.\n"
+        "!togglefastest <quiz_name> <on/off>: Enable/disable auto-show of the fastest correct answer after each question.\n"
+        "!togglecorrect <quiz_name> <on/off>: (Old toggle) Enable/disable correct feedback messages.\n"
+        "!togglewrong <quiz_name> <on/off>: (Old toggle) Enable/disable incorrect feedback messages.\n"
+        "!setleaderboard <quiz_name> <count> <mention (true/false)>: Set leaderboard settings.\n"
+        "!showquiz <quiz_name> [page]: List the questions and correct answers of the quiz, a page at a time.\n"
+        "!leaderboard <quiz_name>: Show the leaderboard (top entries) for the quiz.\n\n"
+        "!createquiz <quiz_name>\n"
+        "Creates a new quiz.\n"
+        "!addq (alias: !a) <quiz_name> <duration> <correct_index> Question text | Option1 | Option2 | ...\n"
+        "Simplified command to add a single question.\n"
+        "!editq <quiz_name> <question_index> <duration> <correct_index> Question text | Option1 | Option2 | ...\n"
+        "Edits the specified question (question_index is 1-based).\n"
+        "!bulkadd <quiz_name>\n"
+        "Bulk add questions. Each line should be in the format: duration|correct_index|Question text|Option1|Option2|...\n"
+        "Example (for 10 questions):\n"
+        "!bulkadd <quizname>\n"
+        "30|1|What is L1?|Option A|Option B|Option C\n"
+        "20|0|Favorite color?|Blue|Red|Green|Yellow\n"
+        "25|2|Which planet is known as the Red Planet?|Earth|Venus|Mars\n"
+        "30|1|Capital of Turkey?|Istanbul|Ankara|Izmir\n"
+        "20|0|What is 2+2?|3|4|5\n"
+        "30|2|Which language is used for Android development?|Java|Kotlin|Swift|Python\n"
+        "25|0|Who painted the Mona Lisa?|Da Vinci|Picasso|Van Gogh\n"
+        "30|1|Chemical symbol for Gold?|Au|Ag|Pt\n"
+        "20|2|Largest ocean on Earth?|Atlantic|Indian|Pacific\n"
+        "30|0|Currency of Japan?|Yen|Dollar|Euro\n"
+        "Lines that cannot be read are listed in the reply with their line number.\n"
+        "!importq <quiz_name> [file_name]\n"
+        "Imports questions from an attached file with no length limit: .txt (one duration|correct_index|Question|Option1|... line per question), .csv (the same fields as columns) or .jsonl (one {\"duration\", \"correct_answer_index\", \"question\", \"options\"} object per line). Without an attachment, file_name is read from the bot's import folder (QUIZBOT_IMPORT_DIR).\n\n"
+        "!listquizzes [page]: List the quizzes of this server and their question counts. Each server has its own quizzes.\n"
+        "!deletequiz <quiz_name>: Delete the specified quiz and its Excel file if available.\n"
+        "!mixquestions <quiz_name> <true/false>: Set shuffle mode for the quiz.\n"
+        "!toggleanswer <quiz_name> <on/off>: Enable/disable auto-show of the correct answer after each question.\n"
+        "!togglefastest <quiz_name> <on/off>: Enable/disable auto-show of the fastest correct answer after each question.\n"
+        "!togglecorrect <quiz_name> <on/off>: (Old toggle) Enable/disable correct feedback messages.\n"
+        "!togglewrong <quiz_name> <on/off>: (Old toggle) Enable/disable incorrect feedback messages.\n"
+        "!setleaderboard <quiz_name> <count> <mention (true/false)>: Set leaderboard settings.\n"
+        "!setcountdown <quiz_name> <timestamp/milestones/live> [seconds ...]: Set how the countdown is shown. 'timestamp' posts the deadline once, 'milestones' also edits at the given seconds left, 'live' edits every second.\n"
+        "!setscoring <quiz_name> <rank_decay/time_decay/streak/penalty>: Set how answers are scored. rank_decay: the fastest correct answer gets the most points. time_decay: points drop with answer time. streak: bonus for consecutive correct answers. penalty: wrong answers lose points.\n"
+        "!setexport <quiz_name> <xlsx/csv>: Set the format of the results file.\n"
+        "!setpause <quiz_name> <seconds>: Set the pause between questions (0-60, 0 posts the next question right after the answer).\n"
+        "!setclose <quiz_name> <timer/adaptive> [quiet_seconds]: Set when questions close. 'timer' waits for the time limit. 'adaptive' closes early once everyone who answered an earlier question (for the first question, everyone who played the quiz's last run) has answered, or when no new answer has come in for quiet_seconds (default 5, 0 turns this off). The time limit still applies.\n"
+        "!stopquiz <quiz_name>: Stop the quiz running in this channel.\n"
+        "!startquiz <quiz_name> [shuffle/default] [seed]: Start the quiz in this channel. Giving the seed shown by !quizsessions repeats the same option order. The same quiz can run in several channels at once. If 'default' is used, the preset shuffle mode is applied. Only a thank you message is sent when the quiz finishes.\n"
+        "!sendresults <quiz_name>: Send the quiz's results file (Excel or CSV) to Discord.\n"
+        "!showanswer <quiz_name>: Show the correct answer and all options for the last question.\n"
+        "!fastest <quiz_name>: Show the fastest correct answer details for the last question.\n"
+        "!showquiz <quiz_name> [page]: List the questions and correct answers of the quiz, a page at a time.\n"
+        "!leaderboard <quiz_name>: Show the leaderboard (top entries) for the quiz.\n"
+        "!ranking <quiz/server/season> [name]: Show a leaderboard summed over every completed run: 'quiz <quiz_name>' for one quiz, 'server' for all quizzes of this server, 'season [season_name]' for the current or a past season. Also shows your own rank.\n"
+        "!setseason [season_name]: Show the current season, or start a new one. Without a named season, seasons are calendar months (e.g. 2026-10).\n"
+        "!liveboard <quiz_name>: Show the current standings while the quiz is running.\n"
+        "!myrank <quiz_name>: Show your rank in the running quiz or its last completed run.\n"
+        "!answerstats <quiz_name> [question_number]: Show answer statistics over every run of the quiz: the hardest questions, or one question's accuracy, answer time percentiles and how often each option was picked. Questions are numbered as they were when the quiz ran.\n"
+        "!quizsettings [page]: List the settings for all quizzes of this server. Long lists have ◀/▶ buttons to change pages.\n"
+        "!quizsessions: Show the quiz sessions running in this server.\n"
+        "!quizstats: Show the bot's health: running sessions, gateway latency, event loop lag, and how long answers, scoring, exports, messages and commands take.\n"
+        "!sendqueue: Show each channel's outgoing message queue: queued messages, sent, merged and how long messages waited.\n"
+        "!quizidlist <quiz_name>: List participant IDs (every 150 IDs on a new line) in a TXT file.\n"
+        "!quizhelp - Show this help menu.\n"
+        "!ping - Test command, replies with 'Pong!'."
+    )
+    # The outbox splits it into messages at line breaks.
+    await reply(ctx, help_text)
+
+# !ping - Test command.
+@command(name="ping")
+async def ping(ctx):
+    await reply(ctx, "Pong!")
+
+# --- SLASH COMMANDS ---
+# Every command is also a slash command with the same parameters, built from the prefix command: the
+# description is taken from its "# !name - Description." comment, and the slash version runs the same
+# callback with a stand-in ctx for the interaction, so replies still go to the channel through the
+# outbox. Quiz names and question numbers autocomplete from the guild catalog's indexes (search.py).
+QUIZ_PARAMETERS = ("quiz_name",)
+NEW_QUIZ_COMMANDS = ("createquiz",)  # their quiz_name is a new name, so it is not completed
+QUESTION_PARAMETERS = ("question_index", "question_number")
+ATTACHMENT_COMMANDS = ("importq",)  # read ctx.message.attachments; their slash version has a file option
+CHOICE_LIMIT = 100  # Discord's limit for choice names and string values
+
+def command_description(cmd):
+    comment = " ".join(line.lstrip("# ").strip() for line in (inspect.getcomments(cmd.callback) or "").splitlines())
+    _, _, description = comment.partition(" - ")
+    return clip(description or cmd.name, CHOICE_LIMIT)
+
+def question_label(number, question):
+    return clip(f"{number}. {question.question}", CHOICE_LIMIT)
+
+async def autocomplete_quiz(interaction, current):
+    if not may_use_commands(interaction.guild, interaction.user):
+        return []
+    started = time.perf_counter()
+    names = catalogs.get(interaction.guild_id or 0).names.search(current)
+    metrics.observe("quizbot_autocomplete_seconds", time.perf_counter() - started, (("option", "quiz"),))
+    return [app_commands.Choice(name=name, value=name) for name in names if len(name) <= CHOICE_LIMIT]
+
+async def autocomplete_question(interaction, current):
+    if not may_use_commands(interaction.guild, interaction.user):
+        return []
+    started = time.perf_counter()
+    catalog = catalogs.get(interaction.guild_id or 0)
+    quiz_name = getattr(interaction.namespace, "quiz_name", None)
+    labels = catalog.question_index(quiz_name, question_label).search(current) if quiz_name in catalog.quizzes else []
+    metrics.observe("quizbot_autocomplete_seconds", time.perf_counter() - started, (("option", "question"),))
+    return [app_commands.Choice(name=label, value=int(label.partition(".")[0])) for label in labels]
+
+def slash_command(cmd):
+    parameters = list(inspect.signature(cmd.callback).parameters.values())[1:]
+    options = []
+    for parameter in parameters:
+        if parameter.kind is parameter.VAR_POSITIONAL:
+            # Slash commands have no variadic options, so these values are given space-separated.
+            options.append(parameter.replace(kind=parameter.KEYWORD_ONLY, annotation=str, default=""))
+        else:
+            options.append(parameter.replace(kind=parameter.KEYWORD_ONLY))
+    if cmd.name in ATTACHMENT_COMMANDS:
+        options.append(inspect.Parameter("attachment", inspect.Parameter.KEYWORD_ONLY, annotation=discord.Attachment, default=None))
+
+    async def run(interaction, **values):
+        if not may_use_commands(interaction.guild, interaction.user):
+            await interaction.response.send_message("You are not allowed to use this command.", ephemeral=True)
+            return
+        args = []
+        kwargs = {}
+        for parameter in parameters:
+            value = values.get(parameter.name, parameter.default)
+            if parameter.kind is parameter.VAR_POSITIONAL:
+                try:
+                    args.extend(parameter.annotation(part) for part in value.split())
+                except ValueError:
+                    await interaction.response.send_message(f"**{parameter.name}** must be a list of numbers.", ephemeral=True)
+                    return
+            elif parameter.kind is parameter.KEYWORD_ONLY:
+                kwargs[parameter.name] = value
+            else:
+                args.append(value)
+        # Commands can take longer than the 3 seconds Discord waits for a response; their replies
+        # go to the channel, so the deferred response is removed afterwards.
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        attachment = values.get("attachment")
+        message = SimpleNamespace(attachments=[attachment] if attachment is not None else [])
+        ctx = SimpleNamespace(guild=interaction.guild, channel=interaction.channel, author=interaction.user, message=message)
+        labels = (("command", cmd.name),)
+        started = time.perf_counter()
+        try:
+            await cmd.callback(ctx, *args, **kwargs)
+        except Exception:
+            metrics.inc("quizbot_command_errors_total", labels)
+            raise
+        finally:
+            metrics.observe("quizbot_command_seconds", time.perf_counter() - started, labels)
+            try:
+                await interaction.delete_original_response()
+            except discord.HTTPException:
+                pass
+
+    run.__signature__ = inspect.Signature([inspect.Parameter("interaction", inspect.Parameter.POSITIONAL_OR_KEYWORD)] + options)
+    slash = app_commands.Command(name=cmd.name, description=command_description(cmd), callback=run)
+    for parameter in parameters:
+        if parameter.name in QUIZ_PARAMETERS and cmd.name not in NEW_QUIZ_COMMANDS:
+            slash.autocomplete(parameter.name)(autocomplete_quiz)
+        elif parameter.name in QUESTION_PARAMETERS:
+            slash.autocomplete(parameter.name)(autocomplete_question)
+    return slash
+
+def describe_metrics():
+    metrics.describe("quizbot_answer_ack_seconds", "histogram", "Time from receiving an answer click to acknowledging it.")
+    metrics.describe("quizbot_scoring_seconds", "histogram", "Time to score one closed question.")
+    metrics.describe("quizbot_export_seconds", "histogram", "Time to build a results file.")
+    metrics.describe("quizbot_send_seconds", "histogram", "Time from queueing a message to Discord accepting it, rate-limit waits included.")
+    metrics.describe("quizbot_edit_seconds", "histogram", "Time to edit a question message.")
+    metrics.describe("quizbot_edits_skipped_total", "counter", "Countdown edits skipped to stay within the channel's edit budget.")
+    metrics.describe("quizbot_command_seconds", "histogram", "Command run time.")
+    metrics.describe("quizbot_command_errors_total", "counter", "Commands that raised an error.")
+    metrics.describe("quizbot_event_loop_lag_seconds", "histogram", "How late the event loop ran a timer.")
+    metrics.describe("quizbot_sessions_resumed_total", "counter", "Quiz runs continued from a checkpoint after a restart.")
+    metrics.describe("quizbot_autocomplete_seconds", "histogram", "Time to find the choices for one autocomplete request.")
+    metrics.gauge("quizbot_active_sessions", "Running quiz sessions.", lambda: len(sessions))
+    metrics.gauge("quizbot_gateway_latency_seconds", "Discord gateway heartbeat latency.", lambda: bot.latency)
+    metrics.gauge("quizbot_queued_messages", "Messages waiting in the outbox.", lambda: sum(len(queue) for queue in outbox.queues.values()))
+    metrics.gauge("quizbot_loaded_guilds", "Guild catalogs held in memory.", lambda: len(catalogs))
+
+# Builds the bot and the state its commands share. One bot per process: shut the previous one down
+# with shutdown() before building another.
+def create_bot(bot_config):
+    global config, bot, store, catalogs, sessions, member_cache, outbox, metrics, checkpoints_resumed
+    if store is not None:
+        raise RuntimeError("a bot is already set up in this process; call shutdown() first")
+    config = bot_config
+    checkpoints_resumed = False
+    # Intents configuration: For message content and member info.
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+    if config.shard_count:
+        bot = commands.AutoShardedBot(command_prefix=config.command_prefix, intents=intents, shard_count=config.shard_count, shard_ids=config.shard_ids)
+    else:
+        bot = commands.Bot(command_prefix=config.command_prefix, intents=intents)
+    bot.add_check(globally_restrict)
+    bot.event(on_command_error)
+    bot.event(on_ready)
+    bot.before_invoke(before_command)
+    bot.after_invoke(after_command)
+    bot.setup_hook = setup_hook
+    bot.add_dynamic_items(QuizAnswerButton, PageButton)
+    for cmd in COMMANDS:
+        bot.add_command(cmd)
+        bot.tree.add_command(slash_command(cmd))
+    store = QuizStore(config.db_path)
+    sessions = SessionManager()
+    catalogs = Catalog(store, config.cache_rows, pinned=lambda guild_id: bool(sessions.for_guild(guild_id)))
+    live_questions.clear()
+    member_cache = MemberCache()
+    pager.cache.clear()
+    metrics = Metrics()
+    outbox = Outbox(observe=lambda seconds: metrics.observe("quizbot_send_seconds", seconds))
+    describe_metrics()
+    return bot
+
+# Stops the export workers and commits pending writes. Call it after the bot has stopped.
+def shutdown():
+    global store
+    shutdown_pool()
+    if store is not None:
+        store.close()
+        store = None
@@ -0,0 +1,101 @@
+import asyncio
+import traceback
+
+# One shared hashed timer wheel drives every quiz session's countdowns. A single task advances
+# the wheel every RESOLUTION seconds and runs the callbacks that are due; sessions schedule plain
+# callbacks on it instead of each keeping a sleeping coroutine per timer.
+
+RESOLUTION = 0.1
+WHEEL_SIZE = 512
+
+class TimerHandle:
+    __slots__ = ("callback", "rounds", "cancelled")
+
+    def __init__(self, callback, rounds):
+        self.callback = callback
+        self.rounds = rounds
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class TimerWheel:
+    def __init__(self, resolution=RESOLUTION, size=WHEEL_SIZE):
+        self.resolution = resolution
+        self.slots = [[] for _ in range(size)]
+        self.tick = 0        # next tick to process
+        self.origin = None   # loop time of tick 0
+        self.pending = 0
+        self.task = None
+
+    def __len__(self):
+        return self.pending
+
+    def current_tick(self):
+        return int((asyncio.get_running_loop().time() - self.origin) / self.resolution)
+
+    # Runs callback() after roughly delay seconds (rounded up to the wheel resolution).
+    def schedule(self, delay, callback):
+        if self.task is None or self.task.done():
+            self.origin = asyncio.get_running_loop().time()
+            self.tick = 0
+            self.task = asyncio.create_task(self.run())
+        ticks = max(1, -(-delay // self.resolution))
+        target = max(self.current_tick(), self.tick) + int(ticks)
+        rounds, slot = divmod(target, len(self.slots))
+        handle = TimerHandle(callback, rounds)
+        self.slots[slot].append(handle)
+        self.pending += 1
+        return handle
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while self.pending:
+            await asyncio.sleep(max(0, self.origin + (self.tick + 1) * self.resolution - loop.time()))
+            now = self.current_tick()
+            while self.tick <= now:
+                self.fire(self.tick)
+                self.tick += 1
+
+    def fire(self, tick):
+        rounds, slot = divmod(tick, len(self.slots))
+        due, waiting = [], []
+        for handle in self.slots[slot]:
+            if handle.cancelled or handle.rounds <= rounds:
+                due.append(handle)
+            else:
+                waiting.append(handle)
+        self.slots[slot] = waiting
+        self.pending -= len(due)
+        for handle in due:
+            if handle.cancelled:
+                continue
+            try:
+                handle.callback()
+            except Exception:
+                traceback.print_exc()
+
+# Registry of running sessions keyed by (guild_id, channel_id, quiz_name).
+class SessionManager:
+    def __init__(self, wheel=None):
+        self.wheel = wheel or TimerWheel()
+        self.sessions = {}
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def add(self, session):
+        self.sessions[session.key] = session
+
+    def remove(self, session):
+        if self.sessions.get(session.key) is session:
+            del self.sessions[session.key]
+
+    def get(self, guild_id, channel_id, quiz_name):
+        return self.sessions.get((guild_id, channel_id, quiz_name))
+
+    def for_guild(self, guild_id):
+        return [session for key, session in self.sessions.items() if key[0] == guild_id]
+
+    def is_running(self, guild_id, quiz_name):
+        return any(key[0] == guild_id and key[2] == quiz_name for key in self.sessions)
@@ -0,0 +1,74 @@
+from array import array
+from itertools import compress
+
+# Scoring strategies. Each one scores a whole question in one pass over column arrays
+# (user ids, correctness, answer times, all ordered by answer time) and returns
+# { user_id: points } for the users whose score changes.
+
+BASE_SCORE = 10000
+RANK_STEP = 1             # rank_decay: points lost per place behind the fastest correct answer
+STREAK_BONUS = 500        # streak: extra points per consecutive correct answer after the first
+STREAK_BONUS_CAP = 5      # streak: maximum number of bonus steps
+WRONG_PENALTY = 2500      # penalty: points taken for a wrong answer
+
+STRATEGIES = {}
+
+def strategy(name):
+    def register(func):
+        STRATEGIES[name] = func
+        return func
+    return register
+
+# Column view of one question's responses, ordered by answer time.
+class QuestionResults:
+    __slots__ = ("user_ids", "correct", "answer_times")
+
+    # ordered_responses: [(user_id, {"correct": bool, "answer_time": float, ...}), ...] in answer-time order
+    def __init__(self, ordered_responses):
+        self.user_ids = [uid for uid, _ in ordered_responses]
+        self.correct = array("b", [data["correct"] for _, data in ordered_responses])
+        self.answer_times = array("d", [data["answer_time"] for _, data in ordered_responses])
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def correct_user_ids(self):
+        return compress(self.user_ids, self.correct)
+
+    def wrong_user_ids(self):
+        return compress(self.user_ids, (not ok for ok in self.correct))
+
+@strategy("rank_decay")
+def rank_decay(results, duration, state):
+    return {uid: max(BASE_SCORE - rank * RANK_STEP, 0) for rank, uid in enumerate(results.correct_user_ids())}
+
+# Full points for an instant answer, half points for one given right at the deadline.
+@strategy("time_decay")
+def time_decay(results, duration, state):
+    duration = max(duration, 1)
+    times = compress(results.answer_times, results.correct)
+    return {uid: round(BASE_SCORE * (1 - min(t / duration, 1) / 2)) for uid, t in zip(results.correct_user_ids(), times)}
+
+# rank_decay plus a bonus for consecutive correct answers; a wrong or missing answer resets the streak.
+@strategy("streak")
+def streak(results, duration, state):
+    awards = rank_decay(results, duration, state)
+    previous = state.get("streaks", {})
+    streaks = {uid: previous.get(uid, 0) + 1 for uid in awards}
+    state["streaks"] = streaks
+    return {uid: points + STREAK_BONUS * min(streaks[uid] - 1, STREAK_BONUS_CAP) for uid, points in awards.items()}
+
+# rank_decay for correct answers, minus WRONG_PENALTY for wrong ones.
+@strategy("penalty")
+def penalty(results, duration, state):
+    awards = dict.fromkeys(results.wrong_user_ids(), -WRONG_PENALTY)
+    awards.update(rank_decay(results, duration, state))
+    return awards
+
+# state is a dict owned by the quiz run, for strategies that remember earlier questions.
+def score_question(name, results, duration, state):
+    return STRATEGIES.get(name, rank_decay)(results, duration, state)
+
+# Builds the columns and scores them in one call, so both steps can run in a worker thread.
+def score_responses(name, ordered_responses, duration, state):
+    return score_question(name, QuestionResults(ordered_responses), duration, state)
@@ -0,0 +1,70 @@
+from bisect import bisect_left, insort
+
+# Name lookup for autocomplete. Names are kept in a sorted list of lowercased keys for prefix
+# matches (a bisect, then a walk over just the matches) and in a trigram index for substring
+# matches: a query of three or more characters only checks the names that contain all of its
+# trigrams. Adding or removing a name updates both, so the index never has to be rebuilt.
+
+GRAM = 3
+MAX_CHOICES = 25  # Discord shows at most 25 autocomplete choices
+
+def grams(key):
+    return {key[i:i + GRAM] for i in range(len(key) - GRAM + 1)}
+
+class NameIndex:
+    def __init__(self, names=()):
+        self.keys = []     # sorted [(lowercased name, name), ...]
+        self.grams = {}    # trigram -> set of names
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, name):
+        entry = (name.lower(), name)
+        i = bisect_left(self.keys, entry)
+        return i < len(self.keys) and self.keys[i] == entry
+
+    def add(self, name):
+        if name in self:
+            return
+        key = name.lower()
+        insort(self.keys, (key, name))
+        for gram in grams(key):
+            self.grams.setdefault(gram, set()).add(name)
+
+    def remove(self, name):
+        if name not in self:
+            return
+        key = name.lower()
+        del self.keys[bisect_left(self.keys, (key, name))]
+        for gram in grams(key):
+            names = self.grams[gram]
+            names.discard(name)
+            if not names:
+                del self.grams[gram]
+
+    # Up to limit names containing text (case-insensitive): names starting with it first, then the
+    # others, each in alphabetical order. An empty text lists the first names.
+    def search(self, text, limit=MAX_CHOICES):
+        text = text.lower()
+        found = []
+        i = bisect_left(self.keys, (text,))
+        while i < len(self.keys) and len(found) < limit and self.keys[i][0].startswith(text):
+            found.append(self.keys[i][1])
+            i += 1
+        if len(found) >= limit or not text:
+            return found
+        if len(text) >= GRAM:
+            candidates = sorted((self.grams.get(gram, ()) for gram in grams(text)), key=len)
+            names = set(candidates[0]).intersection(*candidates[1:])
+            others = sorted((name.lower(), name) for name in names)
+        else:
+            others = self.keys
+        for key, name in others:
+            if text in key and not key.startswith(text):
+                found.append(name)
+                if len(found) >= limit:
+                    break
+        return found
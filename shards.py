@@ -0,0 +1,97 @@
+import asyncio
+import multiprocessing
+import time
+
+import discord
+
+# Multi-process deployment. The bot's shards are split across worker processes, each running its own
+# AutoShardedBot on its own core. Discord sends all of a guild's events (commands, button clicks) to
+# the shard (guild_id >> 22) % shard_count, so a guild is only ever served by one worker: its live
+# sessions, timers and cached catalog stay in that worker, and no two workers write the same guild.
+# Quizzes, settings and results are in the shared SQLite database, which every worker opens.
+
+RESTART_DELAY = 5       # seconds before a crashed worker is started again
+MAX_RESTART_DELAY = 300
+SHUTDOWN_TIMEOUT = 30   # seconds a worker gets to stop on its own
+
+# The shard that receives a guild's events. Direct messages go to shard 0.
+def shard_for(guild_id, shard_count):
+    return (guild_id >> 22) % shard_count if guild_id else 0
+
+# Shard ids per worker: worker i runs shards i, i + workers, i + 2 * workers, ...
+def shard_plan(shard_count, workers):
+    workers = max(min(workers, shard_count), 1)
+    return [list(range(worker, shard_count, workers)) for worker in range(workers)]
+
+# Discord's recommended shard count for the bot.
+async def recommended_shards(token):
+    client = discord.Client(intents=discord.Intents.none())
+    try:
+        await client.login(token)
+        shards, _, _ = await client.http.get_bot_gateway()
+        return shards
+    finally:
+        await client.close()
+
+def run_worker(config):
+    # Imported here so the launcher itself never sets up a bot.
+    from quizbot import create_bot, shutdown
+    create_bot(config).run(config.token)
+    shutdown()
+
+# Runs the bot in config.workers processes with config.shard_count shards (Discord's recommendation if
+# None, and at least one per worker). Crashed workers are restarted, waiting longer after each quick
+# crash. Blocks until interrupted.
+def run_sharded(config):
+    from quizbot import Config
+    from storage import QuizStore
+    # Migrate the shared database once, before any worker opens it.
+    QuizStore(config.db_path).close()
+    shard_count = config.shard_count or max(asyncio.run(recommended_shards(config.token)), config.workers)
+    plan = shard_plan(shard_count, config.workers)
+    configs = []
+    for worker, shard_ids in enumerate(plan):
+        worker_config = Config(**vars(config))
+        worker_config.shard_count = shard_count
+        worker_config.shard_ids = shard_ids
+        if config.metrics_port:
+            worker_config.metrics_port = config.metrics_port + worker
+        # Slash commands are global, so one worker registers them.
+        worker_config.sync_commands = config.sync_commands and worker == 0
+        configs.append(worker_config)
+    print(f"Running {shard_count} shards in {len(configs)} workers: {plan}")
+    context = multiprocessing.get_context("spawn")
+    processes = [None] * len(configs)
+    started = [0.0] * len(configs)
+    restart_at = [0.0] * len(configs)
+    delays = [RESTART_DELAY] * len(configs)
+    try:
+        while True:
+            now = time.monotonic()
+            for worker, worker_config in enumerate(configs):
+                process = processes[worker]
+                if process is not None and process.is_alive():
+                    continue
+                if process is not None:
+                    # A worker that ran for a while starts over with the shortest delay.
+                    if now - started[worker] > MAX_RESTART_DELAY:
+                        delays[worker] = RESTART_DELAY
+                    print(f"Worker {worker} (shards {worker_config.shard_ids}) exited with code {process.exitcode}; restarting in {delays[worker]}s")
+                    restart_at[worker] = now + delays[worker]
+                    delays[worker] = min(delays[worker] * 2, MAX_RESTART_DELAY)
+                    processes[worker] = None
+                elif now >= restart_at[worker]:
+                    processes[worker] = context.Process(target=run_worker, args=(worker_config,), name=f"quizbot-worker-{worker}")
+                    processes[worker].start()
+                    started[worker] = now
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Workers get Ctrl+C too and shut down on their own (committing pending writes); stragglers are stopped.
+        for process in processes:
+            if process is not None:
+                process.join(SHUTDOWN_TIMEOUT)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
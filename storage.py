@@ -0,0 +1,498 @@
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+from collections.abc import MutableMapping
+
+from analytics import AnswerColumns
+from questions import QuestionBank, make_question
+
+# SQLite persistence for quizzes, settings, results and answers.
+# Reads run on the calling thread through their own connection; writes are queued and applied by
+# a single writer thread, which groups everything queued within FLUSH_INTERVAL into one transaction.
+
+FLUSH_INTERVAL = 0.5
+MAX_JOBS_PER_TRANSACTION = 5000
+MAX_SEGMENTS = 16  # a quiz's answer segments are merged into one beyond this many
+
+# Every table is partitioned by guild_id (0 for quizzes made in DMs), so each guild has its own
+# quiz namespace. Bumped with SCHEMA_VERSION whenever the tables change; see migrate().
+SCHEMA_VERSION = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quizzes (
+    guild_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    settings TEXT NOT NULL,
+    PRIMARY KEY (guild_id, name)
+);
+CREATE TABLE IF NOT EXISTS questions (
+    guild_id INTEGER NOT NULL,
+    quiz TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    options TEXT NOT NULL,
+    correct_answer_index INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, quiz, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS leaderboards (
+    guild_id INTEGER NOT NULL,
+    quiz TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, quiz, user_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS participants (
+    guild_id INTEGER NOT NULL,
+    quiz TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, quiz, user_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS last_questions (
+    guild_id INTEGER NOT NULL,
+    quiz TEXT NOT NULL,
+    info TEXT NOT NULL,
+    PRIMARY KEY (guild_id, quiz)
+);
+CREATE TABLE IF NOT EXISTS answers (
+    guild_id INTEGER NOT NULL,
+    quiz TEXT NOT NULL,
+    session TEXT NOT NULL,
+    question INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    answer_index INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    answer_time REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS exports (
+    guild_id INTEGER NOT NULL,
+    quiz TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (guild_id, quiz)
+);
+CREATE TABLE IF NOT EXISTS answer_segments (
+    guild_id INTEGER NOT NULL,
+    quiz TEXT NOT NULL,
+    segment INTEGER NOT NULL,
+    sessions TEXT NOT NULL,
+    question BLOB NOT NULL,
+    answer_index BLOB NOT NULL,
+    correct BLOB NOT NULL,
+    answer_time BLOB NOT NULL,
+    PRIMARY KEY (guild_id, quiz, segment)
+);
+CREATE TABLE IF NOT EXISTS aggregate_scores (
+    guild_id INTEGER NOT NULL,
+    board TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, board, user_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS seasons (
+    guild_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS session_checkpoints (
+    guild_id INTEGER NOT NULL,
+    session TEXT NOT NULL,
+    channel_id INTEGER NOT NULL,
+    quiz TEXT NOT NULL,
+    questions TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (guild_id, session)
+);
+CREATE TABLE IF NOT EXISTS session_scores (
+    guild_id INTEGER NOT NULL,
+    session TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, session, user_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS answers_by_question ON answers (guild_id, quiz, session, question);
+"""
+
+TABLES = ("quizzes", "questions", "leaderboards", "participants", "last_questions", "answers", "exports")
+QUIZ_TABLES = TABLES[1:] + ("answer_segments", "session_checkpoints")  # tables keyed by quiz
+
+# Several bot processes may share the database (shards.py), so writers wait for each other's locks.
+BUSY_TIMEOUT = 30
+
+def connect(path, isolation_level=""):
+    conn = sqlite3.connect(path, isolation_level=isolation_level, timeout=BUSY_TIMEOUT)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+# executescript() would commit the migration's transaction, so statements are run one by one.
+def create_tables(conn):
+    for statement in SCHEMA.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+
+# Brings a database up to SCHEMA_VERSION. Version 1 tables had no guild_id column; their rows are
+# moved to legacy_guild_id (QUIZBOT_LEGACY_GUILD, default 0). Version 3 added answer_segments, version 4
+# aggregate_scores and seasons, version 5 session_checkpoints and session_scores. The version is checked again under the write lock, so processes
+# opening the database at the same time migrate it once.
+def migrate(conn, legacy_guild_id=None):
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(quizzes)")]
+        if columns and "guild_id" not in columns:
+            if legacy_guild_id is None:
+                legacy_guild_id = int(os.getenv("QUIZBOT_LEGACY_GUILD", "0"))
+            conn.execute("DROP INDEX IF EXISTS answers_by_question")
+            for table in TABLES:
+                conn.execute(f"ALTER TABLE {table} RENAME TO {table}_v1")
+            create_tables(conn)
+            for table in TABLES:
+                # quizzes are listed in rowid order, so keep it.
+                order = " ORDER BY rowid" if table == "quizzes" else ""
+                conn.execute(f"INSERT INTO {table} SELECT ?, * FROM {table}_v1{order}", (legacy_guild_id,))
+                conn.execute(f"DROP TABLE {table}_v1")
+        else:
+            create_tables(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+ANSWER_LOG_QUERY = "SELECT rowid, session, question, answer_index, correct, answer_time FROM answers WHERE guild_id = ? AND quiz = ?"
+# Answers of runs with a checkpoint are still needed to resume them, so they stay in the log.
+FINISHED_RUNS = " AND session NOT IN (SELECT session FROM session_checkpoints WHERE guild_id = ?)"
+
+# Moves a quiz's logged answers of finished runs into a new columnar segment. Segments are numbered in order.
+def compact_answers(conn, guild_id, quiz_name):
+    count, last_segment = conn.execute("SELECT COUNT(*), COALESCE(MAX(segment), 0) FROM answer_segments WHERE guild_id = ? AND quiz = ?", (guild_id, quiz_name)).fetchone()
+    rows = conn.execute(ANSWER_LOG_QUERY + FINISHED_RUNS + " ORDER BY rowid", (guild_id, quiz_name, guild_id)).fetchall()
+    if rows:
+        columns = AnswerColumns.from_rows([row[1:] for row in rows])
+        last_segment += 1
+        count += 1
+        conn.execute("INSERT INTO answer_segments VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (guild_id, quiz_name, last_segment) + columns.encode())
+        conn.execute("DELETE FROM answers WHERE guild_id = ? AND quiz = ? AND rowid <= ?" + FINISHED_RUNS, (guild_id, quiz_name, rows[-1][0], guild_id))
+    if count > MAX_SEGMENTS:
+        columns = load_segments(conn, guild_id, quiz_name)
+        conn.execute("DELETE FROM answer_segments WHERE guild_id = ? AND quiz = ?", (guild_id, quiz_name))
+        conn.execute("INSERT INTO answer_segments VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (guild_id, quiz_name, last_segment) + columns.encode())
+
+def load_segments(conn, guild_id, quiz_name):
+    columns = AnswerColumns()
+    for row in conn.execute("SELECT sessions, question, answer_index, correct, answer_time FROM answer_segments WHERE guild_id = ? AND quiz = ? ORDER BY segment", (guild_id, quiz_name)):
+        columns.extend(AnswerColumns.decode(*row))
+    return columns
+
+class QuizStore:
+    def __init__(self, path):
+        self.path = path
+        self.conn = connect(path)
+        migrate(self.conn)
+        self.jobs = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, name="quizstore-writer", daemon=True)
+        self.writer.start()
+
+    # --- Writer thread ---
+    # Each job runs inside its own savepoint, so a failing job is rolled back on its own and the rest
+    # of the batch still commits. Errors are printed and never stop the thread.
+    def write_loop(self):
+        conn = connect(self.path, isolation_level=None)
+        running = True
+        while running:
+            batch = [self.jobs.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            try:
+                while len(batch) < MAX_JOBS_PER_TRANSACTION and batch[-1] is not None:
+                    batch.append(self.jobs.get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                pass
+            callbacks = []
+            try:
+                conn.execute("BEGIN")
+                for job in batch:
+                    if job is None:
+                        running = False
+                    elif isinstance(job, tuple):
+                        callbacks.append(job[1])
+                    else:
+                        self.run_job(conn, job)
+                conn.execute("COMMIT")
+            except Exception:
+                traceback.print_exc()
+                if conn.in_transaction:
+                    try:
+                        conn.execute("ROLLBACK")
+                    except Exception:
+                        traceback.print_exc()
+            for callback in callbacks:
+                callback()
+        conn.close()
+
+    def run_job(self, conn, job):
+        conn.execute("SAVEPOINT job")
+        try:
+            job(conn)
+        except Exception:
+            traceback.print_exc()
+            conn.execute("ROLLBACK TO job")
+        conn.execute("RELEASE job")
+
+    def submit(self, job):
+        self.jobs.put(job)
+
+    def execute(self, sql, params=()):
+        self.submit(lambda conn: conn.execute(sql, params))
+
+    def executemany(self, sql, rows):
+        self.submit(lambda conn: conn.executemany(sql, rows))
+
+    # Resolves once every write queued before the call is committed.
+    async def flush(self):
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        self.submit(("flush", lambda: loop.call_soon_threadsafe(done.set_result, None)))
+        await done
+
+    # Commits pending writes and stops the writer. Blocks; call it after the event loop has stopped.
+    def close(self):
+        self.submit(None)
+        self.writer.join()
+        self.conn.close()
+
+    # --- Per-guild indexes (loaded when a guild is first used) ---
+    def load_settings(self, guild_id):
+        return {name: json.loads(settings) for name, settings in self.conn.execute("SELECT name, settings FROM quizzes WHERE guild_id = ? ORDER BY rowid", (guild_id,))}
+
+    def load_question_counts(self, guild_id):
+        return dict(self.conn.execute("SELECT quiz, COUNT(*) FROM questions WHERE guild_id = ? GROUP BY quiz", (guild_id,)))
+
+    def load_leaderboard_names(self, guild_id):
+        return {row[0] for row in self.conn.execute("SELECT DISTINCT quiz FROM leaderboards WHERE guild_id = ?", (guild_id,))}
+
+    def load_participant_names(self, guild_id):
+        return {row[0] for row in self.conn.execute("SELECT DISTINCT quiz FROM participants WHERE guild_id = ?", (guild_id,))}
+
+    def load_export_names(self, guild_id):
+        return {row[0] for row in self.conn.execute("SELECT quiz FROM exports WHERE guild_id = ?", (guild_id,))}
+
+    def load_last_question_names(self, guild_id):
+        return {row[0] for row in self.conn.execute("SELECT quiz FROM last_questions WHERE guild_id = ?", (guild_id,))}
+
+    def load_aggregate_names(self, guild_id):
+        return {row[0] for row in self.conn.execute("SELECT DISTINCT board FROM aggregate_scores WHERE guild_id = ?", (guild_id,))}
+
+    def load_season(self, guild_id):
+        row = self.conn.execute("SELECT name FROM seasons WHERE guild_id = ?", (guild_id,)).fetchone()
+        return row[0] if row else None
+
+    # --- Quizzes and settings ---
+    def save_settings(self, guild_id, quiz_name, settings):
+        self.execute(
+            "INSERT INTO quizzes (guild_id, name, settings) VALUES (?, ?, ?) ON CONFLICT(guild_id, name) DO UPDATE SET settings = excluded.settings",
+            (guild_id, quiz_name, json.dumps(settings))
+        )
+
+    def delete_quiz(self, guild_id, quiz_name):
+        def job(conn):
+            conn.execute("DELETE FROM session_scores WHERE guild_id = ? AND session IN (SELECT session FROM session_checkpoints WHERE guild_id = ? AND quiz = ?)", (guild_id, guild_id, quiz_name))
+            for table in QUIZ_TABLES:
+                conn.execute(f"DELETE FROM {table} WHERE guild_id = ? AND quiz = ?", (guild_id, quiz_name))
+            conn.execute("DELETE FROM quizzes WHERE guild_id = ? AND name = ?", (guild_id, quiz_name))
+        self.submit(job)
+
+    # --- Questions ---
+    def load_questions(self, guild_id, quiz_name):
+        rows = self.conn.execute(
+            "SELECT question, options, correct_answer_index, duration FROM questions WHERE guild_id = ? AND quiz = ? ORDER BY position",
+            (guild_id, quiz_name)
+        )
+        return QuestionBank(make_question(question, json.loads(options), correct, duration) for question, options, correct, duration in rows)
+
+    def question_rows(self, guild_id, quiz_name, questions, start):
+        return [
+            (guild_id, quiz_name, pos, q.question, json.dumps(q.options), q.correct_answer_index, q.duration)
+            for pos, q in enumerate(questions, start=start)
+        ]
+
+    # Writes questions at positions start, start+1, ... replacing whatever was there.
+    def save_questions(self, guild_id, quiz_name, questions, start=0):
+        self.executemany("INSERT OR REPLACE INTO questions VALUES (?, ?, ?, ?, ?, ?, ?)", self.question_rows(guild_id, quiz_name, questions, start))
+
+    def replace_questions(self, guild_id, quiz_name, questions):
+        rows = self.question_rows(guild_id, quiz_name, questions, 0)
+        def job(conn):
+            conn.execute("DELETE FROM questions WHERE guild_id = ? AND quiz = ?", (guild_id, quiz_name))
+            conn.executemany("INSERT INTO questions VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self.submit(job)
+
+    # --- Results ---
+    def load_leaderboard(self, guild_id, quiz_name):
+        return dict(self.conn.execute("SELECT user_id, score FROM leaderboards WHERE guild_id = ? AND quiz = ?", (guild_id, quiz_name)))
+
+    def save_leaderboard(self, guild_id, quiz_name, scores):
+        rows = [(guild_id, quiz_name, user_id, score) for user_id, score in scores.items()]
+        def job(conn):
+            conn.execute("DELETE FROM leaderboards WHERE guild_id = ? AND quiz = ?", (guild_id, quiz_name))
+            conn.executemany("INSERT INTO leaderboards VALUES (?, ?, ?, ?)", rows)
+        self.submit(job)
+
+    def load_participants(self, guild_id, quiz_name):
+        return {row[0] for row in self.conn.execute("SELECT user_id FROM participants WHERE guild_id = ? AND quiz = ?", (guild_id, quiz_name))}
+
+    def save_participants(self, guild_id, quiz_name, user_ids):
+        rows = [(guild_id, quiz_name, user_id) for user_id in user_ids]
+        def job(conn):
+            conn.execute("DELETE FROM participants WHERE guild_id = ? AND quiz = ?", (guild_id, quiz_name))
+            conn.executemany("INSERT INTO participants VALUES (?, ?, ?)", rows)
+        self.submit(job)
+
+    def load_last_question(self, guild_id, quiz_name):
+        row = self.conn.execute("SELECT info FROM last_questions WHERE guild_id = ? AND quiz = ?", (guild_id, quiz_name)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_last_question(self, guild_id, quiz_name, info):
+        self.execute("INSERT OR REPLACE INTO last_questions VALUES (?, ?, ?)", (guild_id, quiz_name, json.dumps(info)))
+
+    # The latest results file of a quiz, as (filename, bytes) or None.
+    def load_export(self, guild_id, quiz_name):
+        row = self.conn.execute("SELECT filename, data FROM exports WHERE guild_id = ? AND quiz = ?", (guild_id, quiz_name)).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def save_export(self, guild_id, quiz_name, filename, data):
+        self.execute("INSERT OR REPLACE INTO exports VALUES (?, ?, ?, ?)", (guild_id, quiz_name, filename, data))
+
+    # --- Aggregate leaderboards (all-time, guild and season boards, see catalog.py) ---
+    def load_aggregate(self, guild_id, board):
+        return dict(self.conn.execute("SELECT user_id, score FROM aggregate_scores WHERE guild_id = ? AND board = ?", (guild_id, board)))
+
+    # Adds one run's scores to a board; only the run's users are written.
+    def add_aggregate(self, guild_id, board, scores):
+        self.executemany(
+            "INSERT INTO aggregate_scores VALUES (?, ?, ?, ?) ON CONFLICT(guild_id, board, user_id) DO UPDATE SET score = score + excluded.score",
+            [(guild_id, board, user_id, score) for user_id, score in scores.items()]
+        )
+
+    def delete_aggregate(self, guild_id, board):
+        self.execute("DELETE FROM aggregate_scores WHERE guild_id = ? AND board = ?", (guild_id, board))
+
+    def save_season(self, guild_id, name):
+        self.execute("INSERT OR REPLACE INTO seasons VALUES (?, ?)", (guild_id, name))
+
+    # rows: [(user_id, answer_index, correct, answer_time), ...] from one ingest batch.
+    def record_answers(self, guild_id, quiz_name, session_id, question_index, rows):
+        def job(conn):
+            conn.executemany(
+                "INSERT INTO answers VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(guild_id, quiz_name, session_id, question_index, uid, idx, int(ok), t) for uid, idx, ok, t in rows]
+            )
+            conn.executemany("INSERT OR IGNORE INTO participants VALUES (?, ?, ?)", [(guild_id, quiz_name, row[0]) for row in rows])
+        self.submit(job)
+
+    # Folds the quiz's logged answers into its columnar segments.
+    def compact_answers(self, guild_id, quiz_name):
+        self.submit(lambda conn: compact_answers(conn, guild_id, quiz_name))
+
+    # Every answer of a quiz as AnswerColumns: its segments plus answers not compacted yet. Opens its
+    # own connection, so it can run in a worker thread; both are read from one snapshot, so a
+    # compaction committed in between is not counted twice.
+    def load_answer_columns(self, guild_id, quiz_name):
+        conn = connect(self.path)
+        try:
+            conn.execute("BEGIN")
+            columns = load_segments(conn, guild_id, quiz_name)
+            return columns.extend(AnswerColumns.from_rows([row[1:] for row in conn.execute(ANSWER_LOG_QUERY, (guild_id, quiz_name))]))
+        finally:
+            conn.close()
+
+    # --- Session checkpoints (see QuizSession in quizbot.py) ---
+    # Every checkpoint as (guild_id, session_id, channel_id, quiz_name, questions, state).
+    def load_checkpoints(self):
+        return [
+            (guild_id, session_id, channel_id, quiz_name, [make_question(*q) for q in json.loads(questions)], json.loads(state))
+            for guild_id, session_id, channel_id, quiz_name, questions, state in self.conn.execute("SELECT guild_id, session, channel_id, quiz, questions, state FROM session_checkpoints")
+        ]
+
+    # The run's question list is written once, when it starts.
+    def start_checkpoint(self, guild_id, session_id, channel_id, quiz_name, questions, state):
+        self.execute(
+            "INSERT OR REPLACE INTO session_checkpoints VALUES (?, ?, ?, ?, ?, ?)",
+            (guild_id, session_id, channel_id, quiz_name, json.dumps([tuple(q) for q in questions]), json.dumps(state))
+        )
+
+    # Replaces the state and adds awards ({user_id: points}) to the run's scores, in one savepoint.
+    def save_checkpoint(self, guild_id, session_id, state, awards=None):
+        state = json.dumps(state)
+        # awards is not changed after scoring, so its rows are built on the writer thread.
+        def job(conn):
+            conn.execute("UPDATE session_checkpoints SET state = ? WHERE guild_id = ? AND session = ?", (state, guild_id, session_id))
+            conn.executemany(
+                "INSERT INTO session_scores VALUES (?, ?, ?, ?) ON CONFLICT(guild_id, session, user_id) DO UPDATE SET score = score + excluded.score",
+                ((guild_id, session_id, user_id, points) for user_id, points in (awards or {}).items())
+            )
+        self.submit(job)
+
+    def delete_checkpoint(self, guild_id, session_id):
+        def job(conn):
+            conn.execute("DELETE FROM session_checkpoints WHERE guild_id = ? AND session = ?", (guild_id, session_id))
+            conn.execute("DELETE FROM session_scores WHERE guild_id = ? AND session = ?", (guild_id, session_id))
+        self.submit(job)
+
+    def load_session_scores(self, guild_id, session_id):
+        return dict(self.conn.execute("SELECT user_id, score FROM session_scores WHERE guild_id = ? AND session = ?", (guild_id, session_id)))
+
+    # The run's logged answers as [(question, user_id, answer_index, correct, answer_time), ...] in log order.
+    def load_session_answers(self, guild_id, quiz_name, session_id):
+        return self.conn.execute(
+            "SELECT question, user_id, answer_index, correct, answer_time FROM answers WHERE guild_id = ? AND quiz = ? AND session = ? ORDER BY rowid",
+            (guild_id, quiz_name, session_id)
+        ).fetchall()
+
+# Dict-like table whose keys are known up front and whose values are loaded from the store on
+# first access. Assigning or deleting a key writes through to the store.
+class LazyTable(MutableMapping):
+    def __init__(self, keys, load, save=None, delete=None):
+        self.keys_index = dict.fromkeys(keys)  # insertion-ordered set
+        self.cache = {}
+        self.load = load
+        self.save = save
+        self.delete = delete
+
+    def __getitem__(self, key):
+        if key in self.cache:
+            return self.cache[key]
+        if key not in self.keys_index:
+            raise KeyError(key)
+        value = self.cache[key] = self.load(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.keys_index[key] = None
+        self.cache[key] = value
+        if self.save:
+            self.save(key, value)
+
+    def __delitem__(self, key):
+        if key not in self.keys_index:
+            raise KeyError(key)
+        del self.keys_index[key]
+        self.cache.pop(key, None)
+        if self.delete:
+            self.delete(key)
+
+    def __contains__(self, key):
+        return key in self.keys_index
+
+    def __iter__(self):
+        return iter(list(self.keys_index))
+
+    def __len__(self):
+        return len(self.keys_index)
+
+    # The loaded value, or None without touching the store.
+    def peek(self, key):
+        return self.cache.get(key)
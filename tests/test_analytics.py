@@ -0,0 +1,42 @@
+from analytics import AnswerColumns, hardest, percentile, question_detail, question_stats
+
+ROWS = [
+    # (session, question, answer_index, correct, answer_time)
+    ("s1", 1, 0, 1, 1.0),
+    ("s1", 1, 1, 0, 3.0),
+    ("s1", 2, 2, 1, 2.0),
+    ("s2", 1, 0, 1, 2.0),
+    ("s2", 2, 0, 0, 5.0),
+    ("s2", 2, 1, 0, 4.0),
+]
+
+def test_columns_round_trip_through_encoding():
+    columns = AnswerColumns.from_rows(ROWS)
+    decoded = AnswerColumns.decode(*columns.encode())
+    assert len(decoded) == 6
+    assert list(decoded.question) == [1, 1, 2, 1, 2, 2]
+    assert list(decoded.answer_time) == [1.0, 3.0, 2.0, 2.0, 5.0, 4.0]
+    assert decoded.sessions == {"s1", "s2"}
+    assert len(AnswerColumns.from_rows([])) == 0
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 11))
+    assert percentile(values, 50) == 5
+    assert percentile(values, 90) == 9
+    assert percentile(values, 99) == 10
+    assert percentile([7], 50) == 7
+    assert percentile([0, 1, 2, 3], 50, first=2, count=2) == 2
+
+def test_question_stats_and_hardest():
+    stats = question_stats(AnswerColumns.from_rows(ROWS))
+    assert [(s.question, s.answers, s.correct, s.median, s.p90) for s in stats] == [(1, 3, 2, 2.0, 3.0), (2, 3, 1, 4.0, 5.0)]
+    assert [s.question for s in hardest(stats)] == [2, 1]
+    assert len(hardest(stats, 1)) == 1
+
+def test_question_detail():
+    detail = question_detail(AnswerColumns.from_rows(ROWS), 2)
+    assert detail["answers"] == 3
+    assert detail["correct"] == 1
+    assert detail["percentiles"] == {50: 4.0, 90: 5.0, 99: 5.0}
+    assert detail["options"] == {0: 1, 1: 1, 2: 1}
+    assert question_detail(AnswerColumns.from_rows(ROWS), 3) is None
@@ -0,0 +1,20 @@
+import asyncio
+
+from benchmarks.bench_quiz import compare, measure
+
+def test_benchmark_runs_a_small_room(tmp_path):
+    result = asyncio.run(measure(10, str(tmp_path / "bench.db")))
+    assert result["participants"] == 10
+    assert result["answers_per_sec"] > 0
+    assert result["ack_p50_ms"] <= result["ack_p99_ms"]
+    assert set(result["export_ms"]) == {"xlsx", "csv"}
+    assert "rank_decay" in result["scoring_ms"]
+
+def test_compare_lists_ratios_for_shared_sizes():
+    old = {"results": [{"participants": 10, "answers_per_sec": 100.0, "export_ms": {"csv": 2.0}}]}
+    new = {"results": [{"participants": 10, "answers_per_sec": 200.0, "export_ms": {"csv": 1.0}}, {"participants": 99, "answers_per_sec": 1.0}]}
+    assert compare(old, new) == [
+        "10 participants:",
+        "  answers_per_sec: 100.00 -> 200.00 (2.00x)",
+        "  export_ms.csv: 2.00 -> 1.00 (0.50x)"
+    ]
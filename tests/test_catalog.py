@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from catalog import GUILD_BOARD, Catalog, quiz_board, season_board
+from leaderboard import Leaderboard
+from questions import make_question
+from storage import QuizStore
+
+QUESTION = make_question("2+2?", ["3", "4"], 1, 20)
+
+@pytest.fixture
+def store(tmp_path):
+    store = QuizStore(str(tmp_path / "quiz.db"))
+    yield store
+    store.close()
+
+def test_guilds_do_not_see_each_others_quizzes(store):
+    catalogs = Catalog(store)
+    first = catalogs.get(1)
+    first.settings["q"] = {"shuffle": True}
+    first.save_settings("q")
+    first.quizzes["q"] = [QUESTION]
+    assert "q" not in catalogs.get(2).quizzes
+    assert catalogs.get(1).question_count("q") == 1
+
+def test_idle_guilds_are_evicted_and_reloaded(store):
+    catalogs = Catalog(store, max_rows=2)
+    for guild_id in (1, 2):
+        catalog = catalogs.get(guild_id)
+        catalog.settings["q"] = {}
+        catalog.save_settings("q")
+        catalog.quizzes["q"] = [QUESTION, QUESTION]
+        catalog.leaderboards["q"] = Leaderboard({guild_id: 10})
+    catalogs.get(2)
+    assert list(catalogs.guilds) == [2]
+    assert catalogs.evictions == 1
+
+    asyncio.run(store.flush())
+    reloaded = catalogs.get(1)
+    assert reloaded.quizzes["q"] == [QUESTION, QUESTION]
+    assert reloaded.leaderboards["q"].top() == [(1, 10)]
+
+def test_pinned_guilds_are_kept(store):
+    catalogs = Catalog(store, max_rows=0, pinned=lambda guild_id: guild_id == 1)
+    catalogs.get(1).quizzes["q"] = [QUESTION]
+    catalogs.get(2)
+    catalogs.get(3)
+    assert 1 in catalogs
+    assert 2 not in catalogs
+
+def test_runs_add_up_on_aggregate_boards(store):
+    catalogs = Catalog(store)
+    catalog = catalogs.get(1)
+    catalog.set_season("spring")
+    catalog.add_results("a", {1: 100, 2: 50})
+    catalog.add_results("b", {2: 80, 3: 0})
+    assert catalog.aggregates[quiz_board("a")].top() == [(1, 100), (2, 50)]
+    assert catalog.aggregates[GUILD_BOARD].top() == [(2, 130), (1, 100), (3, 0)]
+    assert catalog.aggregates[season_board("spring")].rank(1) == 2
+
+    catalog.set_season("summer")
+    catalog.add_results("a", {1: 10})
+    assert catalog.aggregates[season_board("summer")].top() == [(1, 10)]
+    catalog.delete_quiz("b")
+    asyncio.run(store.flush())
+
+    reloaded = Catalog(store).get(1)
+    assert reloaded.season() == "summer"
+    assert reloaded.aggregates[quiz_board("a")].top() == [(1, 110), (2, 50)]
+    assert reloaded.aggregates[GUILD_BOARD].get(2) == 130
+    assert quiz_board("b") not in reloaded.aggregates
+    assert GUILD_BOARD not in Catalog(store).get(2).aggregates
@@ -0,0 +1,27 @@
+import asyncio
+import csv
+import io
+
+from openpyxl import load_workbook
+
+from export import build_results, export_results, shutdown_pool
+
+ROWS = [(1, "ann", 200), (2, "bob, jr", 100)]
+
+def test_csv_export():
+    data = build_results(ROWS, "csv")
+    rows = list(csv.reader(io.StringIO(data.decode("utf-8-sig"))))
+    assert rows == [["User ID", "Username", "Score"], ["1", "ann", "200"], ["2", "bob, jr", "100"]]
+
+def test_xlsx_export_is_built_in_memory():
+    ws = load_workbook(io.BytesIO(build_results(ROWS, "xlsx"))).active
+    assert [[c.value for c in row] for row in ws.iter_rows()] == [["User ID", "Username", "Score"], ["1", "ann", 200], ["2", "bob, jr", 100]]
+
+def test_export_runs_in_worker_pool():
+    try:
+        filename, data, stats = asyncio.run(export_results("quiz", ROWS, "csv"))
+    finally:
+        shutdown_pool()
+    assert filename == "quiz_results.csv"
+    assert data == build_results(ROWS, "csv")
+    assert stats["rows"] == 2 and stats["max_loop_stall"] >= 0
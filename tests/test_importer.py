@@ -0,0 +1,57 @@
+import asyncio
+import io
+
+import importer
+from questions import make_question
+from importer import detect_format, import_questions, iter_rows, local_path, open_text
+
+def run_import(text, fmt, batch_size=1000):
+    batches = []
+    added, errors = asyncio.run(import_questions(io.StringIO(text), fmt, batches.append, batch_size))
+    return added, errors, batches
+
+def test_pipe_rows_match_bulkadd_and_errors_are_reported():
+    text = "20|1|What is 2+2?|3|4| \n\nx|0|Bad duration|a\n20|5|Bad index|a|b\n10|0|Too short\n0|0|No time|a\n"
+    added, errors, batches = run_import(text, "pipe")
+    assert added == 1
+    assert batches == [[make_question("What is 2+2?", ["3", "4"], 1, 20)]]
+    assert [line for line, _ in errors] == [3, 4, 5, 6]
+    assert "not between 0 and 1" in errors[1][1]
+
+def test_csv_with_quoted_newline_keeps_line_numbers():
+    text = '20,0,"Two\nlines",a,b\n20,9,bad,a\n'
+    added, errors, batches = run_import(text, "csv")
+    assert batches[0][0].question == "Two\nlines"
+    assert errors == [(3, "correct index 9 is not between 0 and 0")]
+
+def test_jsonl_objects_and_lists():
+    text = '{"duration": 15, "correct_answer_index": 0, "question": "Q", "options": ["a", "b"]}\n[10, 1, "R", "c", "d"]\n{oops\n'
+    added, errors, batches = run_import(text, "jsonl")
+    assert [q.question for q in batches[0]] == ["Q", "R"]
+    assert batches[0][0].duration == 15
+    assert errors[0][0] == 3
+
+def test_batches_are_bounded():
+    text = "".join(f"20|0|Q{i}|a|b\n" for i in range(25))
+    added, errors, batches = run_import(text, "pipe", batch_size=10)
+    assert added == 25
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+
+def test_format_detection_and_bom():
+    assert detect_format("bank.CSV") == "csv"
+    assert detect_format("bank.ndjson") == "jsonl"
+    assert detect_format("bank.txt") == "pipe"
+    rows = list(iter_rows(open_text("﻿20|0|Q|a\n".encode("utf-8")), "pipe"))
+    assert rows[0][1].duration == 20
+
+def test_local_path_stays_inside_import_dir(tmp_path):
+    (tmp_path / "bank.txt").write_text("20|0|Q|a\n")
+    assert local_path(str(tmp_path), "bank.txt") == str(tmp_path / "bank.txt")
+    assert local_path(str(tmp_path), "../bank.txt") is None
+    assert local_path(str(tmp_path), "missing.txt") is None
+    assert local_path(None, "bank.txt") is None
+
+def test_durations_past_the_maximum_are_reported():
+    added, errors, _ = run_import(f"{2**32}|0|Too long|a\n{importer.MAX_DURATION}|0|Longest|a\n", "pipe")
+    assert added == 1
+    assert errors == [(1, f"duration {2**32} is more than {importer.MAX_DURATION} seconds")]
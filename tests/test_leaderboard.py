@@ -0,0 +1,32 @@
+import random
+
+from leaderboard import Leaderboard
+
+def expected_order(scores):
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+def test_incremental_updates_match_full_sort():
+    rng = random.Random(7)
+    board = Leaderboard()
+    scores = {}
+    for _ in range(300):
+        awards = {rng.randrange(500): rng.randrange(-50, 100) for _ in range(rng.choice([1, 5, 300]))}
+        board.update(awards)
+        for user_id, points in awards.items():
+            scores[user_id] = scores.get(user_id, 0) + points
+        if rng.random() < 0.3:
+            assert board.top() == expected_order(scores)
+    assert board.top() == expected_order(scores)
+    assert board.top(5) == expected_order(scores)[:5]
+
+def test_rank_shares_ties():
+    board = Leaderboard({1: 10, 2: 30, 3: 30, 4: 5})
+    board.add(4, 25)
+    assert [board.rank(u) for u in (2, 3, 4, 1)] == [1, 1, 1, 4]
+    assert board.rank(99) is None
+
+def test_zero_award_registers_user_once():
+    board = Leaderboard()
+    board.add(1, 0)
+    board.add(1, 0)
+    assert len(board) == 1 and board.top() == [(1, 0)]
@@ -0,0 +1,28 @@
+import asyncio
+
+from benchmarks.fake_discord import RateLimiter
+from benchmarks.loadtest import load_test
+
+def test_rate_limiter_refills_after_the_window():
+    limiter = RateLimiter(2, 5.0)
+    assert limiter.hit("channel", 0.0) == (True, 1, 5.0)
+    assert limiter.hit("channel", 1.0) == (True, 0, 4.0)
+    assert limiter.hit("channel", 2.0) == (False, 0, 3.0)
+    assert limiter.hit("other", 2.0)[0]
+    assert limiter.hit("channel", 5.0) == (True, 0, 1.0)
+
+def test_load_test_runs_a_quiz_against_the_fake_discord(tmp_path):
+    with open(tmp_path / "bot.log", "w") as log:
+        results = asyncio.run(load_test(
+            [20], str(tmp_path / "loadtest.db"), log, latency=0.01, jitter=0.0,
+            questions=2, question_time=3, pause=0, spread=1.0, countdown="timestamp", answer_rate=1.0
+        ))
+    [result] = results
+    assert result["questions"] == 2
+    assert result["clicks"] == 40
+    assert result["acked"] == 40
+    assert result["dropped_acks"] == 0
+    assert result["ephemeral_replies"] == 40
+    assert result["export_bytes"] > 0
+    assert len(result["cycle_seconds"]) == 1
+    assert result["open_min_seconds"] >= 2
@@ -0,0 +1,56 @@
+import asyncio
+
+import members
+from members import MemberCache, display_name
+
+class User:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.mention = f"<@{user_id}>"
+
+class Guild:
+    id = 1
+
+    def __init__(self, cached=(), remote=()):
+        self.cached = {uid: User(uid) for uid in cached}
+        self.remote = set(remote)
+        self.queries = []
+
+    def get_member(self, user_id):
+        return self.cached.get(user_id)
+
+    async def query_members(self, user_ids, limit, cache):
+        self.queries.append(list(user_ids))
+        return [User(uid) for uid in user_ids if uid in self.remote]
+
+def test_resolve_uses_cache_then_guild_then_bulk_fetch(monkeypatch):
+    monkeypatch.setattr(members, "QUERY_CHUNK", 2)
+    cache = MemberCache()
+    cache.remember(1, User(1))
+    guild = Guild(cached=[2], remote=[3, 4, 5])
+    names = asyncio.run(cache.resolve(guild, [1, 2, 3, 4, 5, 6]))
+    assert sorted(names) == [1, 2, 3, 4, 5]
+    assert guild.queries == [[3, 4], [5, 6]]
+    assert display_name(names, 6) == "Unknown(6)"
+    # Everything found is cached for the next lookup.
+    guild.queries.clear()
+    asyncio.run(cache.resolve(guild, [1, 2, 3, 4, 5]))
+    assert guild.queries == []
+
+def test_lru_and_ttl():
+    cache = MemberCache(max_entries=2, ttl=60)
+    cache.remember(1, User(1))
+    cache.remember(1, User(2))
+    cache.get(1, 1)
+    cache.remember(1, User(3))
+    assert cache.get(1, 2) is None
+    assert cache.get(1, 1) == ("user1", "<@1>")
+    expired = MemberCache(ttl=-1)
+    expired.remember(1, User(1))
+    assert expired.get(1, 1) is None and len(expired) == 0
+
+def test_resolve_in_direct_messages_uses_only_the_cache():
+    cache = MemberCache()
+    cache.remember(None, User(1))
+    assert asyncio.run(cache.resolve(None, [1, 2])) == {1: ("user1", "<@1>")}
@@ -0,0 +1,51 @@
+import asyncio
+
+from metrics import Histogram, Metrics, serve_metrics
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    histogram = Histogram((0.01, 0.1, 1.0))
+    assert histogram.quantile(0.5) is None
+    for value in (0.005, 0.05, 0.05, 0.5):
+        histogram.observe(value)
+    assert histogram.count == 4
+    assert histogram.quantile(0.25) == 0.01
+    assert abs(histogram.quantile(0.5) - 0.055) < 1e-9
+    histogram.observe(5.0)
+    assert histogram.quantile(1.0) == 1.0
+
+def test_render_uses_prometheus_text_format():
+    metrics = Metrics()
+    metrics.describe("quizbot_commands_total", "counter", "Commands run.")
+    metrics.inc("quizbot_commands_total", (("command", 'say "hi"'),))
+    metrics.observe("quizbot_scoring_seconds", 0.002, (("strategy", "streak"),))
+    metrics.gauge("quizbot_active_sessions", "Running quiz sessions.", lambda: 3)
+    metrics.gauge("quizbot_gateway_latency_seconds", "Gateway latency.", lambda: float("nan"))
+    text = metrics.render()
+    assert "# HELP quizbot_commands_total Commands run.\n# TYPE quizbot_commands_total counter\n" in text
+    assert 'quizbot_commands_total{command="say \\"hi\\""} 1\n' in text
+    assert 'quizbot_scoring_seconds_bucket{strategy="streak",le="0.001"} 0\n' in text
+    assert 'quizbot_scoring_seconds_bucket{strategy="streak",le="0.0025"} 1\n' in text
+    assert 'quizbot_scoring_seconds_bucket{strategy="streak",le="+Inf"} 1\n' in text
+    assert 'quizbot_scoring_seconds_count{strategy="streak"} 1\n' in text
+    assert "quizbot_active_sessions 3\n" in text
+    assert "quizbot_gateway_latency_seconds NaN\n" in text
+
+def test_metrics_are_served_over_http():
+    async def run():
+        metrics = Metrics()
+        metrics.inc("quizbot_answers_total")
+        server = await serve_metrics(metrics, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        responses = []
+        for path in ("/metrics", "/other"):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            responses.append((await reader.read()).decode())
+            writer.close()
+        server.close()
+        await server.wait_closed()
+        return responses
+    found, missing = asyncio.run(run())
+    assert found.startswith("HTTP/1.1 200 OK")
+    assert found.endswith("quizbot_answers_total 1\n")
+    assert missing.startswith("HTTP/1.1 404")
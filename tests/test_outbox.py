@@ -0,0 +1,93 @@
+import asyncio
+
+from outbox import MESSAGE_LIMIT, PRIORITY_LIVE, Outbox, split_content
+
+class Channel:
+    id = 10
+    guild = None
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append((content, kwargs))
+        return len(self.sent)
+
+def test_adjacent_text_is_merged_in_posting_order():
+    async def run():
+        outbox = Outbox()
+        channel = Channel()
+        first = outbox.post(channel, "info 1")
+        outbox.post(channel, "info 2")
+        live = outbox.post(channel, "live", PRIORITY_LIVE)
+        outbox.post(channel, embed="card")
+        return await first, await live, channel.sent, outbox.stats()[10]
+    first, live, sent, stats = asyncio.run(run())
+    assert sent == [("info 1\ninfo 2\nlive", {}), (None, {"embed": "card"})]
+    assert first == live == 1
+    assert stats["sent"] == 2 and stats["merged"] == 2 and stats["depth"] == 0
+
+def test_live_channels_go_first_when_the_global_budget_is_used_up():
+    class Numbered(Channel):
+        def __init__(self, channel_id, log):
+            super().__init__()
+            self.id = channel_id
+            self.log = log
+
+        async def send(self, content=None, **kwargs):
+            self.log.append((self.id, content))
+            return await super().send(content, **kwargs)
+
+    async def run():
+        outbox = Outbox(global_budget=(1, 0.2))
+        log = []
+        info, live = Numbered(1, log), Numbered(2, log)
+        await outbox.post(info, embed="first")
+        queued = outbox.post(info, embed="info")
+        await asyncio.sleep(0.01)
+        await outbox.post(live, embed="live", priority=PRIORITY_LIVE)
+        await queued
+        return log
+    log = asyncio.run(run())
+    assert [channel_id for channel_id, _ in log] == [1, 2, 1]
+
+def test_send_budget_delays_extra_messages():
+    async def run():
+        outbox = Outbox({"send": (2, 0.2), "edit": (1, 0.2)})
+        channel = Channel()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for i in range(3):
+            await outbox.post(channel, embed=i)
+        return loop.time() - started, outbox.stats()[10]
+    elapsed, stats = asyncio.run(run())
+    assert elapsed >= 0.19
+    assert stats["max_wait"] >= 0.19
+
+def test_edit_route_has_its_own_budget():
+    outbox = Outbox({"send": (1, 60), "edit": (1, 60)})
+    assert outbox.reserve(1, "send")
+    assert outbox.reserve(1, "edit")
+    assert not outbox.reserve(1, "edit")
+    assert outbox.reserve(1, "edit", force=True)
+    assert outbox.reserve(2, "edit")
+
+def test_failed_send_reaches_the_caller():
+    class Broken(Channel):
+        async def send(self, content=None, **kwargs):
+            raise RuntimeError("no access")
+    async def run():
+        return await Outbox().post(Broken(), "hi")
+    try:
+        asyncio.run(run())
+    except RuntimeError as e:
+        assert str(e) == "no access"
+    else:
+        raise AssertionError("expected the send error")
+
+def test_long_text_is_split_at_line_breaks():
+    lines = [f"line {i} " + "x" * 90 for i in range(60)]
+    chunks = split_content("\n".join(lines))
+    assert all(len(chunk) <= MESSAGE_LIMIT for chunk in chunks)
+    assert "\n".join(chunks) == "\n".join(lines)
+    assert split_content("y" * (MESSAGE_LIMIT + 5)) == ["y" * MESSAGE_LIMIT, "yyyyy"]
@@ -0,0 +1,47 @@
+from pager import Pager, clip
+
+class Catalog:
+    guild_id = 1
+
+    def __init__(self, items):
+        self.items = items
+        self.changes = 0
+
+def make_pager(renders):
+    pager = Pager(cache_size=4)
+
+    @pager.listing("items", 3, lambda catalog, key: catalog.items, lambda catalog, key: catalog.changes)
+    def render(catalog, key, entries, first, page, pages):
+        renders.append(page)
+        return {"content": f"{first}:{','.join(entries)} ({page + 1}/{pages})"}
+
+    return pager
+
+def test_renders_only_the_requested_page_and_clamps():
+    renders = []
+    pager = make_pager(renders)
+    catalog = Catalog([str(i) for i in range(7)])
+    assert pager.render("items", catalog, "", 1) == ({"content": "3:3,4,5 (2/3)"}, 1, 3)
+    assert pager.render("items", catalog, "", 9)[1:] == (2, 3)
+    assert pager.render("items", catalog, "", -1)[0] == {"content": "0:0,1,2 (1/3)"}
+    assert renders == [1, 2, 0]
+
+def test_pages_are_cached_until_the_version_changes():
+    renders = []
+    pager = make_pager(renders)
+    catalog = Catalog(["a", "b"])
+    pager.render("items", catalog, "", 0)
+    pager.render("items", catalog, "", 0)
+    assert renders == [0] and pager.hits == 1
+    catalog.items.append("c")
+    catalog.changes += 1
+    assert pager.render("items", catalog, "", 0)[0] == {"content": "0:a,b,c (1/1)"}
+    assert renders == [0, 0]
+
+def test_empty_listing_has_one_page():
+    pager = make_pager([])
+    assert pager.render("items", Catalog([]), "", 0)[1:] == (0, 1)
+
+def test_clip():
+    assert clip("short", 10) == "short"
+    assert clip("a" * 20, 10) == "a" * 9 + "…"
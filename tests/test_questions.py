@@ -0,0 +1,42 @@
+import random
+
+from questions import Question, QuestionBank, make_question, shuffle_options
+
+def test_bank_reads_and_edits_by_index():
+    bank = QuestionBank([make_question("Q1", ["a", "b"], 1, 20), make_question("Q2", ["c"], 0, 10)])
+    assert bank[1] == Question("Q2", ("c",), 0, 10)
+    assert bank.correct_option(0) == "b"
+    bank[0] = make_question("Q1 edited", ["x", "y"], 0, 30)
+    bank.append(make_question("Q3", ["z"], 0, 5))
+    del bank[1]
+    assert [q.question for q in bank] == ["Q1 edited", "Q3"]
+    assert bank[-1].duration == 5
+    assert bank[0:1] == [Question("Q1 edited", ("x", "y"), 0, 30)]
+
+def test_repeated_option_sets_are_shared():
+    bank = QuestionBank(make_question(f"Q{i}", ["True", "False"], i % 2, 20) for i in range(100))
+    assert len({id(bank.options(i)) for i in range(100)}) == 1
+    assert len(bank.option_pool) == 1
+
+def test_copy_does_not_follow_edits():
+    bank = QuestionBank([make_question("Q1", ["a"], 0, 20)])
+    snapshot = bank.copy()
+    bank[0] = make_question("changed", ["b"], 0, 20)
+    bank.append(make_question("Q2", ["c"], 0, 20))
+    assert list(snapshot) == [Question("Q1", ("a",), 0, 20)]
+
+def test_shuffle_keeps_correct_position_with_duplicate_options():
+    question = make_question("Q", ["same", "same", "other"], 1, 20)
+    for seed in range(20):
+        shuffled = shuffle_options(question, random.Random(seed))
+        assert sorted(shuffled.options) == ["other", "same", "same"]
+        # Follow the correct option by position through the same permutation.
+        order = list(range(3))
+        random.Random(seed).shuffle(order)
+        assert order[shuffled.correct_answer_index] == 1
+
+def test_shuffle_is_reproducible_from_seed():
+    questions = [make_question(f"Q{i}", ["a", "b", "c", "d"], i % 4, 20) for i in range(10)]
+    first = [shuffle_options(q, rng) for rng in [random.Random(7)] for q in questions]
+    second = [shuffle_options(q, rng) for rng in [random.Random(7)] for q in questions]
+    assert first == second
@@ -0,0 +1,554 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+import quizbot
+from benchmarks.fakes import FakeChannel, FakeGuild, FakeInteraction, FakeResponse, fake_ctx, fake_user
+
+def test_quiz_runs_in_process(tmp_path):
+    bot = quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "quiz.db")))
+    assert bot.get_command("startquiz") is not None
+    ctx = fake_ctx()
+    guild = ctx.guild
+
+    async def run():
+        await quizbot.create_quiz.callback(ctx, "q")
+        await quizbot.add_question_simple.callback(ctx, "q", 1, 1, content="2+2?|3|4")
+        await quizbot.set_pause.callback(ctx, "q", 0)
+        await quizbot.set_close.callback(ctx, "q", "adaptive", 1)
+        await quizbot.start_quiz.callback(ctx, "q", "default")
+        session = quizbot.sessions.get(guild.id, ctx.channel.id, "q")
+        while (session.session_id, 1) not in quizbot.live_questions:
+            await asyncio.sleep(0.01)
+        await quizbot.dispatch_answer(FakeInteraction(5, guild), session.session_id, 1, 1)
+        await quizbot.dispatch_answer(FakeInteraction(6, guild), session.session_id, 1, 0)
+        await session.done
+        await quizbot.store.flush()
+
+    try:
+        asyncio.run(run())
+        catalog = quizbot.catalogs.get(guild.id)
+        assert catalog.leaderboards["q"].top() == [(5, 10000), (6, 0)]
+        assert catalog.aggregates[quizbot.GUILD_BOARD].rank(5) == 1
+        assert [m["embed"].title for m in ctx.channel.sent if isinstance(m, dict)] == ["q - Question 1"]
+    finally:
+        quizbot.shutdown()
+
+def test_one_bot_per_process(tmp_path):
+    quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "quiz.db")))
+    try:
+        quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "other.db")))
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("expected the second bot to be refused")
+    finally:
+        quizbot.shutdown()
+    assert quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "other.db"))) is quizbot.bot
+    quizbot.shutdown()
+
+# Stops the event loop without closing anything, as a crash or deploy would, and starts a new bot on
+# the same database whose first on_ready resumes the run.
+def restart(db_path, ctx):
+    quizbot.shutdown()
+    bot = quizbot.create_bot(quizbot.Config(db_path=db_path))
+    bot.get_channel = lambda channel_id: ctx.channel
+    return bot
+
+def test_interrupted_quiz_resumes_with_its_answers_and_scores(tmp_path):
+    db_path = str(tmp_path / "quiz.db")
+    quizbot.create_bot(quizbot.Config(db_path=db_path))
+    ctx = fake_ctx()
+    guild = ctx.guild
+
+    async def open_question():
+        await quizbot.create_quiz.callback(ctx, "q")
+        await quizbot.add_question_simple.callback(ctx, "q", 60, 2, content="2+2?|3|4|5")
+        await quizbot.add_question_simple.callback(ctx, "q", 60, 1, content="1+1?|2|3|4")
+        await quizbot.set_pause.callback(ctx, "q", 60)
+        await quizbot.set_close.callback(ctx, "q", "adaptive", 1)
+        await quizbot.start_quiz.callback(ctx, "q", "shuffle", 7)
+        session = quizbot.sessions.get(guild.id, ctx.channel.id, "q")
+        # The open checkpoint is written once the question is posted.
+        while getattr(session, "quiz_message", None) is None:
+            await asyncio.sleep(0.01)
+        correct = session.question.question_data.correct_answer_index
+        await quizbot.dispatch_answer(FakeInteraction(5, guild), session.session_id, 1, correct)
+        await quizbot.dispatch_answer(FakeInteraction(6, guild), session.session_id, 1, (correct + 1) % 3)
+        await session.question.close()
+        await quizbot.store.flush()
+        return session.session_id, session.question.question_data
+
+    async def reopened(session_id, shown):
+        await quizbot.on_ready()
+        session = quizbot.sessions.get(guild.id, ctx.channel.id, "q")
+        while session.state != "open":
+            await asyncio.sleep(0.01)
+        question = session.question
+        assert session.session_id == session_id and question.question_data == shown
+        assert [uid for uid, _ in question.answer_order] == [5, 6]
+        again = FakeInteraction(5, guild)
+        await quizbot.dispatch_answer(again, session_id, 1, 0)
+        await quizbot.dispatch_answer(FakeInteraction(7, guild), session_id, 1, shown.correct_answer_index)
+        while session.state != "intermission":
+            await asyncio.sleep(0.05)
+        await quizbot.store.flush()
+        assert again.followup.sent == 1
+
+    async def finished():
+        await quizbot.on_ready()
+        session = quizbot.sessions.get(guild.id, ctx.channel.id, "q")
+        assert session.state == "intermission" and session.index == 1
+        session.stop()
+        await session.done
+        await quizbot.store.flush()
+
+    try:
+        session_id, shown = asyncio.run(open_question())
+        restart(db_path, ctx)
+        asyncio.run(reopened(session_id, shown))
+        restart(db_path, ctx)
+        asyncio.run(finished())
+        catalog = quizbot.catalogs.get(guild.id)
+        assert catalog.leaderboards["q"].top() == [(5, 10000), (7, 9999), (6, 0)]
+        assert quizbot.store.load_checkpoints() == []
+        assert quizbot.metrics.total("quizbot_sessions_resumed_total") == 1
+    finally:
+        quizbot.shutdown()
+
+def test_a_shard_worker_resumes_only_its_own_guilds(tmp_path):
+    db_path = str(tmp_path / "quiz.db")
+    quizbot.create_bot(quizbot.Config(db_path=db_path))
+    # With two shards, guild 2 << 22 is on shard 0 and guild 1 << 22 on shard 1.
+    ours, theirs = fake_ctx(FakeGuild(2 << 22), 501), fake_ctx(FakeGuild(1 << 22), 502)
+
+    async def interrupted():
+        for ctx in (ours, theirs):
+            await open_quiz(ctx)
+        await quizbot.store.flush()
+
+    async def resumed():
+        await quizbot.on_ready()
+        session = quizbot.sessions.get(ours.guild.id, ours.channel.id, "q")
+        while session.state != "open":
+            await asyncio.sleep(0.01)
+        return session, quizbot.sessions.get(theirs.guild.id, theirs.channel.id, "q")
+
+    try:
+        asyncio.run(interrupted())
+        quizbot.shutdown()
+        bot = quizbot.create_bot(quizbot.Config(db_path=db_path, shard_count=2, shard_ids=[0]))
+        bot.get_channel = {ctx.channel.id: ctx.channel for ctx in (ours, theirs)}.get
+        session, other = asyncio.run(resumed())
+        assert session.index == 1 and other is None
+        # The other worker's run stays checkpointed for it to resume.
+        assert sorted(row[0] for row in quizbot.store.load_checkpoints()) == [1 << 22, 2 << 22]
+    finally:
+        quizbot.shutdown()
+
+def test_slash_commands_run_the_prefix_callbacks_and_autocomplete(tmp_path):
+    bot = quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "quiz.db")))
+    ctx = fake_ctx()
+    guild = ctx.guild
+
+    def interaction(**namespace):
+        i = FakeInteraction(9, guild, ctx.channel, **namespace)
+        i.user.roles = [SimpleNamespace(id=quizbot.config.allowed_role_id)]
+        return i
+
+    async def run():
+        slash = {cmd.name: cmd for cmd in bot.tree.get_commands()}
+        await slash["createquiz"].callback(interaction(), quiz_name="History")
+        await slash["createquiz"].callback(interaction(), quiz_name="Art history")
+        await slash["addq"].callback(interaction(), quiz_name="History", duration=20, correct_index=0, content="Year of Hastings?|1066|1215")
+        await slash["addq"].callback(interaction(), quiz_name="History", duration=20, correct_index=1, content="Magna Carta?|1066|1215")
+        await slash["setcountdown"].callback(interaction(), quiz_name="History", mode="milestones", milestones="10 3")
+        assert slash["deletequiz"].get_parameter("quiz_name").autocomplete
+        assert slash["editq"].get_parameter("question_index").autocomplete
+        assert not slash["createquiz"].get_parameter("quiz_name").autocomplete
+        quiz, question = quizbot.autocomplete_quiz, quizbot.autocomplete_question
+        assert [c.value for c in await quiz(interaction(), "hist")] == ["History", "Art history"]
+        assert [(c.name, c.value) for c in await question(interaction(quiz_name="History"), "carta")] == [("2. Magna Carta?", 2)]
+        await slash["editq"].callback(interaction(), quiz_name="History", question_index=2, duration=20, correct_index=1, content="Signing of the Magna Carta?|1066|1215")
+        assert [c.name for c in await question(interaction(quiz_name="History"), "sign")] == ["2. Signing of the Magna Carta?"]
+        await slash["deletequiz"].callback(interaction(), quiz_name="Art history")
+        assert [c.value for c in await quiz(interaction(), "hist")] == ["History"]
+        outsider = FakeInteraction(10, guild, ctx.channel)
+        outsider.user.roles = []
+        assert await quiz(outsider, "") == []
+
+    try:
+        asyncio.run(run())
+        catalog = quizbot.catalogs.get(guild.id)
+        assert catalog.settings["History"]["countdown_milestones"] == [10, 3]
+        assert [q.question for q in catalog.quizzes["History"]] == ["Year of Hastings?", "Signing of the Magna Carta?"]
+        assert quizbot.metrics.histogram("quizbot_command_seconds", (("command", "addq"),)).count == 2
+    finally:
+        quizbot.shutdown()
+
+def test_slash_importq_reads_the_attached_file(tmp_path):
+    bot = quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "quiz.db")))
+    ctx = fake_ctx()
+
+    class Attachment:
+        filename = "questions.csv"
+
+        async def read(self):
+            return b"20,1,What is 2+2?,3,4\n30,0,Capital of France?,Paris,Rome\n"
+
+    async def run():
+        importq = next(cmd for cmd in bot.tree.get_commands() if cmd.name == "importq")
+        assert importq.get_parameter("attachment").type is discord.AppCommandOptionType.attachment
+        click = FakeInteraction(9, ctx.guild, ctx.channel)
+        click.user.roles = [SimpleNamespace(id=quizbot.config.allowed_role_id)]
+        await quizbot.create_quiz.callback(ctx, "q")
+        await importq.callback(click, quiz_name="q", attachment=Attachment())
+        await quizbot.reply(ctx, "done")
+
+    try:
+        asyncio.run(run())
+        assert [q.question for q in quizbot.catalogs.get(ctx.guild.id).quizzes["q"]] == ["What is 2+2?", "Capital of France?"]
+        assert "2 questions added to **q**." in ctx.channel.sent
+    finally:
+        quizbot.shutdown()
+
+def test_countdown_renders_the_deadline_once_or_edits_at_milestones(tmp_path):
+    quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "quiz.db")))
+    ctx = fake_ctx()
+
+    async def run(mode, *milestones):
+        await quizbot.set_countdown.callback(ctx, "q", mode, *milestones)
+        await quizbot.start_quiz.callback(ctx, "q", "default")
+        session = quizbot.sessions.get(ctx.guild.id, ctx.channel.id, "q")
+        while getattr(session, "quiz_message", None) is None:
+            await asyncio.sleep(0.01)
+        await session.done
+        return session.quiz_message.edits, session.embed
+
+    async def all_modes():
+        await quizbot.create_quiz.callback(ctx, "q")
+        await quizbot.add_question_simple.callback(ctx, "q", 2, 0, content="2+2?|4|5")
+        await quizbot.set_pause.callback(ctx, "q", 0)
+        # Replies leave the channel in order, so later runs may post their card late; the modes that
+        # edit before the deadline run first.
+        return [await run("live"), await run("milestones", 1), await run("timestamp")]
+
+    try:
+        (live_edits, live), (milestone_edits, _), (timestamp_edits, timestamp) = asyncio.run(all_modes())
+        # Only the closing edit, which replaces the relative timestamp.
+        assert timestamp_edits == 1
+        assert timestamp.fields[-1].value == "Time is up!"
+        assert timestamp.footer.text == "Time limit: 2 seconds"
+        assert milestone_edits == 2
+        assert live_edits == 3
+        assert live.footer.text == "Time remaining: 1 seconds"
+    finally:
+        quizbot.shutdown()
+
+def test_render_countdown_uses_a_relative_timestamp():
+    embed = quizbot.discord.Embed(title="q")
+    quizbot.render_countdown(embed, "milestones", 1000.2, 30)
+    assert embed.fields[-1].value == "Ends <t:1001:R>"
+    quizbot.close_countdown(embed, "milestones")
+    assert embed.fields[-1].value == "Time is up!"
+
+class SlowResponse(FakeResponse):
+    async def defer(self, **kwargs):
+        await asyncio.sleep(0.3)
+        await super().defer(**kwargs)
+
+async def open_quiz(ctx, duration=60, questions=1, pause=0):
+    await quizbot.create_quiz.callback(ctx, "q")
+    for _ in range(questions):
+        await quizbot.add_question_simple.callback(ctx, "q", duration, 1, content="2+2?|3|4")
+    await quizbot.set_pause.callback(ctx, "q", pause)
+    await quizbot.start_quiz.callback(ctx, "q", "default")
+    session = quizbot.sessions.get(ctx.guild.id, ctx.channel.id, "q")
+    while getattr(session, "quiz_message", None) is None:
+        await asyncio.sleep(0.01)
+    return session
+
+def test_click_acked_after_the_close_still_counts(tmp_path):
+    quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "quiz.db")))
+    ctx = fake_ctx()
+
+    async def run():
+        session = await open_quiz(ctx)
+        slow = FakeInteraction(5, ctx.guild)
+        slow.response = SlowResponse(slow)
+        click = asyncio.create_task(quizbot.dispatch_answer(slow, session.session_id, 1, 1))
+        await asyncio.sleep(0.05)
+        question = session.question
+        session.stop()
+        while not question.closed:
+            await asyncio.sleep(0.01)
+        assert slow.acked_at is None
+        late = FakeInteraction(6, ctx.guild)
+        await question.handle_answer(late, 1)
+        await click
+        await session.done
+        await asyncio.sleep(0)
+        return slow, late, question
+
+    try:
+        slow, late, question = asyncio.run(run())
+        assert list(question.responses) == [5]
+        assert slow.followup.sent == 1
+        # Clicks after the close are told so instead of being dropped silently.
+        assert late.acked_at is not None and late.followup.sent == 0
+        assert quizbot.catalogs.get(ctx.guild.id).leaderboards["q"].top() == [(5, 10000)]
+    finally:
+        quizbot.shutdown()
+
+def test_answers_are_ordered_by_receive_time_and_counted_once(tmp_path):
+    quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "quiz.db")))
+    ctx = fake_ctx()
+
+    async def run():
+        session = await open_quiz(ctx)
+        question = session.question
+        clicks = [FakeInteraction(user_id, ctx.guild) for user_id in (7, 8, 7)]
+        for i, option in zip(clicks, (0, 1, 1)):
+            await quizbot.dispatch_answer(i, session.session_id, 1, option)
+        session.stop()
+        await session.done
+        await asyncio.gather(*question.feedback_tasks)
+        return clicks, question
+
+    try:
+        clicks, question = asyncio.run(run())
+        assert [(uid, r["answer_index"]) for uid, r in question.answer_order] == [(7, 0), (8, 1)]
+        assert question.answer_order[0][1]["answer_time"] <= question.answer_order[1][1]["answer_time"]
+        assert all(i.acked_at is not None and i.followup.sent == 1 for i in clicks)
+    finally:
+        quizbot.shutdown()
+
+def test_answer_buttons_route_by_custom_id_and_release_the_question(tmp_path):
+    quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "quiz.db")))
+    ctx = fake_ctx()
+
+    async def run():
+        session = await open_quiz(ctx)
+        view = quizbot.QuizView(session.session_id, 1, 2)
+        custom_ids = [item.item.custom_id for item in view.children]
+        # What discord.py does with a click on a message posted by an earlier process.
+        match = quizbot.QuizAnswerButton.__discord_ui_compiled_template__.fullmatch(custom_ids[1])
+        button = await quizbot.QuizAnswerButton.from_custom_id(None, None, match)
+        click = FakeInteraction(5, ctx.guild)
+        await button.callback(click)
+        question = session.question
+        session.stop()
+        await session.done
+        stale = FakeInteraction(6, ctx.guild)
+        await button.callback(stale)
+        return custom_ids, button, question, stale
+
+    try:
+        custom_ids, button, question, stale = asyncio.run(run())
+        assert custom_ids == [f"quiz:{button.session_id}:1:0", f"quiz:{button.session_id}:1:1"]
+        assert (button.question_index, button.option_index) == (1, 1)
+        assert question.responses[5]["correct"]
+        assert quizbot.live_questions == {}
+        assert stale.acked_at is not None and stale.followup.sent == 0
+    finally:
+        quizbot.shutdown()
+
+def test_live_standings_and_rank_during_a_run(tmp_path):
+    quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "quiz.db")))
+    ctx = fake_ctx()
+    player = SimpleNamespace(guild=ctx.guild, channel=ctx.channel, author=fake_user(6))
+
+    async def run():
+        session = await open_quiz(ctx, duration=1, questions=2, pause=60)
+        await quizbot.dispatch_answer(FakeInteraction(5, ctx.guild), session.session_id, 1, 1)
+        await quizbot.dispatch_answer(FakeInteraction(6, ctx.guild), session.session_id, 1, 1)
+        while session.state != "intermission":
+            await asyncio.sleep(0.05)
+        await quizbot.live_board.callback(ctx, "q")
+        await quizbot.my_rank.callback(player, "q")
+        # Replies may be merged with the quiz's own messages.
+        text = "\n".join(m for m in ctx.channel.sent if isinstance(m, str))
+        session.stop()
+        await session.done
+        return text
+
+    try:
+        text = asyncio.run(run())
+        assert "**q** Live Standings (Top 10):\n1. <@5> - 10000 points\n2. <@6> - 9999 points" in text
+        assert "<@6> is ranked #2 of 2 in **q** with 9999 points." in text
+    finally:
+        quizbot.shutdown()
+
+def test_scoring_strategy_is_chosen_per_quiz(tmp_path):
+    quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "quiz.db")))
+    ctx = fake_ctx()
+
+    async def run():
+        await quizbot.create_quiz.callback(ctx, "q")
+        await quizbot.add_question_simple.callback(ctx, "q", 1, 1, content="2+2?|3|4")
+        await quizbot.set_pause.callback(ctx, "q", 0)
+        await quizbot.set_scoring.callback(ctx, "q", "nope")
+        await quizbot.set_scoring.callback(ctx, "q", "time_decay")
+        await quizbot.start_quiz.callback(ctx, "q", "default")
+        session = quizbot.sessions.get(ctx.guild.id, ctx.channel.id, "q")
+        while session.question is None:
+            await asyncio.sleep(0.01)
+        await quizbot.dispatch_answer(FakeInteraction(5, ctx.guild), session.session_id, 1, 1)
+        await session.done
+        return session
+
+    try:
+        session = asyncio.run(run())
+        assert session.scoring_name == "time_decay"
+        assert "Scoring must be one of: rank_decay, time_decay, streak, penalty." in ctx.channel.sent
+        # Time decay gives less than the full 10000 for an answer after the question opened.
+        assert 5000 <= quizbot.catalogs.get(ctx.guild.id).leaderboards["q"].get(5) < 10000
+    finally:
+        quizbot.shutdown()
+
+def test_quiz_in_direct_messages_posts_results(tmp_path):
+    quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "quiz.db")))
+    ctx = SimpleNamespace(guild=None, channel=FakeChannel(None, 77), author=fake_user(9))
+
+    async def run():
+        await quizbot.create_quiz.callback(ctx, "q")
+        await quizbot.add_question_simple.callback(ctx, "q", 1, 1, content="2+2?|3|4")
+        await quizbot.set_pause.callback(ctx, "q", 0)
+        await quizbot.start_quiz.callback(ctx, "q", "default")
+        session = quizbot.sessions.get(0, ctx.channel.id, "q")
+        while session.question is None:
+            await asyncio.sleep(0.01)
+        click = FakeInteraction(9, SimpleNamespace(id=None))
+        await quizbot.dispatch_answer(click, session.session_id, 1, 1)
+        await session.done
+        await quizbot.leaderboard.callback(ctx, "q")
+        await quizbot.send_results.callback(ctx, "q")
+
+    try:
+        asyncio.run(run())
+        text = "\n".join(m for m in ctx.channel.sent if isinstance(m, str))
+        assert text.count("**q** Leaderboard (Top 10):\n1. <@9> - 10000 points") == 2
+        assert any(isinstance(m, dict) and "file" in m for m in ctx.channel.sent)
+    finally:
+        quizbot.shutdown()
+
+def test_durations_past_the_maximum_are_rejected(tmp_path):
+    quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "quiz.db")))
+    ctx = fake_ctx()
+
+    async def run():
+        await quizbot.create_quiz.callback(ctx, "q")
+        await quizbot.add_question_simple.callback(ctx, "q", 2**32, 1, content="2+2?|3|4")
+        await quizbot.add_question_simple.callback(ctx, "q", 20, 1, content="2+2?|3|4")
+        await quizbot.edit_question.callback(ctx, "q", 1, quizbot.MAX_DURATION + 1, 1, content="2+2?|3|4")
+        await quizbot.reply(ctx, "done")
+
+    try:
+        asyncio.run(run())
+        assert [q.duration for q in quizbot.catalogs.get(ctx.guild.id).quizzes["q"]] == [20]
+        text = "\n".join(m for m in ctx.channel.sent if isinstance(m, str))
+        assert text.count(f"Duration must be at most {quizbot.MAX_DURATION} seconds.") == 2
+    finally:
+        quizbot.shutdown()
+
+def test_adaptive_close_after_the_quiet_period_and_once_everyone_answered(tmp_path):
+    quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "quiz.db")))
+    ctx = fake_ctx()
+
+    async def run():
+        await quizbot.create_quiz.callback(ctx, "q")
+        await quizbot.set_close.callback(ctx, "q", "adaptive", 1)
+        session = await open_quiz(ctx, duration=60, questions=2)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await quizbot.dispatch_answer(FakeInteraction(5, ctx.guild), session.session_id, 1, 1)
+        # Nobody is expected on the first question of a first run, so the quiet period closes it.
+        while session.index < 2 or session.state != "open":
+            await asyncio.sleep(0.01)
+        quiet = loop.time() - started
+        # The first question's deadline firing late leaves the second one open.
+        await session.close_question(1)
+        assert session.state == "open" and session.index == 2
+        started = loop.time()
+        await quizbot.dispatch_answer(FakeInteraction(5, ctx.guild), session.session_id, 2, 1)
+        await session.done
+        return quiet, loop.time() - started
+
+    try:
+        quiet, everyone = asyncio.run(run())
+        assert 1 <= quiet < 5
+        assert everyone < 1
+    finally:
+        quizbot.shutdown()
+
+def test_adaptive_close_on_a_first_question_waits_for_the_last_run_players(tmp_path):
+    quizbot.create_bot(quizbot.Config(db_path=str(tmp_path / "quiz.db")))
+    ctx = fake_ctx()
+
+    async def play():
+        await quizbot.start_quiz.callback(ctx, "q", "default")
+        session = quizbot.sessions.get(ctx.guild.id, ctx.channel.id, "q")
+        while session.question is None:
+            await asyncio.sleep(0.01)
+        for user_id in (5, 6):
+            await quizbot.dispatch_answer(FakeInteraction(user_id, ctx.guild), session.session_id, 1, 1)
+        await session.done
+        return session
+
+    async def run():
+        await quizbot.create_quiz.callback(ctx, "q")
+        await quizbot.set_pause.callback(ctx, "q", 0)
+        await quizbot.set_close.callback(ctx, "q", "adaptive", 0)
+        await quizbot.add_question_simple.callback(ctx, "q", 1, 1, content="2+2?|3|4")
+        await play()
+        await quizbot.edit_question.callback(ctx, "q", 1, 60, 1, content="2+2?|3|4")
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        session = await asyncio.wait_for(play(), 5)
+        return session, loop.time() - started
+
+    try:
+        session, elapsed = asyncio.run(run())
+        assert session.index == 1 and elapsed < 1
+    finally:
+        quizbot.shutdown()
+
+def test_reopened_question_everyone_answered_closes_at_once(tmp_path):
+    db_path = str(tmp_path / "quiz.db")
+    quizbot.create_bot(quizbot.Config(db_path=db_path))
+    ctx = fake_ctx()
+
+    async def answered():
+        await quizbot.create_quiz.callback(ctx, "q")
+        await quizbot.add_question_simple.callback(ctx, "q", 1, 1, content="2+2?|3|4")
+        await quizbot.add_question_simple.callback(ctx, "q", 60, 1, content="1+1?|2|3")
+        await quizbot.set_pause.callback(ctx, "q", 0)
+        await quizbot.start_quiz.callback(ctx, "q", "default")
+        session = quizbot.sessions.get(ctx.guild.id, ctx.channel.id, "q")
+        posted = None
+        for idx in (1, 2):
+            # The open checkpoint is written once the question's message is posted.
+            while session.index < idx or getattr(session, "quiz_message", posted) is posted:
+                await asyncio.sleep(0.01)
+            posted = session.quiz_message
+            await quizbot.dispatch_answer(FakeInteraction(5, ctx.guild), session.session_id, idx, 1)
+        await session.question.close()
+        # Switched after the answers, so only the reopen can see that everyone has answered.
+        await quizbot.set_close.callback(ctx, "q", "adaptive", 0)
+        await quizbot.store.flush()
+
+    async def reopened():
+        await quizbot.on_ready()
+        session = quizbot.sessions.get(ctx.guild.id, ctx.channel.id, "q")
+        await asyncio.wait_for(session.done, 5)
+        return session
+
+    try:
+        asyncio.run(answered())
+        restart(db_path, ctx)
+        session = asyncio.run(reopened())
+        assert session.index == 2
+        assert quizbot.catalogs.get(ctx.guild.id).leaderboards["q"].top() == [(5, 20000)]
+    finally:
+        quizbot.shutdown()
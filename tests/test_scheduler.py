@@ -0,0 +1,61 @@
+import asyncio
+
+from scheduler import SessionManager, TimerWheel
+
+def test_wheel_fires_in_order_and_skips_cancelled():
+    async def run():
+        wheel = TimerWheel(resolution=0.01, size=8)
+        fired = []
+        wheel.schedule(0.05, lambda: fired.append("b"))
+        wheel.schedule(0.01, lambda: fired.append("a"))
+        # Longer than one turn of the wheel (8 * 0.01s), so it waits out a full round.
+        wheel.schedule(0.12, lambda: fired.append("c"))
+        wheel.schedule(0.03, lambda: fired.append("cancelled")).cancel()
+        assert len(wheel) == 4
+        await asyncio.sleep(0.25)
+        return fired, len(wheel), wheel.task.done()
+    fired, pending, stopped = asyncio.run(run())
+    assert fired == ["a", "b", "c"]
+    assert pending == 0
+    assert stopped
+
+def test_wheel_restarts_after_going_idle():
+    async def run():
+        wheel = TimerWheel(resolution=0.01)
+        fired = []
+        wheel.schedule(0.01, lambda: fired.append(1))
+        await asyncio.sleep(0.05)
+        wheel.schedule(0.01, lambda: fired.append(2))
+        await asyncio.sleep(0.05)
+        return fired
+    assert asyncio.run(run()) == [1, 2]
+
+def test_wheel_survives_failing_callback():
+    async def run():
+        wheel = TimerWheel(resolution=0.01)
+        fired = []
+        wheel.schedule(0.01, lambda: 1 / 0)
+        wheel.schedule(0.02, lambda: fired.append(1))
+        await asyncio.sleep(0.06)
+        return fired
+    assert asyncio.run(run()) == [1]
+
+class Session:
+    def __init__(self, guild_id, channel_id, quiz_name):
+        self.key = (guild_id, channel_id, quiz_name)
+
+def test_sessions_are_keyed_by_guild_channel_and_quiz():
+    manager = SessionManager(TimerWheel())
+    first, second, other = Session(1, 10, "q"), Session(1, 20, "q"), Session(2, 10, "q")
+    for session in (first, second, other):
+        manager.add(session)
+    assert manager.get(1, 10, "q") is first
+    assert manager.get(1, 20, "q") is second
+    assert manager.for_guild(1) == [first, second]
+    assert manager.is_running(2, "q")
+    assert not manager.is_running(3, "q")
+    manager.remove(Session(1, 10, "q"))  # a different session with the same key is not removed
+    assert len(manager) == 3
+    for session in (first, second, other):
+        manager.remove(session)
+    assert not manager.is_running(1, "q")
@@ -0,0 +1,27 @@
+from scoring import STRATEGIES, score_responses
+
+RESPONSES = [
+    (1, {"correct": True, "answer_time": 1.0}),
+    (2, {"correct": False, "answer_time": 2.0}),
+    (3, {"correct": True, "answer_time": 10.0}),
+]
+
+def test_rank_decay_is_the_classic_rule():
+    assert score_responses("rank_decay", RESPONSES, 10, {}) == {1: 10000, 3: 9999}
+
+def test_time_decay_halves_at_deadline():
+    assert score_responses("time_decay", RESPONSES, 10, {}) == {1: 9500, 3: 5000}
+
+def test_streak_bonus_and_reset():
+    state = {}
+    score_responses("streak", RESPONSES, 10, state)
+    awards = score_responses("streak", RESPONSES[:2], 10, state)
+    assert awards == {1: 10500}
+    assert state["streaks"] == {1: 2}
+
+def test_penalty_for_wrong_answers():
+    assert score_responses("penalty", RESPONSES, 10, {})[2] < 0
+
+def test_unknown_strategy_falls_back():
+    assert score_responses("nope", RESPONSES, 10, {}) == score_responses("rank_decay", RESPONSES, 10, {})
+    assert set(STRATEGIES) == {"rank_decay", "time_decay", "streak", "penalty"}
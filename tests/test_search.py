@@ -0,0 +1,30 @@
+import time
+
+from search import NameIndex
+
+def test_prefix_matches_come_before_substring_matches():
+    index = NameIndex(["History", "Art history", "hist", "Geography", "Math"])
+    assert index.search("his") == ["hist", "History", "Art history"]
+    assert index.search("HI") == ["hist", "History", "Art history"]
+    assert index.search("graph") == ["Geography"]
+    assert index.search("") == ["Art history", "Geography", "hist", "History", "Math"]
+    assert index.search("his", limit=2) == ["hist", "History"]
+    assert index.search("xyz") == []
+
+def test_add_and_remove_keep_the_index_current():
+    index = NameIndex(["alpha"])
+    index.add("alphabet")
+    index.add("alpha")
+    assert len(index) == 2
+    assert index.search("bet") == ["alphabet"]
+    index.remove("alphabet")
+    index.remove("missing")
+    assert index.search("bet") == [] and index.search("alp") == ["alpha"]
+    assert "alpha" in index and "alphabet" not in index
+
+def test_search_stays_fast_with_many_names():
+    index = NameIndex(f"quiz {n} {'science' if n % 7 else 'history'}" for n in range(50000))
+    started = time.perf_counter()
+    for text in ("quiz 4", "story", "9 sci", "q", "zz"):
+        assert all(text in name for name in index.search(text))
+    assert time.perf_counter() - started < 0.5
@@ -0,0 +1,15 @@
+from shards import shard_for, shard_plan
+
+def test_shard_plan_spreads_shards_over_workers():
+    assert shard_plan(4, 2) == [[0, 2], [1, 3]]
+    assert shard_plan(5, 2) == [[0, 2, 4], [1, 3]]
+    assert shard_plan(2, 4) == [[0], [1]]
+    assert shard_plan(3, 1) == [[0, 1, 2]]
+
+def test_shard_for_follows_discord_routing():
+    assert shard_for(None, 4) == 0
+    assert shard_for(5 << 22, 4) == 1
+    assert shard_for((7 << 22) + 12345, 1) == 0
+    # Every shard in the plan has exactly one owner, so every guild does too.
+    owners = {shard: worker for worker, shards in enumerate(shard_plan(6, 4)) for shard in shards}
+    assert sorted(owners) == list(range(6))
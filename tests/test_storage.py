@@ -0,0 +1,225 @@
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+from functools import partial
+
+import pytest
+
+import storage
+from questions import make_question
+from storage import LazyTable, QuizStore
+
+G = 1  # guild id
+QUESTION = make_question("2+2?", ["3", "4"], 1, 20)
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "quiz.db")
+
+def question(text):
+    return QUESTION._replace(question=text)
+
+def test_writes_survive_reopen(db_path):
+    store = QuizStore(db_path)
+    store.save_settings(G, "a", {"shuffle": True})
+    store.replace_questions(G, "a", [question("q1"), question("q2")])
+    store.save_questions(G, "a", [question("q2 edited")], start=1)
+    store.save_leaderboard(G, "a", {1: 100, 2: 50})
+    store.save_participants(G, "a", {1, 2, 3})
+    store.save_last_question(G, "a", {"correct_answer": "4"})
+    store.record_answers(G, "a", "s1", 1, [(4, 1, True, 0.5)])
+    store.close()
+
+    store = QuizStore(db_path)
+    assert store.load_settings(G) == {"a": {"shuffle": True}}
+    assert store.load_question_counts(G) == {"a": 2}
+    assert [q.question for q in store.load_questions(G, "a")] == ["q1", "q2 edited"]
+    assert store.load_questions(G, "a")[0] == question("q1")
+    assert store.load_leaderboard(G, "a") == {1: 100, 2: 50}
+    assert store.load_participants(G, "a") == {1, 2, 3, 4}
+    assert store.load_last_question(G, "a") == {"correct_answer": "4"}
+    store.close()
+
+def test_replace_is_atomic_and_ordered(db_path):
+    store = QuizStore(db_path)
+    store.replace_questions(G, "a", [question("old")])
+    store.replace_questions(G, "a", [question("new1"), question("new2")])
+    store.save_leaderboard(G, "a", {1: 1})
+    store.save_leaderboard(G, "a", {2: 2})
+    store.close()
+
+    store = QuizStore(db_path)
+    assert [q.question for q in store.load_questions(G, "a")] == ["new1", "new2"]
+    assert store.load_leaderboard(G, "a") == {2: 2}
+    store.close()
+
+def test_delete_then_recreate_keeps_new_quiz(db_path):
+    store = QuizStore(db_path)
+    store.save_settings(G, "a", {"v": 1})
+    store.replace_questions(G, "a", [question("first")])
+    store.delete_quiz(G, "a")
+    store.save_settings(G, "a", {"v": 2})
+    store.replace_questions(G, "a", [question("second")])
+    store.close()
+
+    store = QuizStore(db_path)
+    assert store.load_settings(G) == {"a": {"v": 2}}
+    assert [q.question for q in store.load_questions(G, "a")] == ["second"]
+    store.close()
+
+def test_failing_job_does_not_stop_writer(db_path):
+    store = QuizStore(db_path)
+
+    def broken(conn):
+        conn.execute("INSERT INTO quizzes VALUES (1, 'half', '{}')")
+        raise ValueError("boom")
+
+    store.submit(broken)
+    store.save_settings(G, "b", {})
+    asyncio.run(store.flush())
+    assert store.writer.is_alive()
+    store.close()
+
+    store = QuizStore(db_path)
+    assert store.load_settings(G) == {"b": {}}
+    store.close()
+
+def test_lazy_table_loads_on_first_use(db_path):
+    store = QuizStore(db_path)
+    store.replace_questions(G, "a", [question("q1")])
+    store.close()
+
+    store = QuizStore(db_path)
+    loads = []
+    def load(name):
+        loads.append(name)
+        return store.load_questions(G, name)
+    table = LazyTable(["a", "b"], load, partial(store.replace_questions, G), partial(store.delete_quiz, G))
+    assert list(table) == ["a", "b"]
+    assert "a" in table and table.peek("a") is None
+    assert [q.question for q in table["a"]] == ["q1"]
+    table["a"]
+    assert loads == ["a"]
+
+    del table["b"]
+    table["c"] = [question("c1")]
+    assert list(table) == ["a", "c"]
+    store.close()
+
+    store = QuizStore(db_path)
+    assert [q.question for q in store.load_questions(G, "c")] == ["c1"]
+    store.close()
+
+def test_guilds_have_separate_namespaces(db_path):
+    store = QuizStore(db_path)
+    store.save_settings(1, "a", {"v": 1})
+    store.save_settings(2, "a", {"v": 2})
+    store.replace_questions(2, "a", [question("other guild")])
+    store.delete_quiz(1, "a")
+    store.close()
+
+    store = QuizStore(db_path)
+    assert store.load_settings(1) == {}
+    assert store.load_settings(2) == {"a": {"v": 2}}
+    assert store.load_question_counts(2) == {"a": 1}
+    store.close()
+
+def test_answers_are_compacted_into_segments(db_path, monkeypatch):
+    monkeypatch.setattr(storage, "MAX_SEGMENTS", 2)
+    store = QuizStore(db_path)
+    for run in range(4):
+        store.record_answers(G, "a", f"s{run}", 1, [(1, 0, True, 1.0), (2, 1, False, 2.5)])
+        store.compact_answers(G, "a")
+    store.record_answers(G, "a", "s4", 2, [(1, 1, True, 0.5)])
+    store.record_answers(G + 1, "a", "s5", 1, [(1, 0, True, 1.0)])
+    store.close()
+
+    store = QuizStore(db_path)
+    assert store.conn.execute("SELECT COUNT(*) FROM answer_segments WHERE guild_id = ?", (G,)).fetchone()[0] == 2
+    assert store.conn.execute("SELECT COUNT(*) FROM answers WHERE guild_id = ?", (G,)).fetchone()[0] == 1
+    columns = store.load_answer_columns(G, "a")
+    assert list(columns.question) == [1] * 8 + [2]
+    assert list(columns.answer_index) == [0, 1] * 4 + [1]
+    assert columns.sessions == {"s0", "s1", "s2", "s3", "s4"}
+    assert len(store.load_answer_columns(G + 1, "a")) == 1
+    store.delete_quiz(G, "a")
+    store.close()
+
+    store = QuizStore(db_path)
+    assert len(store.load_answer_columns(G, "a")) == 0
+    store.close()
+
+def test_checkpoints_keep_running_answers_out_of_compaction(db_path):
+    store = QuizStore(db_path)
+    store.start_checkpoint(G, "live", 555, "a", [question("q1")], {"phase": "starting", "index": 0})
+    store.record_answers(G, "a", "live", 1, [(1, 0, True, 1.0)])
+    store.record_answers(G, "a", "done", 1, [(2, 1, False, 2.0)])
+    store.save_checkpoint(G, "live", {"phase": "intermission", "index": 1}, {1: 100})
+    store.save_checkpoint(G, "live", {"phase": "open", "index": 2}, {1: 50, 2: 10})
+    store.compact_answers(G, "a")
+    store.close()
+
+    store = QuizStore(db_path)
+    assert store.load_checkpoints() == [(G, "live", 555, "a", [question("q1")], {"phase": "open", "index": 2})]
+    assert store.load_session_scores(G, "live") == {1: 150, 2: 10}
+    assert store.load_session_answers(G, "a", "live") == [(1, 1, 0, 1, 1.0)]
+    assert store.load_answer_columns(G, "a").sessions == {"live", "done"}
+    store.delete_checkpoint(G, "live")
+    store.compact_answers(G, "a")
+    store.close()
+
+    store = QuizStore(db_path)
+    assert store.load_checkpoints() == [] and store.load_session_scores(G, "live") == {}
+    assert store.conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0] == 0
+    store.close()
+
+def test_migrates_tables_without_guild_column(db_path, monkeypatch):
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE quizzes (name TEXT PRIMARY KEY, settings TEXT NOT NULL);
+        CREATE TABLE questions (quiz TEXT NOT NULL, position INTEGER NOT NULL, question TEXT NOT NULL, options TEXT NOT NULL, correct_answer_index INTEGER NOT NULL, duration INTEGER NOT NULL, PRIMARY KEY (quiz, position)) WITHOUT ROWID;
+        CREATE TABLE leaderboards (quiz TEXT NOT NULL, user_id INTEGER NOT NULL, score INTEGER NOT NULL, PRIMARY KEY (quiz, user_id)) WITHOUT ROWID;
+        CREATE TABLE participants (quiz TEXT NOT NULL, user_id INTEGER NOT NULL, PRIMARY KEY (quiz, user_id)) WITHOUT ROWID;
+        CREATE TABLE last_questions (quiz TEXT PRIMARY KEY, info TEXT NOT NULL);
+        CREATE TABLE answers (quiz TEXT NOT NULL, session TEXT NOT NULL, question INTEGER NOT NULL, user_id INTEGER NOT NULL, answer_index INTEGER NOT NULL, correct INTEGER NOT NULL, answer_time REAL NOT NULL);
+        CREATE TABLE exports (quiz TEXT PRIMARY KEY, filename TEXT NOT NULL, data BLOB NOT NULL);
+        CREATE INDEX answers_by_question ON answers (quiz, session, question);
+        INSERT INTO quizzes VALUES ('z', '{}'), ('a', '{"shuffle": true}');
+        INSERT INTO questions VALUES ('a', 0, 'q1', '["1", "2"]', 0, 20);
+        INSERT INTO leaderboards VALUES ('a', 5, 100);
+    """)
+    conn.close()
+    monkeypatch.setenv("QUIZBOT_LEGACY_GUILD", "42")
+
+    store = QuizStore(db_path)
+    assert list(store.load_settings(42)) == ["z", "a"]
+    assert store.load_questions(42, "a")[0].question == "q1"
+    assert store.load_leaderboard(42, "a") == {5: 100}
+    assert store.load_settings(0) == {}
+    store.close()
+
+# A shard worker: its own QuizStore, and so its own writer thread, writing one guild's answers.
+WORKER = """
+import sys
+from storage import QuizStore
+store = QuizStore(sys.argv[1])
+guild_id = int(sys.argv[2])
+for batch in range(50):
+    store.record_answers(guild_id, "a", "s1", 1, [(batch * 20 + i, 0, True, 0.5) for i in range(20)])
+store.close()
+"""
+
+def test_worker_processes_share_the_database(db_path):
+    QuizStore(db_path).close()
+    root = os.path.dirname(os.path.abspath(storage.__file__))
+    workers = [subprocess.Popen([sys.executable, "-c", WORKER, db_path, str(guild_id)], cwd=root, stderr=subprocess.PIPE, text=True) for guild_id in (1, 2)]
+    for worker in workers:
+        _, stderr = worker.communicate(timeout=60)
+        assert worker.returncode == 0, stderr
+    conn = sqlite3.connect(db_path)
+    for guild_id in (1, 2):
+        assert conn.execute("SELECT COUNT(*), COUNT(DISTINCT user_id) FROM answers WHERE guild_id = ?", (guild_id,)).fetchone() == (1000, 1000)
+        assert conn.execute("SELECT COUNT(*) FROM participants WHERE guild_id = ?", (guild_id,)).fetchone() == (1000,)
+    conn.close()